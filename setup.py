@@ -16,7 +16,10 @@ setup(
     },
     entry_points={
         'console_scripts': [
-            'whisper-transcribe=whisper_transcriber.transcriber:main',
+            'whisper-transcribe=whisper_transcriber.cli:main',
+            'whisper-transcribe-server=whisper_transcriber.service:main',
+            'whisper-transcribe-snapshot=whisper_transcriber.snapshot:main',
+            'whisper-transcribe-bench=whisper_transcriber.bench:main',
         ],
     },
     python_requires='>=3.11',
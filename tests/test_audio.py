@@ -0,0 +1,71 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+sf = pytest.importorskip("soundfile")
+pytest.importorskip("whisper")
+
+from whisper_transcriber.audio import AudioReader, SpanAudio, WindowedAudio, load_audio, open_audio
+
+
+def write_tone(path, sr, seconds=3.0, channels=1):
+    t = np.arange(int(sr * seconds)) / sr
+    audio = 0.5 * np.sin(2 * np.pi * 440 * t) + 0.2 * np.sin(2 * np.pi * 3000 * t)
+    if channels > 1:
+        audio = np.stack([audio * (c + 1) / channels for c in range(channels)], axis=1)
+    sf.write(str(path), audio.astype(np.float32), sr)
+    return path
+
+
+def read_windows(audio, window):
+    return np.concatenate([audio[start:start + window] for start in range(0, len(audio), window)])
+
+
+@pytest.mark.parametrize("sr,channels", [(16000, 1), (44100, 2), (48000, 1), (8000, 1), (22050, 2)])
+def test_windowed_reads_match_full_load(tmp_path, sr, channels):
+    path = write_tone(tmp_path / "tone.wav", sr, channels=channels)
+    expected = load_audio(path)
+
+    with AudioReader(path) as reader:
+        assert len(reader) == len(expected)
+        # Window sizes that don't divide the file length, including windows smaller than the filter
+        for window in (16000, 4097, 100):
+            np.testing.assert_allclose(read_windows(reader, window), expected, atol=1e-5)
+        np.testing.assert_allclose(reader[12345:23456], expected[12345:23456], atol=1e-5)
+        assert len(reader[len(reader):len(reader) + 10]) == 0
+
+
+def test_span_audio_matches_concatenated_spans(tmp_path):
+    path = write_tone(tmp_path / "tone.wav", 44100)
+    expected = load_audio(path)
+    spans = [(100, 5000), (8000, 8001), (20000, 47000)]
+    joined = np.concatenate([expected[start:end] for start, end in spans])
+
+    with AudioReader(path) as reader:
+        for source in (expected, reader):
+            view = SpanAudio(source, spans)
+            assert len(view) == len(joined)
+            np.testing.assert_allclose(read_windows(view, 3000), joined, atol=1e-5)
+            np.testing.assert_allclose(view[4800:5000], joined[4800:5000], atol=1e-5)
+        np.testing.assert_allclose(reader.view(1000, 2000)[:], expected[1000:2000], atol=1e-5)
+
+
+def test_windowed_audio_slicing():
+    view = SpanAudio(np.arange(10, dtype=np.float32), [(0, 10)])
+    with pytest.raises(TypeError):
+        view[::2]
+    with pytest.raises(TypeError):
+        view[3]
+    with pytest.raises(TypeError):
+        WindowedAudio()
+
+
+def test_open_audio_threshold(tmp_path):
+    path = write_tone(tmp_path / "tone.wav", 16000)
+    assert isinstance(open_audio(path), np.ndarray)
+    assert isinstance(open_audio(path, windowed_threshold=10.0), np.ndarray)
+    reader = open_audio(path, windowed_threshold=1.0)
+    try:
+        assert isinstance(reader, AudioReader)
+        assert reader.seekable
+    finally:
+        reader.close()
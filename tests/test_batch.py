@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("whisper")
+pytest.importorskip("soundfile")
+
+from whisper_transcriber import batch
+from whisper_transcriber.cache import ResultCache
+from whisper_transcriber.language import LanguageHints
+
+
+def test_worker_writes_are_applied_by_the_parent(tmp_path, monkeypatch):
+    hints_path = tmp_path / "hints.jsonl"
+    worker = SimpleNamespace(cache=ResultCache(tmp_path / "cache"), language_hints=LanguageHints(hints_path))
+    worker.cache.pending = []
+    worker.language_hints.pending = []
+    monkeypatch.setattr(batch, "_worker_transcriber", worker)
+
+    worker.cache.put("ab" * 32, {"text": "x"})
+    worker.language_hints.record("speaker", "de", 0.9)
+    assert worker.language_hints.get("speaker") is None
+    assert not hints_path.exists()
+    writes = batch._drain_writes()
+
+    parent = SimpleNamespace(cache=ResultCache(tmp_path / "cache", max_bytes=10_000),
+                             language_hints=LanguageHints(hints_path, min_files=1))
+    batch._apply_writes(parent, writes)
+    assert parent.cache.get("ab" * 32) == {"text": "x"}
+    assert parent.language_hints.get("speaker") == "de"
+    assert LanguageHints(hints_path, min_files=1).get("speaker") == "de"
+    assert batch._drain_writes() == ([], [])
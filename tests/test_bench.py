@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("whisper")
+
+from whisper_transcriber import bench
+
+TEXTS = {"fp32": {"a.wav": "hello there"}, "int8": {"a.wav": "hello where"}}
+
+
+def fake_benchmark_model(config, *args):
+    # bf16 is unsupported here, so it runs as fp32 like WhisperTranscriber's fallback
+    effective = "fp32" if config.precision == "bf16" else config.precision
+    return {"precision": config.precision, "precision_effective": effective, "texts": dict(TEXTS[effective])}
+
+
+def test_unsupported_precision_does_not_replace_reference(monkeypatch, tmp_path):
+    monkeypatch.setattr(bench, "benchmark_model", fake_benchmark_model)
+    report = bench.run_benchmark(str(tmp_path), precisions=("fp32", "bf16", "int8"), isolate=False)
+
+    fp32, bf16, int8 = report["runs"]
+    assert "wer_vs_fp32" not in fp32
+    assert bf16["skipped"] == "bf16 unsupported, ran as fp32"
+    assert "wer_vs_fp32" not in bf16
+    assert int8["wer_vs_fp32"] == pytest.approx(0.5)
+    assert "texts" not in int8
@@ -0,0 +1,105 @@
+import os
+import json
+
+import pytest
+
+from whisper_transcriber.cache import ResultCache
+from whisper_transcriber.config import TranscriptionConfig
+
+
+@pytest.fixture
+def audio_file(tmp_path):
+    path = tmp_path / "clip.wav"
+    path.write_bytes(b"RIFF" + bytes(range(256)) * 8)
+    return path
+
+
+def test_key_is_stable(tmp_path, audio_file):
+    cache = ResultCache(tmp_path / "cache")
+    assert cache.key(audio_file, TranscriptionConfig()) == cache.key(audio_file, TranscriptionConfig())
+    # Output and filtering settings don't change the raw result
+    assert cache.key(audio_file, TranscriptionConfig()) == cache.key(
+        audio_file, TranscriptionConfig(output_format="json", min_segment_length=3, output_dir="elsewhere")
+    )
+
+
+@pytest.mark.parametrize("changes", [
+    {"model_name": "small"},
+    {"device": "cuda"},
+    {"language": "de"},
+    {"batch_size": 8},
+    {"language_hints": True},
+    {"word_timestamps": True},
+])
+def test_key_changes_with_decoding_settings(tmp_path, audio_file, changes):
+    cache = ResultCache(tmp_path / "cache")
+    assert cache.key(audio_file, TranscriptionConfig()) != cache.key(audio_file, TranscriptionConfig(**changes))
+
+
+def test_key_changes_with_audio_and_language(tmp_path, audio_file):
+    cache = ResultCache(tmp_path / "cache")
+    key = cache.key(audio_file, TranscriptionConfig())
+    assert cache.key(audio_file, TranscriptionConfig(), language="fr") != key
+    assert (cache.key(audio_file, TranscriptionConfig(), language="de") ==
+            cache.key(audio_file, TranscriptionConfig(language="de")))
+
+    audio_file.write_bytes(audio_file.read_bytes() + b"\0")
+    assert cache.key(audio_file, TranscriptionConfig()) != key
+
+
+def test_put_replaces_atomically(tmp_path):
+    cache = ResultCache(tmp_path / "cache")
+    cache.put("ab" * 32, {"text": "first"})
+    cache.put("ab" * 32, {"text": "second"})
+    assert cache.get("ab" * 32) == {"text": "second"}
+
+    # A failed write leaves the previous entry and no temporary file behind
+    with pytest.raises(TypeError):
+        cache.put("ab" * 32, {"text": object()})
+    assert cache.get("ab" * 32) == {"text": "second"}
+    assert [path.name for path in (tmp_path / "cache" / "ab").iterdir()] == ["ab" * 32 + ".json"]
+
+
+def test_get_misses_on_missing_or_corrupt_entries(tmp_path):
+    cache = ResultCache(tmp_path / "cache")
+    assert cache.get("cd" * 32) is None
+    path = tmp_path / "cache" / "cd" / ("cd" * 32 + ".json")
+    path.parent.mkdir(parents=True)
+    path.write_text('{"text": ')
+    assert cache.get("cd" * 32) is None
+
+
+def test_evicts_least_recently_used(tmp_path):
+    entry = {"text": "x" * 100}
+    entry_size = len(json.dumps(entry))
+    cache = ResultCache(tmp_path / "cache", max_bytes=2 * entry_size)
+    keys = ["%064x" % i for i in (1, 2, 3)]
+
+    cache.put(keys[0], entry)
+    cache.put(keys[1], entry)
+    os.utime(cache._entry_path(keys[0]), (1000, 1000))
+    os.utime(cache._entry_path(keys[1]), (2000, 2000))
+    # Reading the older entry makes it the most recently used
+    assert cache.get(keys[0]) == entry
+
+    cache.put(keys[2], entry)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == entry
+    assert cache.get(keys[2]) == entry
+
+
+def test_clear(tmp_path):
+    cache = ResultCache(tmp_path / "cache")
+    cache.put("ef" * 32, {"text": "x"})
+    cache.clear()
+    assert cache.get("ef" * 32) is None
+
+
+def test_pending_entries_are_collected_instead_of_written(tmp_path):
+    cache = ResultCache(tmp_path / "cache")
+    cache.pending = []
+    cache.put("ab" * 32, {"text": "x"})
+    assert cache.get("ab" * 32) is None
+    assert cache.drain() == [("ab" * 32, {"text": "x"})]
+    assert cache.drain() == []
+    assert cache.pending == []
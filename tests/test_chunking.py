@@ -0,0 +1,70 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("whisper")
+
+from whisper_transcriber.audio import SpanAudio
+from whisper_transcriber.chunking import find_chunk_boundaries, stitch_chunks
+
+SR = 16000
+
+
+def noise_with_pauses(seconds, pauses):
+    audio = np.random.default_rng(0).uniform(-0.5, 0.5, int(seconds * SR)).astype(np.float32)
+    for start in pauses:
+        audio[int(start * SR):int((start + 0.1) * SR)] = 0.0
+    return audio
+
+
+def test_cuts_at_quietest_frame_near_each_target():
+    audio = noise_with_pauses(90, pauses=[28.0, 62.3])
+    boundaries = find_chunk_boundaries(audio, chunk_length=30, search_window=5)
+    assert boundaries == [(0, 28 * SR), (28 * SR, int(62.3 * SR)), (int(62.3 * SR), len(audio))]
+
+    # Windowed audio is split the same way
+    assert find_chunk_boundaries(SpanAudio(audio, [(0, len(audio))]), 30, 5) == boundaries
+
+
+def test_pause_outside_search_window_is_ignored():
+    audio = noise_with_pauses(90, pauses=[20.0])
+    (_, first_cut), *_ = find_chunk_boundaries(audio, chunk_length=30, search_window=5)
+    assert 25 * SR <= first_cut <= 35 * SR
+
+
+def test_short_audio_is_one_chunk():
+    assert find_chunk_boundaries(np.zeros(100, dtype=np.float32), 30) == [(0, 100)]
+    assert find_chunk_boundaries(np.zeros(20 * SR, dtype=np.float32), 30) == [(0, 20 * SR)]
+
+
+def segment(start, end, text, **extra):
+    return {"start": start, "end": end, "text": text, **extra}
+
+
+def test_stitch_keeps_segments_by_midpoint_and_drops_repeats_at_seams():
+    chunks = [(0, 12 * SR), (8 * SR, 20 * SR)]
+    boundaries = [(0, 10 * SR), (10 * SR, 20 * SR)]
+    results = [
+        {"language": "en", "segments": [
+            segment(0.0, 4.0, " A"),
+            segment(4.0, 9.0, " B"),
+            segment(9.0, 11.5, " C"),  # Midpoint 10.25 s belongs to the second chunk
+        ]},
+        {"language": "en", "segments": [
+            segment(0.5, 1.8, " B"),  # Midpoint 9.15 s belongs to the first chunk
+            segment(1.5, 3.5, " C", seek=0, words=[{"word": " C", "start": 1.5, "end": 3.5}]),
+            segment(3.5, 5.0, "C "),  # Repeats the seam's last kept text
+            segment(5.0, 8.0, " D"),
+        ]},
+    ]
+
+    stitched = stitch_chunks(results, chunks, boundaries)
+
+    assert stitched["text"] == " A B C D"
+    assert [s["id"] for s in stitched["segments"]] == [0, 1, 2, 3]
+    assert [(s["start"], s["end"]) for s in stitched["segments"]] == [(0.0, 4.0), (4.0, 9.0), (9.5, 11.5), (13.0, 16.0)]
+    seam = stitched["segments"][2]
+    assert seam["seek"] == 800
+    assert seam["words"] == [{"word": " C", "start": 9.5, "end": 11.5}]
+    assert stitched["language"] == "en"
+    # The chunk's own result is not modified
+    assert results[1]["segments"][1]["start"] == 1.5
@@ -0,0 +1,106 @@
+from types import SimpleNamespace
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("whisper")
+
+from whisper_transcriber.config import TranscriptionConfig, FallbackConfig
+from whisper_transcriber.decoding import FallbackBudget, decode_batch
+
+FAILING = SimpleNamespace(no_speech_prob=0.1, avg_logprob=-2.0, compression_ratio=1.0)
+SILENT = SimpleNamespace(no_speech_prob=0.9, avg_logprob=-2.0, compression_ratio=1.0)
+
+
+def make_budget(**limits):
+    return FallbackBudget(TranscriptionConfig(fallback=FallbackConfig(enabled=True, **limits)))
+
+
+def test_max_per_window():
+    budget = make_budget(max_per_window=1)
+    assert budget.allows_retry(FAILING, 1)
+    assert not budget.allows_retry(FAILING, 2)
+    assert budget.retries == 1
+    assert budget.cut_short == 1
+
+
+def test_max_per_file_spans_windows():
+    budget = make_budget(max_per_file=2)
+    assert budget.allows_retry(FAILING, 1)
+    assert budget.allows_retry(FAILING, 1)
+    assert not budget.allows_retry(FAILING, 1)
+    assert budget.to_dict()["retries"] == 2
+
+
+def test_max_seconds_counts_retries_only():
+    budget = make_budget(max_seconds=1.0)
+    budget.record(0, 5.0)
+    budget.record(1, 0.6)
+    assert budget.retry_seconds == pytest.approx(0.6)
+    assert budget.allows_retry(FAILING, 2, expected_seconds=0.3)
+    assert not budget.allows_retry(FAILING, 2, expected_seconds=0.5)
+
+
+def test_max_window_seconds():
+    budget = make_budget(max_window_seconds=2.0)
+    assert budget.allows_retry(FAILING, 1, window_seconds=1.0, expected_seconds=0.5)
+    assert not budget.allows_retry(FAILING, 2, window_seconds=1.5, expected_seconds=0.5)
+
+
+def test_silent_windows_are_not_retried():
+    budget = make_budget()
+    assert not budget.allows_retry(SILENT, 1)
+    assert budget.silence_exits == 1
+    assert budget.retries == 0
+    assert budget.cut_short == 0
+
+    budget = make_budget(skip_silence=False)
+    assert budget.allows_retry(SILENT, 1)
+
+
+class FakeModel:
+    """Model whose window 0 decodes cleanly and window 1 fails the quality checks at every temperature."""
+
+    def __init__(self):
+        self.calls = []
+
+    def decode(self, inputs, options):
+        self.calls.append((options.temperature, len(inputs)))
+        results = []
+        for features in inputs:
+            good = features.flatten()[0].item() == 0
+            results.append(SimpleNamespace(
+                audio_features=features,
+                no_speech_prob=0.1,
+                avg_logprob=-0.2 if good else -2.0,
+                compression_ratio=1.0,
+                temperature=options.temperature,
+            ))
+        return results
+
+
+def test_decode_batch_statistics():
+    config = TranscriptionConfig(fallback=FallbackConfig(enabled=True, max_per_window=2))
+    mel = torch.stack([torch.zeros(80, 3000), torch.ones(80, 3000)])
+    budgets = [FallbackBudget(config), FallbackBudget(config)]
+    model = FakeModel()
+
+    results = decode_batch(model, mel, config, budgets)
+
+    assert [result.temperature for result in results] == [0.0, 0.4]
+    assert model.calls == [(0.0, 2), (0.2, 1), (0.4, 1)]
+    good, bad = (budget.to_dict() for budget in budgets)
+    assert [t["attempts"] for t in good["temperatures"]] == [1, 0, 0, 0, 0, 0]
+    assert [t["accepted"] for t in good["temperatures"]] == [1, 0, 0, 0, 0, 0]
+    assert [t["attempts"] for t in bad["temperatures"]] == [1, 1, 1, 0, 0, 0]
+    assert [t["accepted"] for t in bad["temperatures"]] == [0, 0, 1, 0, 0, 0]
+    assert bad["retries"] == 2
+    assert bad["cut_short"] == 1
+
+
+def test_fallback_limits_reject_unsupported_options():
+    with pytest.raises(ValueError):
+        TranscriptionConfig(fallback=FallbackConfig(enabled=True), clip_timestamps="5,10").validate()
+    with pytest.raises(ValueError):
+        TranscriptionConfig(fallback=FallbackConfig(enabled=True), hallucination_silence_threshold=2.0).validate()
+    TranscriptionConfig(fallback=FallbackConfig(enabled=True)).validate()
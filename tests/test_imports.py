@@ -0,0 +1,47 @@
+import sys
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Modules that must not be imported until a model or audio is needed
+HEAVY_MODULES = ("torch", "whisper", "numpy", "soundfile")
+
+CHECK_HEAVY = f"""
+import sys
+heavy = [name for name in {HEAVY_MODULES!r} if name in sys.modules]
+assert not heavy, f"heavy modules imported: {{heavy}}"
+"""
+
+
+def run_python(code):
+    return subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=60)
+
+
+def test_import_and_validate_config_stay_light():
+    code = "import whisper_transcriber\nwhisper_transcriber.TranscriptionConfig().validate()\n" + CHECK_HEAVY
+    completed = run_python(code)
+    assert completed.returncode == 0, completed.stderr
+
+
+def test_cli_help_stays_light():
+    code = (
+        "import sys\n"
+        "from whisper_transcriber.cli import main\n"
+        "sys.argv = ['whisper-transcribe', '--help']\n"
+        "try:\n"
+        "    main()\n"
+        "except SystemExit as e:\n"
+        "    assert e.code == 0, e.code\n"
+        + CHECK_HEAVY
+    )
+    completed = run_python(code)
+    assert completed.returncode == 0, completed.stderr
+    assert "usage:" in completed.stdout
+
+
+def test_module_help_runs():
+    completed = subprocess.run([sys.executable, "-m", "whisper_transcriber", "--help"], cwd=ROOT,
+                               capture_output=True, text=True, timeout=60)
+    assert completed.returncode == 0, completed.stderr
+    assert "usage:" in completed.stdout
@@ -0,0 +1,52 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("whisper")
+
+from whisper_transcriber.config import LiveConfig
+from whisper_transcriber.live import PcmDecoder
+
+
+def pcm(seconds, sample_rate, channels):
+    """Interleaved 16-bit PCM of a tone, each channel at a different level."""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    tone = np.sin(2 * np.pi * 440 * t)
+    frames = np.stack([tone * 0.2 * (c + 1) for c in range(channels)], axis=1)
+    samples = np.round(frames * 32767).astype("<i2")
+    return samples.tobytes(), samples.astype(np.float32).mean(axis=1) / 32768.0
+
+
+def decode_in_chunks(config, data, sizes):
+    decoder = PcmDecoder(config)
+    pieces, position = [], 0
+    for size in sizes:
+        pieces.append(decoder.decode(data[position:position + size]))
+        position += size
+    pieces.append(decoder.decode(data[position:]))
+    return np.concatenate(pieces)
+
+
+@pytest.mark.parametrize("sample_rate,channels", [(16000, 1), (16000, 2), (44100, 2), (48000, 1), (8000, 3)])
+def test_chunk_boundaries_do_not_change_the_output(sample_rate, channels):
+    data, mono = pcm(1.0, sample_rate, channels)
+    config = LiveConfig(sample_rate=sample_rate, channels=channels)
+
+    # Downmixed, then linearly resampled over the whole signal
+    positions = np.arange(int(np.floor((len(mono) - 1) * 16000 / sample_rate)) + 1) * (sample_rate / 16000)
+    expected = np.interp(positions, np.arange(len(mono)), mono)
+
+    whole = PcmDecoder(config).decode(data)
+    np.testing.assert_allclose(whole, expected, atol=1e-6)
+
+    # Odd chunk sizes split samples and frames
+    sizes = np.random.default_rng(0).integers(1, 999, size=200).tolist()
+    chunked = decode_in_chunks(config, data, sizes)
+    assert chunked.dtype == np.float32
+    np.testing.assert_allclose(chunked, whole, atol=1e-6)
+
+
+def test_partial_frames_wait_for_the_rest():
+    decoder = PcmDecoder(LiveConfig(channels=2))
+    frame = np.array([16384, -16384], dtype="<i2").tobytes()
+    assert len(decoder.decode(frame[:3])) == 0
+    np.testing.assert_array_equal(decoder.decode(frame[3:] + frame), [0.0, 0.0])
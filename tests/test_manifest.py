@@ -0,0 +1,75 @@
+import os
+import json
+
+from whisper_transcriber.manifest import STATUS_DONE, STATUS_FAILED, JobManifest
+
+
+def make_file(path, data=b"audio"):
+    path.write_bytes(data)
+    return path
+
+
+def test_record_and_reload(tmp_path):
+    audio = make_file(tmp_path / "a.wav")
+    failed = make_file(tmp_path / "b.wav")
+    manifest = JobManifest(tmp_path / "manifest.jsonl")
+    manifest.record(audio, STATUS_DONE, outputs=str(tmp_path / "a.srt"), duration=2.0, elapsed=0.5)
+    manifest.record(failed, STATUS_FAILED, elapsed=0.1, error="boom")
+
+    reloaded = JobManifest(tmp_path / "manifest.jsonl")
+    assert reloaded.is_completed(audio)
+    assert not reloaded.is_completed(failed)
+    assert not reloaded.is_completed(tmp_path / "missing.wav")
+    assert reloaded.get(audio)["outputs"] == str(tmp_path / "a.srt")
+    assert [record["error"] for record in reloaded.failures()] == ["boom"]
+    summary = reloaded.summary()
+    assert (summary["files"], summary["done"], summary["failed"]) == (2, 1, 1)
+    assert summary["audio_seconds"] == 2.0
+
+    # A later attempt's record wins
+    reloaded.record(failed, STATUS_DONE, outputs=[])
+    assert JobManifest(tmp_path / "manifest.jsonl").is_completed(failed)
+
+
+def test_changed_file_is_not_completed(tmp_path):
+    audio = make_file(tmp_path / "a.wav")
+    manifest = JobManifest(tmp_path / "manifest.jsonl")
+    manifest.record(audio, STATUS_DONE)
+
+    audio.write_bytes(b"longer audio")
+    assert not manifest.is_completed(audio)
+
+    manifest.record(audio, STATUS_DONE)
+    stat = audio.stat()
+    os.utime(audio, (stat.st_atime, stat.st_mtime + 10))
+    assert not manifest.is_completed(audio)
+
+
+def test_truncated_final_line_is_ignored(tmp_path):
+    audio = make_file(tmp_path / "a.wav")
+    path = tmp_path / "manifest.jsonl"
+    JobManifest(path).record(audio, STATUS_DONE)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"file": str(audio.resolve()), "status": STATUS_FAILED})[:20])
+
+    manifest = JobManifest(path)
+    assert manifest.is_completed(audio)
+    assert manifest.summary()["files"] == 1
+
+
+def test_outputs_must_be_recorded_and_present(tmp_path):
+    audio = make_file(tmp_path / "a.wav")
+    srt = make_file(tmp_path / "a.srt", b"1")
+    manifest = JobManifest(tmp_path / "manifest.jsonl")
+    manifest.record(audio, STATUS_DONE, outputs=str(srt))
+
+    assert manifest.is_completed(audio, [srt])
+    # A rerun with another format or output directory redoes the file
+    assert not manifest.is_completed(audio, [srt, tmp_path / "a.json"])
+    assert not manifest.is_completed(audio, [tmp_path / "elsewhere" / "a.srt"])
+
+    make_file(tmp_path / "a.json", b"{}")
+    manifest.record(audio, STATUS_DONE, outputs=[str(srt), str(tmp_path / "a.json")])
+    assert manifest.is_completed(audio, [tmp_path / "a.json"])
+    srt.unlink()
+    assert not manifest.is_completed(audio, [srt])
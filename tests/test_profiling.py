@@ -0,0 +1,64 @@
+import pytest
+
+from whisper_transcriber.profiling import StageTimings, activate, stage
+
+
+def test_activate_closes_stages_left_open_by_a_failed_forward():
+    torch = pytest.importorskip("torch")
+    from whisper_transcriber.profiling import install_model_hooks
+
+    class Failing(torch.nn.Module):
+        def forward(self, x):
+            raise RuntimeError("out of memory")
+
+    model = torch.nn.Module()
+    model.encoder = Failing()
+    install_model_hooks(model)
+
+    timings = StageTimings()
+    with pytest.raises(RuntimeError):
+        with activate(timings):
+            model.encoder(torch.zeros(1))
+
+    # A later file's stages are top level again and no start is left over
+    with activate(timings):
+        with stage("load_audio"):
+            pass
+    assert timings.stages["load_audio"]["calls"] == 1
+    assert timings.wall == timings.stages["load_audio"]["wall_s"]
+    assert "encoder" not in timings.stages
+
+
+def test_decode_calls_are_timed_once_per_call():
+    torch = pytest.importorskip("torch")
+    from whisper_transcriber.model_registry import replicate_model
+    from whisper_transcriber.profiling import install_model_hooks
+
+    class Model(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.encoder = torch.nn.Linear(2, 2)
+            self.decoder = torch.nn.Linear(2, 2)
+            self.calls = []
+
+        def decode(self, mel, options=None):
+            features = self.encoder(mel)
+            for _ in range(5):
+                features = self.decoder(features)
+            self.calls.append(options)
+            return features
+
+    model = Model()
+    install_model_hooks(model)
+    replica = replicate_model(model)
+
+    timings = StageTimings()
+    with activate(timings), stage("inference"):
+        model.decode(torch.zeros(1, 2), "first")
+        replica.decode(torch.zeros(1, 2), "second")
+
+    assert model.calls == ["first"]
+    assert replica.calls == ["second"]
+    assert timings.stages["decoder"]["calls"] == 2
+    assert timings.stages["encoder"]["calls"] == 2
+    assert timings.wall == timings.stages["inference"]["wall_s"]
@@ -0,0 +1,107 @@
+import io
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from whisper_transcriber.output_handler import OutputHandler, SrtWriter, VttWriter
+from whisper_transcriber.segments import SegmentStore, format_timestamps
+
+
+def make_segment(i, start, end, text, tokens, words=None, **extra):
+    segment = {"id": i, "seek": 0, "start": start, "end": end, "text": text, "tokens": tokens,
+               "temperature": 0.0, "avg_logprob": -0.3, "compression_ratio": 1.2, "no_speech_prob": 0.05}
+    if words is not None:
+        segment["words"] = words
+    segment.update(extra)
+    return segment
+
+
+def word(text, start, end, probability=0.9):
+    return {"word": text, "start": start, "end": end, "probability": probability}
+
+
+SEGMENTS = [
+    make_segment(0, 0.0, 1.5, " One.", [1, 2], [word(" One.", 0.0, 1.5)]),
+    make_segment(1, 1.5, 3.25, " Two three.", [3, 4, 5], [word(" Two", 1.5, 2.0), word(" three.", 2.0, 3.25)]),
+    make_segment(2, 3.25, 3661.5, "", []),
+    make_segment(3, 3661.5, 3700.0, " Four.", [6], [word(" Four.", 3661.5, 3700.0, 0.5)]),
+]
+
+
+def test_round_trip():
+    store = SegmentStore.from_segments(SEGMENTS)
+    assert len(store) == 4
+    assert store.to_list() == SEGMENTS
+    assert [list(segment) for segment in store] == [list(segment) for segment in SEGMENTS]
+    assert store[1]["tokens"] == [3, 4, 5]
+    assert store[-1]["text"] == " Four."
+    assert "words" not in store[2]
+    assert store.has_words
+    # A store built from another store's views is equal to it
+    assert SegmentStore.from_segments(store).to_list() == SEGMENTS
+
+
+def test_fields_on_some_segments_are_kept_per_segment():
+    segments = [make_segment(0, 0.0, 1.0, " a", [1]), make_segment(1, 1.0, 2.0, " b", [2], speaker="A")]
+    segments[0]["avg_logprob"] = None
+    store = SegmentStore.from_segments(segments)
+    assert store.to_list() == segments
+    assert "speaker" not in store[0]
+    assert store[1]["speaker"] == "A"
+    assert store[0]["avg_logprob"] is None
+
+
+def test_words_that_are_not_word_timestamps_are_kept_as_reported():
+    odd = [{"word": " x", "start": 0.0, "end": 0.5, "speaker": "A"}]
+    segments = [make_segment(0, 0.0, 1.0, " x", [1], odd), make_segment(1, 1.0, 2.0, " y", [2], "y")]
+    store = SegmentStore.from_segments(segments)
+    assert store.to_list() == segments
+    assert not store.stored_words(0)
+    assert store.has_words
+
+
+def assert_aligned(store, expected):
+    assert store.to_list() == expected
+    assert [segment["text"] for segment in store] == [segment["text"] for segment in expected]
+    assert [segment["tokens"] for segment in store] == [segment["tokens"] for segment in expected]
+    assert [segment.get("words") for segment in store.to_list()] == [segment.get("words") for segment in expected]
+
+
+def test_take_with_mask_and_slice():
+    store = SegmentStore.from_segments(SEGMENTS)
+    assert_aligned(store.take(np.array([True, False, False, True])), [SEGMENTS[0], SEGMENTS[3]])
+    assert_aligned(store.take([3, 1]), [SEGMENTS[3], SEGMENTS[1]])
+    assert_aligned(store[1:3], SEGMENTS[1:3])
+    assert_aligned(store[::-2], SEGMENTS[::-2])
+    assert_aligned(store.take(np.array([], dtype=np.int64)), [])
+    assert store[1:][2]["words"][0]["word"] == " Four."
+
+    # Text lengths computed before a selection follow it
+    assert store.text_lengths.tolist() == [4, 10, 0, 5]
+    assert store.take([3, 0]).text_lengths.tolist() == [5, 4]
+
+
+@pytest.mark.parametrize("vtt", [False, True])
+def test_format_timestamps_matches_output_handler(vtt):
+    times = [0.0, 0.0005, 1.5, 59.9996, 61.25, 3599.999, 3661.5, 36000.0]
+    assert format_timestamps(times, vtt) == [OutputHandler._format_timestamp(t, vtt) for t in times]
+
+    starts, ends = SegmentStore.from_segments(SEGMENTS).format_timestamps(vtt)
+    assert starts == [OutputHandler._format_timestamp(s["start"], vtt) for s in SEGMENTS]
+    assert ends == [OutputHandler._format_timestamp(s["end"], vtt) for s in SEGMENTS]
+
+
+@pytest.mark.parametrize("writer_class", [SrtWriter, VttWriter])
+@pytest.mark.parametrize("include_word_timestamps", [False, True])
+def test_subtitles_from_store_match_list(writer_class, include_word_timestamps):
+    odd = [{"word": " odd", "start": 3700.0, "end": 3701.0, "speaker": "A"}]
+    segments = SEGMENTS + [make_segment(4, 3700.0, 3701.0, " odd", [7], odd)]
+
+    def render(segments):
+        stream = io.StringIO()
+        with writer_class(stream, include_word_timestamps) as writer:
+            writer.write_segments(segments)
+        return stream.getvalue()
+
+    assert render(SegmentStore.from_segments(segments)) == render(segments)
@@ -0,0 +1,169 @@
+import sys
+import json
+import asyncio
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from whisper_transcriber.config import TranscriptionConfig
+from whisper_transcriber.output_handler import OutputHandler
+from whisper_transcriber.service import AsyncTranscriber, QueueFullError, TranscriptionServer, _Job
+
+SEGMENTS = [
+    {
+        "id": 0, "seek": 0, "start": 0.0, "end": 2.5, "text": " Hello there.",
+        "tokens": [50364, 2425, 456, 13], "temperature": 0.0, "avg_logprob": -0.2,
+        "compression_ratio": 0.8, "no_speech_prob": 0.01,
+        "words": [
+            {"word": " Hello", "start": 0.0, "end": 1.1, "probability": 0.9},
+            {"word": " there.", "start": 1.1, "end": 2.5, "probability": 0.8},
+        ],
+    },
+]
+
+
+class FakeService:
+    """Front-end returning a fixed result, standing in for ``AsyncTranscriber``."""
+
+    def __init__(self, result):
+        self.result = result
+        self.transcriber = SimpleNamespace(output_handler=OutputHandler())
+
+    async def transcribe(self, audio_path, timeout=None, cleanup=None):
+        cleanup()
+        return self.result
+
+
+def test_json_response_with_segment_store():
+    segments = pytest.importorskip("whisper_transcriber.segments")
+    result = {"text": " Hello there.", "segments": segments.SegmentStore.from_segments(SEGMENTS),
+              "language": "en"}
+    server = TranscriptionServer(FakeService(result))
+
+    body = asyncio.run(server._transcribe_body(b"audio", {}))
+    response = server._response(200, body)
+
+    head, payload = response.split(b"\r\n\r\n", 1)
+    assert head.startswith(b"HTTP/1.1 200")
+    assert json.loads(payload) == {"text": " Hello there.", "segments": SEGMENTS, "language": "en"}
+
+
+@pytest.fixture
+def torch_threads(monkeypatch):
+    """The service only sets torch's thread count; stand in for torch where it isn't installed."""
+    try:
+        import torch  # noqa: F401
+    except ImportError:
+        threads = {"count": 1}
+        monkeypatch.setitem(sys.modules, "torch", SimpleNamespace(
+            get_num_threads=lambda: threads["count"],
+            set_num_threads=lambda count: threads.update(count=count),
+        ))
+
+
+class FakeWorker:
+    """Inference worker recording its batches; each batch waits until ``release`` is set."""
+
+    def __init__(self, batches, release):
+        self.config = TranscriptionConfig()
+        self.batches = batches
+        self.release = release
+
+    def _transcribe_paths_batched(self, audio_paths):
+        self.batches.append([(path, path.exists()) for path in audio_paths])
+        assert self.release.wait(5)
+        return [{"text": path.name} for path in audio_paths]
+
+
+class FakeTranscriber:
+    def __init__(self):
+        self.config = TranscriptionConfig()
+        self.metrics = None
+        self.batches = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def _worker_copy(self):
+        return FakeWorker(self.batches, self.release)
+
+
+async def wait_idle(service):
+    while service.stats()["in_flight"] or service.stats()["queued"]:
+        await asyncio.sleep(0.01)
+
+
+def test_requests_are_coalesced_into_micro_batches(torch_threads):
+    transcriber = FakeTranscriber()
+
+    async def run():
+        async with AsyncTranscriber(transcriber, max_batch_size=8, batch_window=0.2) as service:
+            return await asyncio.gather(*(service.transcribe(f"clip{i}.wav") for i in range(3)))
+
+    results = asyncio.run(run())
+    assert [result["text"] for result in results] == ["clip0.wav", "clip1.wav", "clip2.wav"]
+    assert [len(batch) for batch in transcriber.batches] == [3]
+
+
+def test_full_queue_rejects_requests(torch_threads):
+    transcriber = FakeTranscriber()
+    transcriber.release.clear()
+    removed = []
+
+    async def run():
+        async with AsyncTranscriber(transcriber, max_batch_size=1, batch_window=0, max_queue=1) as service:
+            running = service.submit("running.wav")
+            while not transcriber.batches:
+                await asyncio.sleep(0.01)
+            queued = service.submit("queued.wav")
+            with pytest.raises(QueueFullError):
+                service.submit("rejected.wav", cleanup=lambda: removed.append("rejected.wav"))
+            status = TranscriptionServer._response(429, {"error": "full"}).split(b"\r\n", 1)[0]
+            transcriber.release.set()
+            await asyncio.gather(running, queued)
+            return service.stats(), status
+
+    stats, status = asyncio.run(run())
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+    assert removed == ["rejected.wav"]
+    assert status == b"HTTP/1.1 429 Too Many Requests"
+
+
+def test_timed_out_upload_is_kept_until_its_batch_finishes(torch_threads):
+    transcriber = FakeTranscriber()
+    transcriber.release.clear()
+
+    async def run():
+        async with AsyncTranscriber(transcriber, batch_window=0) as service:
+            server = TranscriptionServer(service)
+            with pytest.raises(asyncio.TimeoutError):
+                await server._transcribe_body(b"audio", {"timeout": ["0.2"]})
+            (path, existed), = transcriber.batches[0]
+            still_there = path.exists()
+            transcriber.release.set()
+            await wait_idle(service)
+            return service.stats(), existed, still_there, path.exists()
+
+    stats, existed, still_there, exists_after = asyncio.run(run())
+    assert existed and still_there
+    assert not exists_after
+    assert stats["timed_out"] == 1
+    assert stats["failed"] == 0
+
+
+def test_cancelled_jobs_are_skipped_before_loading(torch_threads):
+    transcriber = FakeTranscriber()
+    service = AsyncTranscriber(transcriber)
+    service._local.transcriber = transcriber._worker_copy()
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        jobs = [_Job(Path(f"clip{i}.wav"), loop.create_future()) for i in range(2)]
+        jobs[0].cancelled = True
+        return service._run_batch(jobs)
+
+    outcomes = asyncio.run(run())
+    assert outcomes == [None, {"text": "clip1.wav"}]
+    assert [[path.name for path, _ in batch] for batch in transcriber.batches] == [["clip1.wav"]]
@@ -0,0 +1,82 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("whisper")
+
+from whisper_transcriber.audio import SpanAudio
+from whisper_transcriber.config import VADConfig
+from whisper_transcriber.vad import SpeechTimeline, detect_speech
+
+SR = 16000
+FRAME = 480  # 30 ms analysis frames
+
+
+def tone_bursts(frames, bursts, frequency=1000.0):
+    """Quiet noise with tone bursts at (start, end) frame ranges."""
+    audio = np.random.default_rng(0).uniform(-1e-4, 1e-4, frames * FRAME)
+    t = np.arange(len(audio)) / SR
+    for start, end in bursts:
+        audio[start * FRAME:end * FRAME] += 0.3 * np.sin(2 * np.pi * frequency * t[start * FRAME:end * FRAME])
+    return audio.astype(np.float32)
+
+
+def test_bridges_short_gaps_and_drops_short_bursts():
+    # 0.3 s gap is bridged, 1.2 s gap is not, 0.12 s burst is dropped
+    audio = tone_bursts(300, [(40, 80), (90, 130), (170, 210), (250, 254)])
+    spans = detect_speech(audio, VADConfig(speech_pad=0.0))
+    assert spans == [(40 * FRAME, 130 * FRAME), (170 * FRAME, 210 * FRAME)]
+
+
+def test_pads_and_merges_regions():
+    audio = tone_bursts(300, [(0, 20), (40, 80), (90, 130), (280, 300)])
+    spans = detect_speech(audio, VADConfig(speech_pad=0.2, min_silence_duration=0.1))
+    pad = int(0.2 * SR)
+    # Padding is clipped to the audio; regions whose padding overlaps are merged
+    assert spans == [(0, 20 * FRAME + pad), (40 * FRAME - pad, 130 * FRAME + pad), (280 * FRAME - pad, len(audio))]
+
+
+def test_ignores_energy_outside_the_speech_band():
+    audio = tone_bursts(300, [(40, 80)], frequency=100.0)
+    assert detect_speech(audio, VADConfig(speech_pad=0.0)) == []
+
+
+def test_short_audio():
+    assert detect_speech(np.zeros(100, dtype=np.float32), VADConfig()) == [(0, 100)]
+    assert detect_speech(np.zeros(0, dtype=np.float32), VADConfig()) == []
+
+
+def test_timeline_compact_and_restore_round_trip():
+    audio = np.arange(6 * SR, dtype=np.float32)
+    timeline = SpeechTimeline([(1 * SR, 2 * SR), (4 * SR, 5 * SR)], len(audio))
+
+    compacted = timeline.compact(audio)
+    np.testing.assert_array_equal(compacted, np.concatenate((audio[SR:2 * SR], audio[4 * SR:5 * SR])))
+    windowed = timeline.compact(SpanAudio(audio, [(0, len(audio))]))
+    np.testing.assert_array_equal(windowed[:], compacted)
+
+    for original in (1.0, 1.25, 1.999, 4.0, 4.5):
+        compact_time = (original - 1.0) if original < 2 else (original - 3.0)
+        assert timeline.to_original(compact_time) == pytest.approx(original)
+    # A time on the seam is the end of the first region or the start of the second
+    assert timeline.to_original(1.0) == pytest.approx(4.0)
+    assert timeline.to_original(1.0, is_end=True) == pytest.approx(2.0)
+
+    result = {"segments": [
+        {"start": 0.5, "end": 1.0, "words": [{"start": 0.5, "end": 1.0}]},
+        {"start": 1.0, "end": 1.5, "words": [{"start": 1.0, "end": 1.5}]},
+    ]}
+    timeline.restore(result)
+    first, second = result["segments"]
+    assert (first["start"], first["end"]) == pytest.approx((1.5, 2.0))
+    assert (first["words"][0]["start"], first["words"][0]["end"]) == pytest.approx((1.5, 2.0))
+    assert (second["start"], second["end"]) == pytest.approx((4.0, 4.5))
+    assert result["vad"] == {"total_duration": 6.0, "speech_duration": 2.0, "skipped_duration": 4.0,
+                             "skipped_ratio": pytest.approx(4 / 6), "speech_regions": 2}
+
+
+def test_empty_timeline():
+    timeline = SpeechTimeline([], 3 * SR)
+    assert len(timeline.compact(np.zeros(3 * SR, dtype=np.float32))) == 0
+    segment = {"start": 0.0, "end": 1.0}
+    assert timeline.restore_segment(segment) == {"start": 0.0, "end": 1.0}
+    assert timeline.summary()["skipped_ratio"] == 1.0
@@ -3,9 +3,63 @@
 A simple and scalable module for audio transcription using OpenAI's Whisper.
 """
 
-from .config import TranscriptionConfig
-from .transcriber import WhisperTranscriber, main
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+from .config import TranscriptionConfig, VADConfig, LiveConfig, FallbackConfig
 from .output_handler import OutputHandler
+from .cli import main
+
+if TYPE_CHECKING:
+    from .transcriber import WhisperTranscriber
+    from .live import LiveTranscriber
+    from .service import AsyncTranscriber, QueueFullError
+    from .model_registry import ModelRegistry, get_model_registry
+    from .language import LanguageHints
+    from .metrics import MetricsServer, MetricsFileWriter, get_metrics
+    from .segments import SegmentStore
+
+# Exports whose modules import torch, whisper, NumPy or the HTTP server, loaded on first access
+_LAZY_EXPORTS = {
+    "WhisperTranscriber": ".transcriber",
+    "LiveTranscriber": ".live",
+    "AsyncTranscriber": ".service",
+    "QueueFullError": ".service",
+    "ModelRegistry": ".model_registry",
+    "get_model_registry": ".model_registry",
+    "LanguageHints": ".language",
+    "MetricsServer": ".metrics",
+    "MetricsFileWriter": ".metrics",
+    "get_metrics": ".metrics",
+    "SegmentStore": ".segments",
+}
 
 __version__ = "0.1.0"
-__all__ = ["TranscriptionConfig", "WhisperTranscriber", "OutputHandler", "main"]
+__all__ = [
+    "TranscriptionConfig",
+    "VADConfig",
+    "LiveConfig",
+    "FallbackConfig",
+    "WhisperTranscriber",
+    "LiveTranscriber",
+    "AsyncTranscriber",
+    "QueueFullError",
+    "OutputHandler",
+    "SegmentStore",
+    "ModelRegistry",
+    "get_model_registry",
+    "LanguageHints",
+    "MetricsServer",
+    "MetricsFileWriter",
+    "get_metrics",
+    "main"
+]
+
+
+def __getattr__(name: str):
+    """Import heavy exports on first access so importing the package stays fast."""
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
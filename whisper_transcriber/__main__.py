@@ -1,4 +1,4 @@
-from whisper_transcriber.transcriber import main
+from whisper_transcriber.cli import main
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,408 @@
+import threading
+import subprocess
+from abc import ABC, abstractmethod
+from math import gcd
+from pathlib import Path
+from typing import Optional, Union, List, Tuple
+
+import numpy as np
+import soundfile as sf
+from whisper.audio import SAMPLE_RATE
+
+# Length of the anti-aliasing filter applied before downsampling, in taps
+FILTER_TAPS = 129
+
+# Samples filtered per FFT block when resampling
+FILTER_BLOCK = 1 << 16
+
+# Input samples on each side of an output sample weighted by the upsampling filter
+INTERP_HALF_WIDTH = 16
+
+# Positions of those input samples relative to the one preceding the output sample
+_INTERP_OFFSETS = np.arange(-INTERP_HALF_WIDTH + 1, INTERP_HALF_WIDTH + 1)
+
+
+def _lowpass_filter(cutoff: float) -> np.ndarray:
+    """
+    Design a Hann-windowed sinc low-pass filter.
+
+    Args:
+        cutoff (float): Cutoff frequency as a fraction of the sample rate (0 to 0.5).
+
+    Returns:
+        np.ndarray: Filter taps with unit gain at DC.
+    """
+    n = np.arange(FILTER_TAPS) - (FILTER_TAPS - 1) / 2
+    taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hanning(FILTER_TAPS)
+    return (taps / taps.sum()).astype(np.float32)
+
+
+def _filter(audio: np.ndarray, taps: np.ndarray) -> np.ndarray:
+    """
+    Apply an FIR filter with FFT overlap-add, keeping the signal aligned.
+
+    Blocks of up to ``FILTER_BLOCK`` samples are transformed one at a time in
+    single precision, so memory use beyond the output stays constant.
+
+    Args:
+        audio (np.ndarray): 1-D signal.
+        taps (np.ndarray): Filter taps, shorter than ``FILTER_BLOCK``.
+
+    Returns:
+        np.ndarray: Filtered signal of the same length.
+    """
+    n = len(audio)
+    # Short windowed reads get a transform sized to them rather than to a full block
+    block_size = max(1, min(FILTER_BLOCK, n))
+    n_filtered = block_size + len(taps) - 1
+    n_fft = 1 << int(np.ceil(np.log2(n_filtered)))
+    taps_fft = np.fft.rfft(taps, n_fft).astype(np.complex64)
+
+    # Overlap-add: each block's tail spills into the start of the next block
+    output = np.zeros(-(-n // block_size) * block_size + len(taps) - 1, dtype=np.float32)
+    for start in range(0, n, block_size):
+        block = np.asarray(audio[start:start + block_size], dtype=np.float32)
+        spectrum = np.fft.rfft(block, n_fft).astype(np.complex64, copy=False)
+        spectrum *= taps_fft
+        output[start:start + n_filtered] += np.fft.irfft(spectrum, n_fft)[:n_filtered]
+
+    delay = (len(taps) - 1) // 2
+    return output[delay:delay + n]
+
+
+def _interpolation_filter(up: int) -> np.ndarray:
+    """
+    Design the polyphase filter bank used for upsampling.
+
+    Row ``p`` holds the Hann-windowed sinc weights of the input samples
+    around an output sample that lies ``p / up`` samples after an input
+    sample. The sinc is cut off at the input Nyquist frequency, which
+    removes the spectral images upsampling creates.
+
+    Args:
+        up (int): Upsampling factor.
+
+    Returns:
+        np.ndarray: Weights of shape (up, 2 * INTERP_HALF_WIDTH) with unit gain at DC.
+    """
+    distance = np.arange(up)[:, None] / up - _INTERP_OFFSETS[None, :]
+    bank = np.sinc(distance) * (0.5 + 0.5 * np.cos(np.pi * distance / INTERP_HALF_WIDTH))
+    return (bank / bank.sum(axis=1, keepdims=True)).astype(np.float32)
+
+
+def _upsample(audio: np.ndarray, up: int, down: int, start: int, end: int,
+              offset: int = 0, bank: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Compute output samples ``start`` to ``end`` of resampling by ``up / down`` with a polyphase filter.
+
+    Args:
+        audio (np.ndarray): 1-D input signal, or a part of it with at least
+            ``INTERP_HALF_WIDTH`` samples of context around the requested
+            output. Samples beyond it count as zero.
+        up (int): Upsampling factor.
+        down (int): Downsampling factor, smaller than ``up``.
+        start (int): First output sample.
+        end (int): Output sample after the last one.
+        offset (int, optional): Input sample index of ``audio[0]``. Defaults to 0.
+        bank (Optional[np.ndarray]): Filter bank from ``_interpolation_filter(up)``.
+
+    Returns:
+        np.ndarray: float32 output samples.
+    """
+    if bank is None:
+        bank = _interpolation_filter(up)
+    padding = np.zeros(INTERP_HALF_WIDTH, dtype=np.float32)
+    padded = np.concatenate((padding, np.asarray(audio, dtype=np.float32), padding))
+
+    output = np.empty(end - start, dtype=np.float32)
+    for block_start in range(start, end, FILTER_BLOCK):
+        positions = np.arange(block_start, min(end, block_start + FILTER_BLOCK), dtype=np.int64) * down
+        base = positions // up - offset + INTERP_HALF_WIDTH
+        samples = padded[base[:, None] + _INTERP_OFFSETS[None, :]]
+        output[block_start - start:block_start - start + len(positions)] = np.einsum(
+            "ij,ij->i", samples, bank[positions % up]
+        )
+    return output
+
+
+def resample(audio: np.ndarray, orig_sr: int, target_sr: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Resample a mono signal.
+
+    Downsampling low-pass filters the signal first to avoid aliasing, then
+    keeps every n-th sample for integer ratios or interpolates linearly
+    otherwise. Upsampling interpolates with a polyphase windowed-sinc
+    filter, which suppresses the images of the original spectrum.
+
+    Args:
+        audio (np.ndarray): 1-D float signal.
+        orig_sr (int): Sample rate of the signal.
+        target_sr (int, optional): Sample rate to convert to. Defaults to 16000.
+
+    Returns:
+        np.ndarray: float32 signal at ``target_sr``.
+    """
+    if orig_sr == target_sr or len(audio) == 0:
+        return audio.astype(np.float32, copy=False)
+
+    divisor = gcd(orig_sr, target_sr)
+    up, down = target_sr // divisor, orig_sr // divisor
+    n_out = -(-len(audio) * up // down)
+
+    if target_sr > orig_sr:
+        return _upsample(audio, up, down, 0, n_out)
+
+    audio = _filter(audio, _lowpass_filter(0.5 * target_sr / orig_sr))
+    if up == 1:
+        return np.ascontiguousarray(audio[::down], dtype=np.float32)
+
+    positions = np.arange(n_out) * (down / up)
+    return np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+
+
+def _load_with_ffmpeg(audio_path: str, sr: int, max_duration: Optional[float] = None) -> np.ndarray:
+    """Decode any format ffmpeg understands to mono float32 at ``sr``, optionally only the start."""
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-threads", "0",
+        "-i", audio_path,
+        *(["-t", str(max_duration)] if max_duration is not None else []),
+        "-f", "s16le",
+        "-ac", "1",
+        "-acodec", "pcm_s16le",
+        "-ar", str(sr),
+        "-"
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except FileNotFoundError:
+        raise ValueError("Invalid audio file: format not supported by soundfile and ffmpeg is not installed")
+    except subprocess.CalledProcessError as e:
+        lines = e.stderr.decode(errors="replace").strip().splitlines()
+        raise ValueError(f"Invalid audio file: {lines[-1] if lines else e}")
+
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+def load_audio(audio_path: Union[str, Path], sr: int = SAMPLE_RATE,
+               max_duration: Optional[float] = None) -> np.ndarray:
+    """
+    Decode an audio file once into a mono float32 waveform.
+
+    Formats libsndfile reads (WAV, FLAC, OGG and, with recent versions, MP3)
+    are decoded in-process with soundfile, downmixed and resampled with
+    NumPy. Other formats (m4a, video containers...) are decoded by an
+    ffmpeg subprocess, as whisper does.
+
+    Args:
+        audio_path (Union[str, Path]): Path to the audio file.
+        sr (int, optional): Sample rate to return. Defaults to 16000.
+        max_duration (Optional[float]): Decode only the first this many seconds.
+            Defaults to None (the whole file).
+
+    Returns:
+        np.ndarray: Waveform in [-1, 1] at ``sr``.
+
+    Raises:
+        ValueError: If the file cannot be decoded.
+    """
+    audio_path = str(audio_path)
+    try:
+        with sf.SoundFile(audio_path) as f:
+            frames = -1 if max_duration is None else int(max_duration * f.samplerate)
+            audio, file_sr = f.read(frames, dtype="float32", always_2d=True), f.samplerate
+    except (RuntimeError, TypeError):
+        # libsndfile cannot read the format
+        return _load_with_ffmpeg(audio_path, sr, max_duration)
+
+    audio = audio.mean(axis=1) if audio.shape[1] > 1 else audio[:, 0]
+    return resample(audio, file_sr, sr)
+
+
+class WindowedAudio(ABC):
+    """
+    Read-only 16 kHz mono waveform whose samples are produced on demand.
+
+    Supports ``len()`` and slicing with a step of 1, like a NumPy array, but
+    only the requested range is ever held in memory.
+    """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @abstractmethod
+    def read(self, start: int, end: int) -> np.ndarray:
+        """
+        Return samples ``start`` to ``end`` as float32.
+
+        Args:
+            start (int): First sample.
+            end (int): Sample after the last one; clipped to the length.
+
+        Returns:
+            np.ndarray: The samples.
+        """
+
+    def __getitem__(self, index: slice) -> np.ndarray:
+        if not isinstance(index, slice) or index.step not in (None, 1):
+            raise TypeError("WindowedAudio only supports contiguous slices")
+        start, end, _ = index.indices(len(self))
+        return self.read(start, max(start, end))
+
+    def view(self, start: int, end: int) -> "WindowedAudio":
+        """Return a windowed view of samples ``start`` to ``end``."""
+        return SpanAudio(self, [(start, end)])
+
+    def close(self) -> None:
+        """Release the underlying resources, if any."""
+
+
+class SpanAudio(WindowedAudio):
+    """Concatenation of sample ranges of another waveform, read on demand."""
+
+    def __init__(self, source: Union[np.ndarray, WindowedAudio], spans: List[Tuple[int, int]]):
+        """
+        Initialize the view.
+
+        Args:
+            source (Union[np.ndarray, WindowedAudio]): Underlying waveform.
+            spans (List[Tuple[int, int]]): (start, end) sample ranges, in order.
+        """
+        self.source = source
+        self.spans = spans
+        lengths = np.array([end - start for start, end in spans], dtype=np.int64)
+        self._offsets = np.concatenate(([0], np.cumsum(lengths)))
+
+    def __len__(self) -> int:
+        return int(self._offsets[-1])
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        end = min(end, len(self))
+        if start >= end:
+            return np.zeros(0, dtype=np.float32)
+
+        first = int(np.searchsorted(self._offsets, start, side="right")) - 1
+        pieces = []
+        for index in range(first, len(self.spans)):
+            span_start, span_end = self.spans[index]
+            offset = int(self._offsets[index])
+            if offset >= end:
+                break
+            pieces.append(self.source[span_start + max(0, start - offset):span_start + min(span_end - span_start, end - offset)])
+        return np.concatenate(pieces).astype(np.float32, copy=False)
+
+
+class AudioReader(WindowedAudio):
+    """
+    Windowed reader of an audio file that soundfile can seek in (WAV, FLAC, OGG).
+
+    Each read decodes only the requested range, plus a few samples of filter
+    context when resampling, then downmixes and resamples it exactly as
+    ``load_audio`` would, so peak memory does not depend on the file length.
+    """
+
+    def __init__(self, audio_path: Union[str, Path], sr: int = SAMPLE_RATE):
+        """
+        Open a file.
+
+        Args:
+            audio_path (Union[str, Path]): Path to the audio file.
+            sr (int, optional): Sample rate to return. Defaults to 16000.
+        """
+        self._file = sf.SoundFile(str(audio_path))
+        self._lock = threading.Lock()
+        self.sr = sr
+        self.file_sr = self._file.samplerate
+        self.file_frames = self._file.frames
+
+        divisor = gcd(self.file_sr, sr)
+        self._up, self._down = sr // divisor, self.file_sr // divisor
+        self._taps = _lowpass_filter(0.5 * sr / self.file_sr) if sr < self.file_sr else None
+        self._bank = _interpolation_filter(self._up) if sr > self.file_sr else None
+        self._length = -(-self.file_frames * self._up // self._down)
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def seekable(self) -> bool:
+        """Whether the file supports seeking, which windowed reads need."""
+        return self._file.seekable()
+
+    def close(self) -> None:
+        """Close the underlying file."""
+        self._file.close()
+
+    def __enter__(self) -> "AudioReader":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _read_frames(self, start: int, end: int) -> np.ndarray:
+        """Read file frames ``start`` to ``end`` as a mono float32 array."""
+        with self._lock:
+            self._file.seek(start)
+            data = self._file.read(end - start, dtype="float32", always_2d=True)
+        return data.mean(axis=1) if data.shape[1] > 1 else data[:, 0]
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        end = min(end, len(self))
+        if start >= end:
+            return np.zeros(0, dtype=np.float32)
+        if self._up == self._down:
+            return self._read_frames(start, end)
+
+        # File frames covering the requested output samples, plus filter context
+        margin = FILTER_TAPS if self._taps is not None else INTERP_HALF_WIDTH
+        first = max(0, start * self._down // self._up - margin)
+        last = min(self.file_frames, (end - 1) * self._down // self._up + 1 + margin)
+        audio = self._read_frames(first, last)
+
+        if self._bank is not None:
+            return _upsample(audio, self._up, self._down, start, end, first, self._bank)
+
+        if self._taps is not None:
+            # Zero padding beyond the file ends matches filtering the whole file
+            left = FILTER_TAPS if first == 0 else 0
+            right = FILTER_TAPS if last == self.file_frames else 0
+            padded = np.concatenate((np.zeros(left, np.float32), audio, np.zeros(right, np.float32)))
+            audio = _filter(padded, self._taps)[left:left + len(audio)]
+
+        if self._up == 1:
+            return np.ascontiguousarray(audio[start * self._down - first:end * self._down - first:self._down])
+        positions = np.arange(start, end) * (self._down / self._up) - first
+        return np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+
+
+def open_audio(audio_path: Union[str, Path], windowed_threshold: Optional[float] = None,
+               sr: int = SAMPLE_RATE) -> Union[np.ndarray, WindowedAudio]:
+    """
+    Open an audio file for transcription.
+
+    Files soundfile can seek in that are longer than ``windowed_threshold``
+    seconds are returned as an ``AudioReader`` that decodes on demand; all
+    other files are decoded into memory with ``load_audio``.
+
+    Args:
+        audio_path (Union[str, Path]): Path to the audio file.
+        windowed_threshold (Optional[float]): Duration in seconds above which the
+            file is read window by window. Defaults to None (always load).
+        sr (int, optional): Sample rate to return. Defaults to 16000.
+
+    Returns:
+        Union[np.ndarray, WindowedAudio]: The waveform.
+    """
+    if windowed_threshold is not None:
+        try:
+            reader = AudioReader(audio_path, sr)
+        except (RuntimeError, TypeError):
+            # libsndfile cannot read the format; load_audio falls back to ffmpeg
+            reader = None
+        if reader is not None:
+            if reader.seekable and reader.file_frames > windowed_threshold * reader.file_sr:
+                return reader
+            reader.close()
+    return load_audio(audio_path, sr)
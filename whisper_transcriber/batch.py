@@ -0,0 +1,287 @@
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple, Union, Callable, TYPE_CHECKING
+
+import torch
+import soundfile as sf
+
+from .config import TranscriptionConfig
+from .model_registry import get_model_registry
+from .metrics import get_metrics
+
+if TYPE_CHECKING:
+    from .transcriber import WhisperTranscriber
+
+# Transcriber owned by the current worker process, created by _init_worker
+_worker_transcriber: Optional["WhisperTranscriber"] = None
+
+
+def compact_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce a transcription result to the data needed for output formatting.
+
+    Drops per-segment token ids and decoding statistics so that results are
+    cheap to send between processes.
+
+    Args:
+        result (Dict[str, Any]): Full transcription result.
+
+    Returns:
+        Dict[str, Any]: Result with text, language and compact segments.
+    """
+    segments = []
+    for segment in result.get('segments', []):
+        compact = {
+            'id': segment.get('id'),
+            'start': segment['start'],
+            'end': segment['end'],
+            'text': segment['text']
+        }
+        if 'words' in segment:
+            compact['words'] = [
+                {
+                    'word': word['word'],
+                    'start': word['start'],
+                    'end': word['end'],
+                    'probability': word.get('probability')
+                }
+                for word in segment['words']
+            ]
+        segments.append(compact)
+
+    return {
+        'text': result.get('text', ''),
+        'segments': segments,
+        'language': result.get('language')
+    }
+
+
+def estimate_duration(audio_path: Path) -> float:
+    """
+    Estimate the duration of an audio file without decoding it.
+
+    Args:
+        audio_path (Path): Path to the audio file.
+
+    Returns:
+        float: Duration in seconds from the file header, or an estimate from
+            the file size (assuming ~128 kbit/s) when the header is unreadable.
+    """
+    try:
+        return sf.info(str(audio_path)).duration
+    except Exception:
+        return audio_path.stat().st_size / 16000
+
+
+def _init_worker(config: TranscriptionConfig, model: Optional[torch.nn.Module], threads: int) -> None:
+    """Create the per-process transcriber, reusing the parent's model when given."""
+    global _worker_transcriber
+    from .transcriber import WhisperTranscriber
+
+    torch.set_num_threads(threads)
+    # Forked workers inherit the parent's metrics; report only their own work
+    get_metrics().registry.drain()
+    if model is not None:
+        get_model_registry().register(model, config.model_name, config.device, config.precision)
+    _worker_transcriber = WhisperTranscriber(config)
+    # The parent writes cache entries and language detections, so a single
+    # process tracks the cache size and appends to the hints file
+    if _worker_transcriber.cache is not None:
+        _worker_transcriber.cache.pending = []
+    if _worker_transcriber.language_hints is not None:
+        _worker_transcriber.language_hints.pending = []
+
+
+def _drain_writes() -> Tuple[List[Tuple[str, Dict[str, Any]]], List[Tuple[str, str, Optional[float]]]]:
+    """Return the cache entries and language detections the worker collected for the parent."""
+    cache = _worker_transcriber.cache
+    hints = _worker_transcriber.language_hints
+    return (cache.drain() if cache is not None else [],
+            hints.drain() if hints is not None else [])
+
+
+def _apply_writes(transcriber: "WhisperTranscriber", writes: Tuple[List, List]) -> None:
+    """Write a worker's cache entries and language detections from the parent."""
+    entries, detections = writes
+    if transcriber.cache is not None:
+        for key, result in entries:
+            transcriber.cache.put(key, result)
+    if transcriber.language_hints is not None:
+        for source, language, probability in detections:
+            transcriber.language_hints.record(source, language, probability)
+
+
+def _process_in_worker(audio_path: str) -> Tuple[Union[str, List[str]], float, List[Dict[str, Any]],
+                                                  Optional[Dict[str, Any]], Tuple[List, List]]:
+    """Transcribe a file and write its output inside a worker process."""
+    started = time.perf_counter()
+    output_path = _worker_transcriber.process_file(audio_path)
+    elapsed = time.perf_counter() - started
+
+    # Hand the file's stage timings to the parent's profile summary
+    timings = []
+    summary = _worker_transcriber.profile_summary
+    if summary is not None:
+        timings, summary.files = summary.files, []
+    # and the metrics recorded since the previous file to the parent's metrics
+    metrics = _worker_transcriber.metrics
+    return (output_path, elapsed, timings, metrics.registry.drain() if metrics is not None else None,
+            _drain_writes())
+
+
+def _transcribe_in_worker(audio_path: str) -> Tuple[Dict[str, Any], Tuple[List, List]]:
+    """Transcribe a file inside a worker process and return a compact result."""
+    return compact_result(_worker_transcriber.transcribe(audio_path)), _drain_writes()
+
+
+class ProcessPoolEngine:
+    """
+    Batch engine running transcription in a pool of worker processes.
+
+    Each worker holds one model for its whole lifetime. On platforms with
+    ``fork`` the workers inherit the parent's already loaded CPU model, so its
+    weights are shared copy-on-write; otherwise CPU weights are moved to
+    shared memory and passed to the workers, or, with model snapshots, each
+    worker memory-maps the same snapshot file. Files are submitted
+    longest-first and idle workers pull the next file from the shared queue,
+    which keeps long files from ending up at the tail of the run. Workers
+    only read the result cache and language hints; their new entries and
+    detections are sent back with each file and written by the parent.
+    """
+
+    def __init__(self, transcriber: "WhisperTranscriber", workers: Optional[int] = None):
+        """
+        Initialize the engine.
+
+        Args:
+            transcriber (WhisperTranscriber): Transcriber whose configuration and
+                model are used by the workers.
+            workers (Optional[int]): Number of worker processes. Defaults to the CPU count.
+        """
+        self.transcriber = transcriber
+        self.workers = workers or os.cpu_count() or 1
+
+    def _executor(self, workers: int) -> ProcessPoolExecutor:
+        """Create a process pool whose workers have the model preloaded."""
+        config = self.transcriber.config
+        threads = max(1, (os.cpu_count() or 1) // workers)
+
+        model = None
+        if config.device == "cpu":
+            model = self.transcriber.model
+            if "fork" in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context("fork")
+            elif config.model_snapshot:
+                # Spawned workers memory-map the same snapshot file
+                model = None
+                context = multiprocessing.get_context("spawn")
+            else:
+                # Weights are sent to spawned workers through shared memory
+                import torch.multiprocessing  # registers tensor sharing reductions
+                model.share_memory()
+                context = multiprocessing.get_context("spawn")
+        else:
+            # CUDA cannot be used after fork; workers load their own copy
+            context = multiprocessing.get_context("spawn")
+
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(config, model, threads)
+        )
+
+    @staticmethod
+    def _longest_first(files: List[Path]) -> List[Path]:
+        """Order files by estimated duration, longest first."""
+        return sorted(files, key=estimate_duration, reverse=True)
+
+    def _run(self, files: List[Path], task,
+             on_complete: Optional[Callable[[Path, Any], None]] = None) -> List[Tuple[Path, Any]]:
+        """Run a worker task over files and collect (file, result or exception) pairs."""
+        if not files:
+            return []
+
+        workers = min(self.workers, len(files))
+        outcomes = []
+        with self._executor(workers) as executor:
+            futures = {
+                executor.submit(task, str(file_path)): file_path
+                for file_path in self._longest_first(files)
+            }
+            for future in as_completed(futures):
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    outcome = e
+                outcomes.append((futures[future], outcome))
+                if on_complete is not None:
+                    on_complete(futures[future], outcome)
+        return outcomes
+
+    def process_files(self, files: List[Path],
+                      on_complete: Optional[Callable[[Path, Any, Optional[float]], None]] = None
+                      ) -> Dict[str, Union[str, List[str]]]:
+        """
+        Transcribe files and write their outputs from the worker processes.
+
+        Args:
+            files (List[Path]): Audio files to process.
+            on_complete (Optional[Callable]): Called in the parent as
+                ``on_complete(file, output or exception, elapsed seconds)`` as
+                soon as each file finishes.
+
+        Returns:
+            Dict[str, Union[str, List[str]]]: Mapping of input files to output
+                file(s) or error messages.
+        """
+        summary = self.transcriber.profile_summary
+        metrics = self.transcriber.metrics
+
+        def report(file_path: Path, outcome: Any) -> None:
+            if not isinstance(outcome, Exception):
+                _apply_writes(self.transcriber, outcome[4])
+            if summary is not None and not isinstance(outcome, Exception):
+                summary.extend(outcome[2])
+            if metrics is not None and not isinstance(outcome, Exception) and outcome[3]:
+                metrics.registry.merge(outcome[3])
+            if on_complete is None:
+                return
+            if isinstance(outcome, Exception):
+                on_complete(file_path, outcome, None)
+            else:
+                on_complete(file_path, outcome[0], outcome[1])
+
+        results = {}
+        for file_path, outcome in self._run(files, _process_in_worker, report):
+            if isinstance(outcome, Exception):
+                results[str(file_path)] = f"Error: {str(outcome)}"
+            else:
+                results[str(file_path)] = outcome[0]
+        return {str(file_path): results[str(file_path)] for file_path in files}
+
+    def transcribe_files(self, files: List[Path]) -> Dict[str, Dict[str, Any]]:
+        """
+        Transcribe files and return compact results to the caller.
+
+        Args:
+            files (List[Path]): Audio files to transcribe.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Mapping of input files to compact results
+                (see ``compact_result``), or to ``{"error": message}`` on failure.
+        """
+        def report(file_path: Path, outcome: Any) -> None:
+            if not isinstance(outcome, Exception):
+                _apply_writes(self.transcriber, outcome[1])
+
+        results = {}
+        for file_path, outcome in self._run(files, _transcribe_in_worker, report):
+            if isinstance(outcome, Exception):
+                results[str(file_path)] = {"error": str(outcome)}
+            else:
+                results[str(file_path)] = outcome[0]
+        return {str(file_path): results[str(file_path)] for file_path in files}
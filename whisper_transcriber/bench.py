@@ -0,0 +1,433 @@
+import os
+import json
+import time
+import argparse
+import platform
+import tempfile
+import dataclasses
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Sequence, TYPE_CHECKING
+
+from .config import TranscriptionConfig
+from .output_handler import OutputHandler
+from .metrics import peak_rss_bytes
+
+if TYPE_CHECKING:
+    import numpy as np
+    from torch import nn
+
+# Output formats timed by the formatting benchmark
+FORMATS = ("txt", "json", "srt", "vtt")
+
+# Sample rate of the synthetic audio, matching whisper's input
+SAMPLE_RATE = 16000
+
+
+def synthetic_audio(duration: float, seed: int = 0) -> "np.ndarray":
+    """
+    Generate deterministic speech-like audio.
+
+    The signal alternates voiced phrases (harmonics of a slowly gliding
+    pitch, modulated at a syllable rate of about 4 Hz) with pauses, over a
+    low noise floor, so that voice activity detection, chunking and decoding
+    see roughly the structure of real speech. The same duration and seed
+    always give the same samples.
+
+    Args:
+        duration (float): Length in seconds.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        np.ndarray: 16 kHz mono float32 waveform in [-1, 1].
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    num_samples = int(duration * SAMPLE_RATE)
+    audio = rng.normal(0.0, 0.003, num_samples).astype(np.float32)
+
+    start = 0
+    while start < num_samples:
+        phrase = int(rng.uniform(1.0, 4.0) * SAMPLE_RATE)
+        pause = int(rng.uniform(0.2, 1.0) * SAMPLE_RATE)
+        end = min(start + phrase, num_samples)
+        t = np.arange(end - start) / SAMPLE_RATE
+
+        f0 = rng.uniform(90.0, 240.0) * (1.0 + 0.1 * np.sin(2 * np.pi * rng.uniform(0.3, 1.0) * t))
+        phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 8))
+        syllables = np.clip(np.sin(2 * np.pi * rng.uniform(3.0, 5.0) * t), 0.0, None)
+        audio[start:end] += (0.3 * voiced * syllables).astype(np.float32)
+
+        start = end + pause
+
+    return np.clip(audio, -1.0, 1.0)
+
+
+def write_synthetic_files(directory: Path, durations: Sequence[float], files_per_duration: int = 1,
+                          seed: int = 0) -> List[Path]:
+    """
+    Write synthetic WAV files for benchmarking.
+
+    Args:
+        directory (Path): Directory to write to.
+        durations (Sequence[float]): File lengths in seconds.
+        files_per_duration (int, optional): Files written per length. Defaults to 1.
+        seed (int, optional): Base random seed. Defaults to 0.
+
+    Returns:
+        List[Path]: Paths of the written files.
+    """
+    import soundfile as sf
+
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for duration in durations:
+        for index in range(files_per_duration):
+            path = directory / f"synthetic-{duration:g}s-{index}.wav"
+            audio = synthetic_audio(duration, seed + len(paths))
+            sf.write(str(path), audio, SAMPLE_RATE, subtype="PCM_16")
+            paths.append(path)
+    return paths
+
+
+def stub_model(seed: int = 0) -> "nn.Module":
+    """
+    Build a randomly initialized Whisper model with minimal layers.
+
+    It has the real input and vocabulary sizes, so the whole transcription
+    pipeline runs unchanged, but needs no download and decodes in a
+    fraction of the time of ``tiny``. The text it produces is meaningless;
+    use it to measure the package's own overhead, not model speed.
+
+    Args:
+        seed (int, optional): Seed for the weights. Defaults to 0.
+
+    Returns:
+        nn.Module: The model, on CPU.
+    """
+    import torch
+    from whisper.model import ModelDimensions, Whisper
+
+    torch.manual_seed(seed)
+    dims = ModelDimensions(
+        n_mels=80, n_audio_ctx=1500, n_audio_state=64, n_audio_head=2, n_audio_layer=1,
+        n_vocab=51865, n_text_ctx=448, n_text_state=64, n_text_head=2, n_text_layer=1
+    )
+    return Whisper(dims).eval()
+
+
+def _stub_registry():
+    """Create a model registry that hands out stub models instead of loading checkpoints."""
+    from .model_registry import ModelRegistry
+    from .precision import convert_model
+
+    class StubModelRegistry(ModelRegistry):
+        def _load(self, model_name, device, dtype, cache_dir=None, snapshot=False):
+            return convert_model(stub_model().to(device), dtype)
+
+    return StubModelRegistry()
+
+
+def _percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """Return the q-th percentile (0-100) of values, interpolating linearly."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Return the peak resident set size of this process and its children, in megabytes."""
+    peak = peak_rss_bytes()
+    return peak / (1024 * 1024) if peak is not None else None
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    Word error rate of a hypothesis against a reference transcript.
+
+    Args:
+        reference (str): Reference text.
+        hypothesis (str): Text to score.
+
+    Returns:
+        float: Word-level edit distance divided by the number of reference words.
+    """
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+    if not ref:
+        return float(bool(hyp))
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def benchmark_formatting(handler: OutputHandler, results: List[Dict[str, Any]],
+                         repeat: int = 20) -> Dict[str, Dict[str, float]]:
+    """
+    Time formatting transcription results in every output format.
+
+    Args:
+        handler (OutputHandler): Output handler to format with.
+        results (List[Dict[str, Any]]): Transcription results.
+        repeat (int, optional): Times each result is formatted. Defaults to 20.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Per format, milliseconds per result and segments per second.
+    """
+    segments = sum(len(result.get("segments", [])) for result in results) * repeat
+    report = {}
+    for output_format in FORMATS:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for result in results:
+                handler.format_output(result, output_format)
+        elapsed = time.perf_counter() - started
+        report[output_format] = {
+            "ms_per_result": 1000 * elapsed / max(1, repeat * len(results)),
+            "segments_per_s": segments / elapsed if elapsed > 0 else None
+        }
+    return report
+
+
+def benchmark_model(config: TranscriptionConfig, audio_dir: str, stub: bool = False,
+                    workers: Sequence[int] = (1,), batch_sizes: Sequence[int] = (1,),
+                    engine: str = "thread") -> Dict[str, Any]:
+    """
+    Benchmark one model configuration on a directory of audio files.
+
+    Measures model load time, per-file ``transcribe`` latency, directory
+    throughput for every worker count and batch size, and output formatting.
+    The first file is transcribed once before timing to warm up.
+
+    Args:
+        config (TranscriptionConfig): Model and decoding settings. Caching and
+            manifests should be disabled.
+        audio_dir (str): Directory of audio files.
+        stub (bool, optional): Use ``stub_model`` instead of loading the model. Defaults to False.
+        workers (Sequence[int], optional): Worker counts for ``process_directory``. Defaults to (1,).
+        batch_sizes (Sequence[int], optional): Batch sizes for ``process_directory``. Defaults to (1,).
+        engine (str, optional): Parallel engine, "thread" or "process". Defaults to "thread".
+
+    Returns:
+        Dict[str, Any]: Measurements, plus the transcript of each file under
+        "texts". "precision" is the requested precision and
+        "precision_effective" the one the model ran in.
+    """
+    from .model_registry import ModelRegistry
+    from .transcriber import WhisperTranscriber
+    from .batch import estimate_duration
+
+    registry = _stub_registry() if stub else ModelRegistry()
+    # The transcriber falls back to fp32 where bf16 is unsupported
+    precision = config.precision
+    started = time.perf_counter()
+    transcriber = WhisperTranscriber(config, registry=registry)
+    load_time = time.perf_counter() - started
+
+    files = transcriber._find_audio_files(Path(audio_dir))
+    durations = {str(path): estimate_duration(path) for path in files}
+    total_audio = sum(durations.values())
+
+    try:
+        if files:
+            transcriber.transcribe(files[0])
+
+        latencies = []
+        results = []
+        texts = {}
+        for path in files:
+            started = time.perf_counter()
+            result = transcriber.transcribe(path)
+            latencies.append(time.perf_counter() - started)
+            results.append(result)
+            texts[path.name] = result["text"]
+
+        directory_runs = []
+        for worker_count in workers:
+            for batch_size in batch_sizes:
+                with tempfile.TemporaryDirectory(prefix="whisper-bench-") as output_dir:
+                    run_config = dataclasses.replace(
+                        transcriber.config,
+                        num_workers=worker_count,
+                        batch_engine=engine,
+                        batch_size=batch_size,
+                        output_dir=output_dir
+                    )
+                    with WhisperTranscriber(run_config, registry=registry) as run_transcriber:
+                        started = time.perf_counter()
+                        run_transcriber.process_directory(audio_dir)
+                        elapsed = time.perf_counter() - started
+                directory_runs.append({
+                    "workers": worker_count,
+                    "batch_size": batch_size,
+                    "engine": engine,
+                    "elapsed_s": elapsed,
+                    "rtf": elapsed / total_audio if total_audio else None,
+                    "files_per_hour": 3600 * len(files) / elapsed if elapsed > 0 else None
+                })
+
+        formatting = benchmark_formatting(transcriber.output_handler, results)
+    finally:
+        transcriber.close()
+
+    transcribe_time = sum(latencies)
+    return {
+        "model": config.model_name,
+        "precision": precision,
+        "precision_effective": transcriber.config.precision,
+        "stub": stub,
+        "model_load_s": load_time,
+        "files": len(files),
+        "audio_s": total_audio,
+        "transcribe": {
+            "latency_p50_s": _percentile(latencies, 50),
+            "latency_p95_s": _percentile(latencies, 95),
+            "rtf": transcribe_time / total_audio if total_audio else None,
+            "files_per_hour": 3600 * len(files) / transcribe_time if transcribe_time > 0 else None
+        },
+        "directory": directory_runs,
+        "formatting": formatting,
+        "peak_rss_mb": _peak_rss_mb(),
+        "texts": texts
+    }
+
+
+def run_benchmark(audio_dir: str, models: Sequence[str] = ("tiny",), precisions: Sequence[str] = ("fp32",),
+                  stub: bool = False, workers: Sequence[int] = (1,), batch_sizes: Sequence[int] = (1,),
+                  engine: str = "thread", isolate: bool = True) -> Dict[str, Any]:
+    """
+    Benchmark every model and precision on a directory of audio files.
+
+    Each model configuration runs in a fresh process when ``isolate`` is set,
+    so load times are cold and peak memory is per configuration. Precisions
+    other than fp32 are scored by word error rate against the fp32
+    transcripts of the same model, when fp32 is part of the run. A
+    precision the device does not support runs as fp32; its entry is marked
+    "skipped" and not scored.
+
+    Args:
+        audio_dir (str): Directory of audio files.
+        models (Sequence[str], optional): Whisper model names. Defaults to ("tiny",).
+        precisions (Sequence[str], optional): Weight precisions. Defaults to ("fp32",).
+        stub (bool, optional): Use ``stub_model`` instead of loading models. Defaults to False.
+        workers (Sequence[int], optional): Worker counts for directory runs. Defaults to (1,).
+        batch_sizes (Sequence[int], optional): Batch sizes for directory runs. Defaults to (1,).
+        engine (str, optional): Parallel engine, "thread" or "process". Defaults to "thread".
+        isolate (bool, optional): Run each configuration in its own process. Defaults to True.
+
+    Returns:
+        Dict[str, Any]: Report with environment details and one entry per configuration.
+    """
+    runs = []
+    for model_name in models:
+        texts = {}
+        for precision in precisions:
+            config = TranscriptionConfig(model_name=model_name, precision=precision)
+            args = (config, audio_dir, stub, tuple(workers), tuple(batch_sizes), engine)
+            if isolate:
+                import multiprocessing
+                with ProcessPoolExecutor(max_workers=1,
+                                         mp_context=multiprocessing.get_context("spawn")) as executor:
+                    run = executor.submit(benchmark_model, *args).result()
+            else:
+                run = benchmark_model(*args)
+
+            run_texts = run.pop("texts")
+            if run["precision_effective"] != precision:
+                # Not a measurement of the requested precision; keep it out of the scoring
+                run["skipped"] = f"{precision} unsupported, ran as {run['precision_effective']}"
+                runs.append(run)
+                continue
+
+            texts[precision] = run_texts
+            reference = texts.get("fp32")
+            if reference is not None and precision != "fp32":
+                rates = [word_error_rate(reference[name], text) for name, text in run_texts.items()]
+                run["wer_vs_fp32"] = sum(rates) / len(rates) if rates else None
+            runs.append(run)
+
+    return {"environment": environment(), "runs": runs}
+
+
+def environment() -> Dict[str, Any]:
+    """Describe the machine and library versions a benchmark ran with."""
+    import torch
+    import whisper
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "torch": torch.__version__,
+        "torch_threads": torch.get_num_threads(),
+        "whisper": whisper.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    }
+
+
+def main():
+    """Run the benchmark suite and print or save the JSON report."""
+    parser = argparse.ArgumentParser(description="Benchmark Whisper transcription throughput, latency and memory")
+    parser.add_argument("--models", nargs="+", default=["tiny"], help="Whisper models to benchmark")
+    parser.add_argument("--precisions", nargs="+", default=["fp32"], choices=["fp32", "bf16", "int8"],
+                        help="Weight precisions to compare (include fp32 to score the others)")
+    parser.add_argument("--stub", action="store_true",
+                        help="Use a small randomly initialized model instead of downloaded weights")
+    parser.add_argument("--audio-dir",
+                        help="Benchmark these audio files instead of synthetic ones")
+    parser.add_argument("--durations", type=float, nargs="+", default=[10.0, 60.0],
+                        help="Lengths in seconds of the synthetic files")
+    parser.add_argument("--files", type=int, default=2,
+                        help="Synthetic files generated per length")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic audio")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1],
+                        help="Worker counts for the directory benchmark")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1],
+                        help="Batch sizes for the directory benchmark")
+    parser.add_argument("--engine", default="thread", choices=["thread", "process"],
+                        help="Parallel engine for the directory benchmark")
+    parser.add_argument("--no-isolate", action="store_true",
+                        help="Run all configurations in this process (load times are then warm)")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="whisper-bench-") as temp_dir:
+        audio_dir = args.audio_dir
+        if audio_dir is None:
+            audio_dir = temp_dir
+            write_synthetic_files(Path(temp_dir), args.durations, args.files, args.seed)
+
+        report = run_benchmark(
+            audio_dir,
+            models=args.models,
+            precisions=args.precisions,
+            stub=args.stub,
+            workers=args.workers,
+            batch_sizes=args.batch_sizes,
+            engine=args.engine,
+            isolate=not args.no_isolate
+        )
+        report["settings"] = vars(args)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, Union, List, Tuple
+
+from .config import TranscriptionConfig
+
+# Configuration fields that change what the model produces
+DECODING_FIELDS = (
+    "model_name",
+    "device",
+    "precision",
+    "language",
+    "language_hints",
+    "task",
+    "temperature",
+    "compression_ratio_threshold",
+    "logprob_threshold",
+    "no_speech_threshold",
+    "condition_on_previous_text",
+    "initial_prompt",
+    "word_timestamps",
+    "prepend_punctuations",
+    "append_punctuations",
+    "clip_timestamps",
+    "hallucination_silence_threshold",
+    "chunked",
+    "chunk_length",
+    "chunk_overlap",
+    "vad",
+    "fallback",
+    "batch_size"
+)
+
+# Read size used when hashing audio files
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class ResultCache:
+    """
+    On-disk cache of raw transcription results.
+
+    Entries are keyed by a hash of the audio bytes and of the configuration
+    fields that affect decoding, so the same audio transcribed with the same
+    settings is only decoded once. Output formatting and segment filtering
+    are not part of the key and run on every lookup. Entries are written
+    atomically and evicted least-recently-used first when the cache grows
+    beyond ``max_bytes``.
+
+    The size is tracked by the process that writes, so worker processes set
+    ``pending`` to a list: their entries are collected there instead of
+    written, and ``drain`` hands them to the parent to ``put``.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], max_bytes: Optional[int] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir (Union[str, Path]): Directory holding cache entries.
+            max_bytes (Optional[int]): Maximum total size of entries. Defaults to None (unbounded).
+        """
+        self.cache_dir = Path(cache_dir).expanduser()
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+        self.pending: Optional[List[Tuple[str, Dict[str, Any]]]] = None
+
+    @staticmethod
+    def audio_digest(audio_path: Union[str, Path]) -> str:
+        """
+        Hash the contents of an audio file.
+
+        Args:
+            audio_path (Union[str, Path]): Path to the audio file.
+
+        Returns:
+            str: Hex SHA-256 digest of the file bytes.
+        """
+        digest = hashlib.sha256()
+        with open(audio_path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def key(self, audio_path: Union[str, Path], config: TranscriptionConfig,
+            language: Optional[str] = None) -> str:
+        """
+        Build the cache key for an audio file and configuration.
+
+        Args:
+            audio_path (Union[str, Path]): Path to the audio file.
+            config (TranscriptionConfig): Transcription configuration.
+            language (Optional[str]): Language the file is decoded in when it is
+                resolved outside the configuration, e.g. from language hints.
+                Defaults to ``config.language``.
+
+        Returns:
+            str: Hex cache key.
+        """
+        settings = config.to_dict()
+        decoding = {name: settings[name] for name in DECODING_FIELDS}
+        if language is not None:
+            decoding["language"] = language
+        payload = json.dumps(
+            {"audio": self.audio_digest(audio_path), "config": decoding},
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result.
+
+        Args:
+            key (str): Cache key from ``key``.
+
+        Returns:
+            Optional[Dict[str, Any]]: The cached result, or None on a miss.
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        # Mark the entry as recently used for eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Store a result, replacing any existing entry atomically.
+
+        Args:
+            key (str): Cache key from ``key``.
+            result (Dict[str, Any]): Raw transcription result.
+        """
+        if self.pending is not None:
+            with self._lock:
+                self.pending.append((key, result))
+            return
+
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False)
+            size = os.path.getsize(tmp_path)
+            previous = path.stat().st_size if path.exists() else 0
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        with self._lock:
+            if self._size is not None:
+                self._size += size - previous
+            self._evict()
+
+    def drain(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Return the entries collected in ``pending`` and reset it.
+
+        Returns:
+            List[Tuple[str, Dict[str, Any]]]: (key, result) pairs, for ``put``.
+        """
+        with self._lock:
+            entries = self.pending or []
+            if self.pending is not None:
+                self.pending = []
+        return entries
+
+    def _scan(self):
+        """Return (mtime, size, path) for every entry in the cache."""
+        entries = []
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits ``max_bytes``."""
+        if self.max_bytes is None:
+            return
+
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._scan())
+        if self._size <= self.max_bytes:
+            return
+
+        for _, size, path in sorted(self._scan()):
+            if self._size <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        with self._lock:
+            for _, _, path in self._scan():
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            self._size = 0
@@ -0,0 +1,116 @@
+from typing import Dict, Any, List, Tuple, Union
+
+import numpy as np
+from whisper.audio import HOP_LENGTH, SAMPLE_RATE
+
+from .audio import WindowedAudio
+
+# Length of the frames used to look for quiet split points, in seconds
+ENERGY_FRAME = 0.1
+
+# Number of energy frames read at a time
+ENERGY_BLOCK = 600
+
+
+def find_chunk_boundaries(audio: Union[np.ndarray, WindowedAudio], chunk_length: float,
+                          search_window: float = 15.0) -> List[Tuple[int, int]]:
+    """
+    Split audio into chunks of roughly ``chunk_length`` seconds at quiet points.
+
+    Around every multiple of ``chunk_length`` the quietest 100 ms frame within
+    ``search_window`` seconds is chosen as the split point, so that chunks
+    break in pauses rather than mid-word.
+
+    Args:
+        audio (Union[np.ndarray, WindowedAudio]): 16 kHz mono waveform.
+        chunk_length (float): Target chunk length in seconds.
+        search_window (float, optional): Seconds to search on either side of
+            each target split point. Defaults to 15.0.
+
+    Returns:
+        List[Tuple[int, int]]: (start, end) sample indices of each chunk.
+    """
+    frame = int(ENERGY_FRAME * SAMPLE_RATE)
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return [(0, len(audio))]
+
+    # Per-frame energy, computed once for the whole file a block at a time
+    energy = np.empty(n_frames)
+    for start in range(0, n_frames, ENERGY_BLOCK):
+        count = min(ENERGY_BLOCK, n_frames - start)
+        block = audio[start * frame:(start + count) * frame].reshape(count, frame)
+        energy[start:start + count] = np.square(block, dtype=np.float64).mean(axis=1)
+
+    chunk_frames = max(1, int(chunk_length / ENERGY_FRAME))
+    window_frames = int(search_window / ENERGY_FRAME)
+
+    cuts = [0]
+    target = chunk_frames
+    while target < n_frames - chunk_frames // 4:
+        low = max(cuts[-1] + 1, target - window_frames)
+        high = min(n_frames, target + window_frames + 1)
+        cut = low + int(np.argmin(energy[low:high]))
+        cuts.append(cut)
+        target = cut + chunk_frames
+
+    boundaries = [cut * frame for cut in cuts] + [len(audio)]
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _shift_segment(segment: Dict[str, Any], offset: float) -> Dict[str, Any]:
+    """Return a copy of a segment moved ``offset`` seconds later."""
+    shifted = dict(segment)
+    shifted['start'] = segment['start'] + offset
+    shifted['end'] = segment['end'] + offset
+    if 'seek' in segment:
+        shifted['seek'] = segment['seek'] + round(offset * SAMPLE_RATE / HOP_LENGTH)
+    if 'words' in segment:
+        shifted['words'] = [
+            {**word, 'start': word['start'] + offset, 'end': word['end'] + offset}
+            for word in segment['words']
+        ]
+    return shifted
+
+
+def stitch_chunks(chunk_results: List[Dict[str, Any]], chunks: List[Tuple[int, int]],
+                  boundaries: List[Tuple[int, int]]) -> Dict[str, Any]:
+    """
+    Merge per-chunk results into one result on the global timeline.
+
+    Each chunk was transcribed with some overlap into its neighbours. A
+    segment is kept only by the chunk whose boundaries contain its
+    midpoint, and a segment repeating the text of the previously kept one
+    is dropped, so words at a seam appear once.
+
+    Args:
+        chunk_results (List[Dict[str, Any]]): Results of ``model.transcribe`` per chunk.
+        chunks (List[Tuple[int, int]]): (start, end) samples actually transcribed,
+            including overlap.
+        boundaries (List[Tuple[int, int]]): (start, end) samples owned by each chunk.
+
+    Returns:
+        Dict[str, Any]: Combined result with text, segments and language.
+    """
+    segments = []
+    for result, (chunk_start, _), (own_start, own_end) in zip(chunk_results, chunks, boundaries):
+        offset = chunk_start / SAMPLE_RATE
+        for segment in result.get('segments', []):
+            shifted = _shift_segment(segment, offset)
+            midpoint = (shifted['start'] + shifted['end']) / 2
+            if not own_start / SAMPLE_RATE <= midpoint < own_end / SAMPLE_RATE:
+                continue
+            if segments and shifted['text'].strip() and \
+                    shifted['text'].strip() == segments[-1]['text'].strip():
+                continue
+            segments.append(shifted)
+
+    for i, segment in enumerate(segments):
+        segment['id'] = i
+
+    language = next((result.get('language') for result in chunk_results if result.get('language')), None)
+    return {
+        'text': "".join(segment['text'] for segment in segments),
+        'segments': segments,
+        'language': language
+    }
@@ -0,0 +1,257 @@
+import json
+import argparse
+from pathlib import Path
+
+from .config import TranscriptionConfig, VADConfig, LiveConfig, FallbackConfig
+
+
+def main():
+    """Command-line interface for the transcriber with extended options."""
+    parser = argparse.ArgumentParser(description="Advanced Whisper Audio Transcription Tool")
+    
+    # Basic arguments
+    parser.add_argument("input_path",
+                      help="Path to audio file or directory, or a PCM source with --live")
+    parser.add_argument("--model", default="base", help="Whisper model to use")
+    parser.add_argument("--language", help="Language of the audio (optional)")
+    parser.add_argument("--detect-language", action="store_true",
+                      help="Only detect the language of the input file(s) and print it as JSON")
+    parser.add_argument("--language-hints", action="store_true",
+                      help="Reuse the language detected for earlier files of the same directory (or speaker)")
+    parser.add_argument("--language-hints-file",
+                      help="JSONL file keeping detected languages across runs (implies --language-hints)")
+    parser.add_argument("--language-hint-pattern",
+                      help="Regex whose first group names the speaker in file names, e.g. '^([a-z]+)_'")
+    parser.add_argument("--task", default="transcribe", choices=["transcribe", "translate"],
+                      help="Task to perform (transcribe or translate)")
+    parser.add_argument("--device", default="cpu", choices=["cpu", "cuda"],
+                      help="Device to use for computation")
+    parser.add_argument("--precision", default="fp32", choices=["fp32", "bf16", "int8"],
+                      help="Model weight precision (int8 quantizes Linear layers, CPU only)")
+    parser.add_argument("--model-cache-dir",
+                      help="Directory for cached bf16/int8 models (defaults to ~/.cache/whisper-transcriber)")
+    parser.add_argument("--snapshot", action="store_true",
+                      help="Memory-map the model from a snapshot in the model cache (written on first use) "
+                           "for near-instant start-up and weights shared between processes")
+    parser.add_argument("--model-memory-budget-mb", type=float,
+                      help="Megabytes of model weights kept loaded before idle models are evicted")
+    parser.add_argument("--output-dir", default="transcriptions",
+                      help="Directory to save output files")
+    parser.add_argument("--format", nargs="+", default=["srt"], choices=["txt", "json", "srt", "vtt"],
+                      help="Output format(s); the audio is transcribed once for all of them")
+    
+    # Advanced Whisper options
+    parser.add_argument("--verbose", action="store_true", help="Enable verbose output")
+    parser.add_argument("--temperature", type=float, nargs="+", default=[0.0, 0.2, 0.4, 0.6, 0.8, 1.0],
+                      help="Sampling temperatures for decoding")
+    parser.add_argument("--compression-ratio-threshold", type=float, default=2.4,
+                      help="Compression ratio threshold for filtering")
+    parser.add_argument("--logprob-threshold", type=float, default=-1.0,
+                      help="Log probability threshold for filtering")
+    parser.add_argument("--no-speech-threshold", type=float, default=0.6,
+                      help="No speech threshold for filtering")
+    parser.add_argument("--word-timestamps", action="store_true",
+                      help="Enable word-level timestamps")
+    parser.add_argument("--initial-prompt", help="Initial text prompt for transcription")
+    parser.add_argument("--max-segment-length", type=int,
+                      help="Maximum length of transcription segments")
+    parser.add_argument("--min-segment-length", type=int,
+                      help="Minimum length of transcription segments")
+    parser.add_argument("--segment-store", action="store_true",
+                      help="Keep segments in compact columnar storage (less memory for long word-timestamped results)")
+    
+    # Temperature fallback limits
+    parser.add_argument("--max-fallbacks-per-window", type=int,
+                      help="Most retries at higher temperatures for one 30-second window")
+    parser.add_argument("--max-fallbacks-per-file", type=int,
+                      help="Most temperature retries over all windows of a file")
+    parser.add_argument("--fallback-seconds", type=float,
+                      help="Most seconds spent on temperature retries per file")
+    parser.add_argument("--fallback-window-seconds", type=float,
+                      help="Most seconds spent on temperature retries of one 30-second window")
+    
+    # Result cache options
+    parser.add_argument("--cache-dir",
+                      help="Directory for cached transcription results (enables caching)")
+    parser.add_argument("--cache-max-mb", type=float, default=1024.0,
+                      help="Maximum size of the result cache in megabytes")
+    parser.add_argument("--no-cache", action="store_true",
+                      help="Disable the result cache even if --cache-dir is given")
+    
+    # Job manifest options
+    parser.add_argument("--manifest",
+                      help="Path of a JSONL job manifest recording per-file progress")
+    parser.add_argument("--resume", action="store_true",
+                      help="Skip files already completed according to the job manifest")
+    
+    # Voice activity detection options
+    parser.add_argument("--vad", action="store_true",
+                      help="Skip non-speech audio with an energy-based voice activity detector")
+    parser.add_argument("--vad-threshold", type=float, default=12.0,
+                      help="Energy above the noise floor (dB) treated as speech")
+    parser.add_argument("--vad-min-silence", type=float, default=0.5,
+                      help="Shortest pause in seconds that is skipped")
+    parser.add_argument("--vad-pad", type=float, default=0.2,
+                      help="Seconds of audio kept around each speech region")
+    
+    # Batch processing options
+    parser.add_argument("--workers", type=int, default=1,
+                      help="Number of files to transcribe in parallel when processing a directory")
+    parser.add_argument("--engine", default="thread", choices=["thread", "process"],
+                      help="Parallel engine for directory processing (threads or worker processes)")
+    parser.add_argument("--batch-size", type=int, default=1,
+                      help="Number of short clips (up to 30 s) decoded together in one forward pass")
+    parser.add_argument("--prefetch-workers", type=int, default=2,
+                      help="Threads decoding upcoming files while the model runs (0 disables)")
+    parser.add_argument("--prefetch-max-mb", type=float, default=512.0,
+                      help="Maximum decoded audio held by the prefetch queue in megabytes")
+    
+    # Long audio options
+    parser.add_argument("--chunked", action="store_true",
+                      help="Split long audio at pauses and transcribe the chunks in parallel")
+    parser.add_argument("--chunk-length", type=float, default=300.0,
+                      help="Target chunk length in seconds for chunked transcription")
+    parser.add_argument("--chunk-workers", type=int,
+                      help="Number of chunks transcribed in parallel (defaults to CPU count)")
+    parser.add_argument("--windowed-read-threshold", type=float, default=1800.0,
+                      help="Read WAV/FLAC/OGG files longer than this many seconds window by window "
+                           "instead of decoding them into memory")
+    parser.add_argument("--stream", action="store_true",
+                      help="Write segments to the output files as soon as they are decoded")
+    
+    # Profiling options
+    parser.add_argument("--profile", action="store_true",
+                      help="Record per-stage timings and print a summary of where the time went")
+    
+    # Metrics options
+    parser.add_argument("--metrics-port", type=int,
+                      help="Serve Prometheus metrics on this local port while running")
+    parser.add_argument("--metrics-file",
+                      help="Write Prometheus metrics to this file periodically (textfile collector format)")
+    parser.add_argument("--metrics-interval", type=float, default=15.0,
+                      help="Seconds between writes of --metrics-file")
+    
+    # Live transcription options
+    parser.add_argument("--live", action="store_true",
+                      help="Transcribe raw 16-bit PCM from INPUT_PATH as it arrives: '-' for stdin, "
+                           "a named pipe, or tcp://HOST:PORT / unix://PATH to listen on a local socket")
+    parser.add_argument("--latency", type=float, default=2.0,
+                      help="Seconds of new audio between live decodes")
+    parser.add_argument("--sample-rate", type=int, default=16000,
+                      help="Sample rate of the live PCM input")
+    parser.add_argument("--channels", type=int, default=1,
+                      help="Number of interleaved channels in the live PCM input")
+    
+    args = parser.parse_args()
+    
+    # Imported after argument parsing so --help does not load torch and whisper
+    from .transcriber import WhisperTranscriber
+    from .live import run_live
+    from .metrics import MetricsServer, MetricsFileWriter
+    
+    config = TranscriptionConfig(
+        model_name=args.model,
+        language=args.language,
+        task=args.task,
+        device=args.device,
+        precision=args.precision,
+        model_cache_dir=args.model_cache_dir,
+        model_snapshot=args.snapshot,
+        model_memory_budget_mb=args.model_memory_budget_mb,
+        output_dir=args.output_dir,
+        output_format=args.format[0] if len(args.format) == 1 else args.format,
+        verbose=args.verbose,
+        temperature=tuple(args.temperature),
+        compression_ratio_threshold=args.compression_ratio_threshold,
+        logprob_threshold=args.logprob_threshold,
+        no_speech_threshold=args.no_speech_threshold,
+        word_timestamps=args.word_timestamps,
+        initial_prompt=args.initial_prompt,
+        max_segment_length=args.max_segment_length,
+        min_segment_length=args.min_segment_length,
+        segment_store=args.segment_store,
+        num_workers=args.workers,
+        batch_engine=args.engine,
+        batch_size=args.batch_size,
+        prefetch_workers=args.prefetch_workers,
+        prefetch_max_mb=args.prefetch_max_mb,
+        chunked=args.chunked,
+        chunk_length=args.chunk_length,
+        chunk_workers=args.chunk_workers,
+        windowed_read_threshold=args.windowed_read_threshold,
+        streaming=args.stream,
+        profile=args.profile,
+        language_hints=args.language_hints or args.language_hints_file is not None,
+        language_hints_path=args.language_hints_file,
+        language_hint_pattern=args.language_hint_pattern,
+        metrics=args.metrics_port is not None or args.metrics_file is not None,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        cache_max_mb=args.cache_max_mb,
+        manifest_path=args.manifest,
+        resume=args.resume,
+        vad=VADConfig(
+            enabled=args.vad,
+            threshold_db=args.vad_threshold,
+            min_silence_duration=args.vad_min_silence,
+            speech_pad=args.vad_pad
+        ),
+        fallback=FallbackConfig(
+            enabled=any(limit is not None for limit in (
+                args.max_fallbacks_per_window, args.max_fallbacks_per_file, args.fallback_seconds,
+                args.fallback_window_seconds
+            )),
+            max_per_window=args.max_fallbacks_per_window,
+            max_per_file=args.max_fallbacks_per_file,
+            max_seconds=args.fallback_seconds,
+            max_window_seconds=args.fallback_window_seconds
+        )
+    )
+    
+    # Started before the model loads so its load time is visible while running
+    exporters = []
+    if args.metrics_port is not None:
+        exporters.append(MetricsServer(port=args.metrics_port).start())
+    if args.metrics_file is not None:
+        exporters.append(MetricsFileWriter(args.metrics_file, interval=args.metrics_interval).start())
+    
+    transcriber = WhisperTranscriber(config)
+    input_path = Path(args.input_path)
+    
+    try:
+        if args.live:
+            live_config = LiveConfig(
+                sample_rate=args.sample_rate,
+                channels=args.channels,
+                latency=args.latency
+            )
+            output_paths = run_live(transcriber, args.input_path, live_config)
+            print(f"Transcription saved to: {', '.join(output_paths)}")
+        elif args.detect_language and (input_path.is_file() or input_path.is_dir()):
+            files = [input_path] if input_path.is_file() else transcriber._find_audio_files(input_path)
+            print(json.dumps(transcriber.detect_language(files), indent=2))
+        elif input_path.is_file():
+            output_path = transcriber.process_file(input_path)
+            if isinstance(output_path, list):
+                output_path = ", ".join(output_path)
+            print(f"Transcription saved to: {output_path}")
+        elif input_path.is_dir():
+            results = transcriber.process_directory(input_path)
+            print("\nTranscription Results:")
+            for input_file, output_file in results.items():
+                if isinstance(output_file, list):
+                    output_file = ", ".join(output_file)
+                print(f"\n{input_file} -> {output_file}")
+        else:
+            print(f"Error: Path not found: {input_path}")
+        
+        if transcriber.profile_summary is not None and transcriber.profile_summary.files:
+            print("\nProfile Summary:")
+            print(json.dumps(transcriber.profile_summary.to_dict(), indent=2))
+    except Exception as e:
+        print(f"Error: {str(e)}")
+    finally:
+        for exporter in exporters:
+            exporter.stop()
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,79 @@
-from dataclasses import dataclass, field
+import os
+import re
+from dataclasses import dataclass, field, asdict
 from typing import Optional, Dict, Any, Union, List, Tuple
 
-import whisper
+# Model names shipped with whisper, checked without importing it (and torch)
+WHISPER_MODELS = (
+    "tiny.en", "tiny", "base.en", "base", "small.en", "small", "medium.en", "medium",
+    "large-v1", "large-v2", "large-v3", "large", "large-v3-turbo", "turbo"
+)
+
+@dataclass
+class VADConfig:
+    """Voice activity detection settings used to skip non-speech audio."""
+    enabled: bool = False
+    threshold_db: float = 12.0  # Energy above the estimated noise floor that counts as speech
+    max_threshold_db: float = -35.0  # Frames louder than this (dBFS) always count as loud enough
+    speech_band_ratio: float = 0.3  # Minimum share of frame energy in the 300-3400 Hz band
+    min_speech_duration: float = 0.25  # Shorter bursts are discarded (seconds)
+    min_silence_duration: float = 0.5  # Shorter pauses are kept as speech (seconds)
+    speech_pad: float = 0.2  # Padding added around each speech region (seconds)
+    frame_duration: float = 0.03  # Analysis frame length (seconds)
+
+    def validate(self) -> None:
+        """Validate voice activity detection settings."""
+        if self.frame_duration <= 0:
+            raise ValueError("vad.frame_duration must be positive")
+        
+        for name in ("min_speech_duration", "min_silence_duration", "speech_pad"):
+            if getattr(self, name) < 0:
+                raise ValueError(f"vad.{name} cannot be negative")
+        
+        if not 0.0 <= self.speech_band_ratio <= 1.0:
+            raise ValueError("vad.speech_band_ratio must be between 0 and 1")
+
+@dataclass
+class FallbackConfig:
+    """Limits on temperature fallback that bound the decoding time of difficult audio."""
+    enabled: bool = False
+    max_per_window: Optional[int] = None  # Most retries at higher temperatures for one 30-second window
+    max_per_file: Optional[int] = None  # Most retries over all windows of a file
+    max_seconds: Optional[float] = None  # Most seconds spent on retries per file
+    max_window_seconds: Optional[float] = None  # Most seconds spent on retries of one 30-second window
+    skip_silence: bool = True  # Don't retry windows whose no_speech_prob exceeds no_speech_threshold
+
+    def validate(self) -> None:
+        """Validate temperature fallback limits."""
+        for name in ("max_per_window", "max_per_file"):
+            if getattr(self, name) is not None and getattr(self, name) < 0:
+                raise ValueError(f"fallback.{name} cannot be negative")
+        
+        for name in ("max_seconds", "max_window_seconds"):
+            if getattr(self, name) is not None and getattr(self, name) < 0:
+                raise ValueError(f"fallback.{name} cannot be negative")
+
+@dataclass
+class LiveConfig:
+    """Settings for live transcription of a raw PCM stream."""
+    sample_rate: int = 16000  # Sample rate of the incoming signed 16-bit little-endian PCM
+    channels: int = 1  # Number of interleaved channels in the incoming PCM
+    latency: float = 2.0  # Seconds of new audio between decodes of the buffer
+    max_buffer: float = 30.0  # Buffered seconds after which pending segments are committed
+
+    def validate(self) -> None:
+        """Validate live transcription settings."""
+        if self.sample_rate <= 0:
+            raise ValueError("live.sample_rate must be positive")
+        
+        if self.channels < 1:
+            raise ValueError("live.channels must be a positive integer")
+        
+        if self.latency <= 0:
+            raise ValueError("live.latency must be positive")
+        
+        if not self.latency < self.max_buffer <= 30.0:
+            raise ValueError("live.max_buffer must be greater than live.latency and at most 30 seconds")
 
 @dataclass
 class TranscriptionConfig:
@@ -11,8 +83,12 @@ class TranscriptionConfig:
     language: Optional[str] = None
     task: str = "transcribe"
     device: str = "cpu"
+    precision: str = "fp32"  # Model weight precision: fp32, bf16 or int8 (CPU only)
+    model_cache_dir: Optional[str] = None  # Where bf16/int8 models are cached (defaults to ~/.cache/whisper-transcriber)
+    model_snapshot: bool = False  # Memory-map weights from a snapshot in model_cache_dir, writing it on first use
+    model_memory_budget_mb: Optional[float] = None  # Model weights the process-wide registry keeps loaded before evicting idle models (None leaves it unchanged)
     output_dir: str = "transcriptions"
-    output_format: str = "srt"
+    output_format: Union[str, List[str]] = "srt"  # One format or a list of formats
 
     # Advanced Whisper transcription options
     verbose: Optional[bool] = None
@@ -37,30 +113,106 @@ class TranscriptionConfig:
     # Additional filtering options
     max_segment_length: Optional[int] = None  # Maximum length of transcription segments
     min_segment_length: Optional[int] = None  # Minimum length of transcription segments
+    segment_store: bool = False  # Keep result segments in a columnar SegmentStore instead of a list of dicts
+    
+    # Long audio options
+    chunked: bool = False  # Split long audio into chunks transcribed in parallel
+    chunk_length: float = 300.0  # Target chunk length in seconds
+    chunk_overlap: float = 2.0  # Seconds each chunk extends into its neighbours
+    chunk_workers: Optional[int] = None  # Parallel chunk workers (defaults to CPU count)
+    windowed_read_threshold: Optional[float] = 1800.0  # Read WAV/FLAC/OGG files longer than this (seconds) window by window
+    
+    # Streaming options
+    streaming: bool = False  # Write segments to the output files as each window is decoded
+    
+    # Voice activity detection
+    vad: VADConfig = field(default_factory=VADConfig)
+    
+    # Temperature fallback limits
+    fallback: FallbackConfig = field(default_factory=FallbackConfig)
+    
+    # Language detection options
+    language_hints: bool = False  # Reuse the language detected for earlier files of the same directory or speaker
+    language_hints_path: Optional[str] = None  # JSONL file keeping detected languages across runs
+    language_hint_pattern: Optional[str] = None  # Regex whose first group names the speaker in file names
+    language_hint_min_files: int = 2  # Agreeing detections needed before a source's language is reused
+    
+    # Result cache options
+    cache_dir: Optional[str] = None  # Directory for cached results; None disables caching
+    cache_max_mb: Optional[float] = 1024.0  # Maximum cache size in megabytes
     
+    # Job manifest options
+    manifest_path: Optional[str] = None  # JSONL file recording per-file batch progress
+    resume: bool = False  # Skip files the manifest records as completed
+    
+    # Batch processing options
+    num_workers: int = 1  # Number of files transcribed in parallel by process_directory
+    batch_engine: str = "thread"  # Parallel engine: "thread" or "process"
+    batch_size: int = 1  # Number of short clips decoded together in one forward pass
+    prefetch_workers: int = 2  # Threads decoding upcoming files while the model runs (0 disables)
+    prefetch_max_mb: Optional[float] = 512.0  # Maximum decoded audio waiting in the prefetch queue
+    
+    # Profiling options
+    profile: bool = False  # Add per-stage timings to results and summarize them over batch runs
+    metrics: bool = False  # Record files, audio seconds and stage latency in the process-wide metrics
+    
+    def __post_init__(self) -> None:
+        if isinstance(self.vad, dict):
+            self.vad = VADConfig(**self.vad)
+        if isinstance(self.fallback, dict):
+            self.fallback = FallbackConfig(**self.fallback)
+
+    @property
+    def use_fp16(self) -> bool:
+        """Whether whisper should decode in fp16 (GPU with fp32 weights only)."""
+        return self.device != "cpu" and self.precision == "fp32"
+
+    @property
+    def output_formats(self) -> List[str]:
+        """Requested output formats as a list, without duplicates."""
+        if isinstance(self.output_format, str):
+            return [self.output_format]
+        return list(dict.fromkeys(self.output_format))
+
     def validate(self) -> None:
         """Validate configuration settings with extended checks."""
         # Existing validations
         valid_tasks = ["transcribe", "translate"]
         valid_devices = ["cpu", "cuda"]
         valid_formats = ["txt", "json", "srt", "vtt"]
+        valid_engines = ["thread", "process"]
+        valid_precisions = ["fp32", "bf16", "int8"]
         
         if self.task not in valid_tasks:
             raise ValueError(f"Task must be one of {valid_tasks}")
         
         if self.device not in valid_devices:
             raise ValueError(f"Device must be one of {valid_devices}")
+        
+        if self.precision not in valid_precisions:
+            raise ValueError(f"Precision must be one of {valid_precisions}")
+        
+        if self.precision == "int8" and self.device != "cpu":
+            raise ValueError("int8 precision is only supported on CPU")
             
-        if self.output_format not in valid_formats:
-            raise ValueError(f"Output format must be one of {valid_formats}")
+        if not self.output_formats:
+            raise ValueError("At least one output format is required")
+        
+        for output_format in self.output_formats:
+            if output_format not in valid_formats:
+                raise ValueError(f"Output format must be one of {valid_formats}")
         
-        # Validate model
-        try:
-            whisper.load_model(self.model_name)
-        except Exception as e:
-            raise ValueError(f"Invalid model name: {self.model_name}") from e
+        # Validate model name without loading weights; whisper also accepts checkpoint paths.
+        # Only names missing from the built-in list need whisper itself, e.g. newer models.
+        if self.model_name not in WHISPER_MODELS and not os.path.isfile(self.model_name):
+            import whisper
+            if self.model_name not in whisper.available_models():
+                raise ValueError(f"Invalid model name: {self.model_name}")
         
         # Additional validations for new parameters
+        if self.model_memory_budget_mb is not None and self.model_memory_budget_mb < 0:
+            raise ValueError("model_memory_budget_mb cannot be negative")
+        
         if self.max_segment_length is not None and self.max_segment_length <= 0:
             raise ValueError("max_segment_length must be a positive integer")
         
@@ -70,6 +222,57 @@ class TranscriptionConfig:
         if self.min_segment_length and self.max_segment_length:
             if self.min_segment_length > self.max_segment_length:
                 raise ValueError("min_segment_length cannot be greater than max_segment_length")
+        
+        if self.num_workers < 1:
+            raise ValueError("num_workers must be a positive integer")
+        
+        if self.batch_engine not in valid_engines:
+            raise ValueError(f"Batch engine must be one of {valid_engines}")
+        
+        if self.batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        
+        if self.prefetch_workers < 0:
+            raise ValueError("prefetch_workers cannot be negative")
+        
+        if self.prefetch_max_mb is not None and self.prefetch_max_mb <= 0:
+            raise ValueError("prefetch_max_mb must be positive")
+        
+        if self.chunk_length <= 0:
+            raise ValueError("chunk_length must be positive")
+        
+        if self.chunk_overlap < 0:
+            raise ValueError("chunk_overlap cannot be negative")
+        
+        if self.chunk_workers is not None and self.chunk_workers < 1:
+            raise ValueError("chunk_workers must be a positive integer")
+        
+        if self.windowed_read_threshold is not None and self.windowed_read_threshold < 0:
+            raise ValueError("windowed_read_threshold cannot be negative")
+        
+        if self.cache_max_mb is not None and self.cache_max_mb <= 0:
+            raise ValueError("cache_max_mb must be positive")
+        
+        if self.language_hint_min_files < 1:
+            raise ValueError("language_hint_min_files must be a positive integer")
+        
+        if self.language_hint_pattern is not None:
+            try:
+                pattern = re.compile(self.language_hint_pattern)
+            except re.error as e:
+                raise ValueError(f"Invalid language_hint_pattern: {e}")
+            if pattern.groups < 1:
+                raise ValueError("language_hint_pattern must contain a group naming the speaker")
+        
+        self.vad.validate()
+        self.fallback.validate()
+        
+        # Fallback limits need the package's window loop, which has neither option
+        if self.fallback.enabled:
+            if self.clip_timestamps not in ('0', [0], [0.0]):
+                raise ValueError("clip_timestamps cannot be combined with fallback limits")
+            if self.hallucination_silence_threshold is not None:
+                raise ValueError("hallucination_silence_threshold cannot be combined with fallback limits")
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert configuration to dictionary format with extended options."""
@@ -78,6 +281,10 @@ class TranscriptionConfig:
             "language": self.language,
             "task": self.task,
             "device": self.device,
+            "precision": self.precision,
+            "model_cache_dir": self.model_cache_dir,
+            "model_snapshot": self.model_snapshot,
+            "model_memory_budget_mb": self.model_memory_budget_mb,
             "output_dir": self.output_dir,
             "output_format": self.output_format,
             "verbose": self.verbose,
@@ -93,7 +300,31 @@ class TranscriptionConfig:
             "clip_timestamps": self.clip_timestamps,
             "hallucination_silence_threshold": self.hallucination_silence_threshold,
             "max_segment_length": self.max_segment_length,
-            "min_segment_length": self.min_segment_length
+            "min_segment_length": self.min_segment_length,
+            "segment_store": self.segment_store,
+            "chunked": self.chunked,
+            "chunk_length": self.chunk_length,
+            "chunk_overlap": self.chunk_overlap,
+            "chunk_workers": self.chunk_workers,
+            "windowed_read_threshold": self.windowed_read_threshold,
+            "streaming": self.streaming,
+            "vad": asdict(self.vad),
+            "fallback": asdict(self.fallback),
+            "language_hints": self.language_hints,
+            "language_hints_path": self.language_hints_path,
+            "language_hint_pattern": self.language_hint_pattern,
+            "language_hint_min_files": self.language_hint_min_files,
+            "cache_dir": self.cache_dir,
+            "cache_max_mb": self.cache_max_mb,
+            "manifest_path": self.manifest_path,
+            "resume": self.resume,
+            "num_workers": self.num_workers,
+            "batch_engine": self.batch_engine,
+            "batch_size": self.batch_size,
+            "prefetch_workers": self.prefetch_workers,
+            "prefetch_max_mb": self.prefetch_max_mb,
+            "profile": self.profile,
+            "metrics": self.metrics
         }
 
     @classmethod
@@ -0,0 +1,551 @@
+import time
+import threading
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union, Generator
+
+import numpy as np
+import torch
+import whisper
+from whisper.audio import HOP_LENGTH, N_FFT, N_FRAMES, N_SAMPLES, SAMPLE_RATE, mel_filters
+from whisper.decoding import DecodingOptions, DecodingResult
+from whisper.tokenizer import Tokenizer, get_tokenizer
+
+from .audio import WindowedAudio
+from .config import TranscriptionConfig
+from .profiling import stage
+
+# Mel frames per output token, and seconds per timestamp token
+INPUT_STRIDE = 2
+TIME_PRECISION = INPUT_STRIDE * HOP_LENGTH / SAMPLE_RATE
+
+
+def temperature_schedule(config: TranscriptionConfig) -> Tuple[float, ...]:
+    """Return the configured temperatures as a tuple."""
+    if isinstance(config.temperature, (int, float)):
+        return (float(config.temperature),)
+    return tuple(config.temperature)
+
+
+def needs_fallback(result: DecodingResult, config: TranscriptionConfig) -> bool:
+    """
+    Decide whether a decoding result should be retried at a higher temperature.
+
+    Mirrors the checks whisper applies in ``transcribe``.
+
+    Args:
+        result (DecodingResult): Decoding result for one window.
+        config (TranscriptionConfig): Transcription configuration.
+
+    Returns:
+        bool: True if the result is too repetitive or too improbable.
+    """
+    fallback = False
+    if (config.compression_ratio_threshold is not None and
+            result.compression_ratio > config.compression_ratio_threshold):
+        fallback = True  # too repetitive
+    if (config.logprob_threshold is not None and
+            result.avg_logprob < config.logprob_threshold):
+        fallback = True  # average log probability is too low
+    if (config.no_speech_threshold is not None and
+            result.no_speech_prob > config.no_speech_threshold and
+            config.logprob_threshold is not None and
+            result.avg_logprob < config.logprob_threshold):
+        fallback = False  # silence
+    return fallback
+
+
+def is_silent(result: DecodingResult, config: TranscriptionConfig) -> bool:
+    """Return True if whisper would skip the window as containing no speech."""
+    if config.no_speech_threshold is None:
+        return False
+    should_skip = result.no_speech_prob > config.no_speech_threshold
+    if config.logprob_threshold is not None and result.avg_logprob > config.logprob_threshold:
+        # Don't skip if the log probability is high enough, despite no_speech_prob
+        should_skip = False
+    return should_skip
+
+
+class FallbackBudget:
+    """
+    Temperature fallback left for one file, with statistics on its use.
+
+    Enforces the limits of ``config.fallback``: retries per window, retries
+    per file and seconds spent on retries per file and per window, and stops
+    retrying windows that look silent. One budget can be shared by the
+    threads transcribing chunks of the same file.
+
+    The time limits are best-effort: a retry is only started when the
+    seconds already spent plus the duration of the window's previous decode
+    fit the limit, but a decode that has started is not interrupted, so a
+    retry much slower than the one before it can still overrun.
+    """
+
+    def __init__(self, config: TranscriptionConfig):
+        """
+        Initialize a full budget.
+
+        Args:
+            config (TranscriptionConfig): Transcription configuration.
+        """
+        self.config = config
+        self.temperatures = temperature_schedule(config)
+        self.retries = 0
+        self.retry_seconds = 0.0
+        self.attempts = [0] * len(self.temperatures)  # Windows decoded at each temperature
+        self.accepted = [0] * len(self.temperatures)  # Windows whose result came from each temperature
+        self.cut_short = 0  # Windows still failing the quality checks when the budget stopped them
+        self.silence_exits = 0  # Windows not retried because they looked silent
+        self._lock = threading.Lock()
+
+    def allows_retry(self, result: DecodingResult, attempt: int, window_seconds: float = 0.0,
+                     expected_seconds: float = 0.0) -> bool:
+        """
+        Decide whether a window that needs fallback may be decoded again.
+
+        Args:
+            result (DecodingResult): The window's latest result.
+            attempt (int): Index of the temperature the retry would use.
+            window_seconds (float, optional): Seconds already spent on retries
+                of this window. Defaults to 0.
+            expected_seconds (float, optional): Expected duration of the retry,
+                e.g. that of the window's previous decode. Defaults to 0.
+
+        Returns:
+            bool: True if the retry fits the budget.
+        """
+        limits = self.config.fallback
+        if (limits.skip_silence and self.config.no_speech_threshold is not None and
+                result.no_speech_prob > self.config.no_speech_threshold):
+            with self._lock:
+                self.silence_exits += 1
+            return False
+        with self._lock:
+            allowed = (
+                (limits.max_per_window is None or attempt <= limits.max_per_window) and
+                (limits.max_per_file is None or self.retries < limits.max_per_file) and
+                (limits.max_seconds is None or
+                 self.retry_seconds + expected_seconds < limits.max_seconds) and
+                (limits.max_window_seconds is None or
+                 window_seconds + expected_seconds < limits.max_window_seconds)
+            )
+            if allowed:
+                self.retries += 1
+            else:
+                self.cut_short += 1
+            return allowed
+
+    def record(self, attempt: int, seconds: float) -> None:
+        """Record one window decoded at temperature index ``attempt`` in ``seconds``."""
+        with self._lock:
+            self.attempts[attempt] += 1
+            if attempt > 0:
+                self.retry_seconds += seconds
+
+    def accept(self, attempt: int) -> None:
+        """Record the temperature index a window's final result was decoded at."""
+        with self._lock:
+            self.accepted[attempt] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Describe how the budget was used.
+
+        Returns:
+            Dict[str, Any]: Retries and seconds spent on them, windows decoded
+                and accepted per temperature, and windows cut short or not
+                retried because they looked silent.
+        """
+        with self._lock:
+            return {
+                "retries": self.retries,
+                "retry_seconds": self.retry_seconds,
+                "temperatures": [
+                    {"temperature": t, "attempts": attempts, "accepted": accepted}
+                    for t, attempts, accepted in zip(self.temperatures, self.attempts, self.accepted)
+                ],
+                "cut_short": self.cut_short,
+                "silence_exits": self.silence_exits
+            }
+
+
+def decode_batch(model: torch.nn.Module, mel: torch.Tensor, config: TranscriptionConfig,
+                 budgets: Optional[Sequence[FallbackBudget]] = None,
+                 **decode_options: Any) -> List[DecodingResult]:
+    """
+    Decode a batch of 30-second windows with temperature fallback.
+
+    The whole batch is decoded at the first temperature; only the windows
+    that fail the quality checks are decoded again, reusing the encoder
+    output from the first pass. With budgets, a window is only retried while
+    its budget allows it, assuming the retry takes as long as the window's
+    previous decode; otherwise it keeps its latest result.
+
+    Args:
+        model (torch.nn.Module): Whisper model.
+        mel (torch.Tensor): Log-mel spectrograms of shape (batch, n_mels, 3000).
+        config (TranscriptionConfig): Transcription configuration.
+        budgets (Optional[Sequence[FallbackBudget]]): Fallback budget of each
+            window's file, in batch order. Defaults to unlimited fallback.
+        **decode_options: Extra ``DecodingOptions`` fields (language, prompt, fp16...).
+
+    Returns:
+        List[DecodingResult]: One result per window.
+    """
+    temperatures = temperature_schedule(config)
+    results: List[Optional[DecodingResult]] = [None] * mel.shape[0]
+    attempts = [0] * mel.shape[0]
+    last_seconds = [0.0] * mel.shape[0]  # Share of the latest decode of each window
+    retry_seconds = [0.0] * mel.shape[0]  # Seconds spent on retries of each window
+    pending = list(range(mel.shape[0]))
+    audio_features = None
+
+    for attempt, t in enumerate(temperatures):
+        if attempt > 0 and budgets is not None:
+            pending = [
+                index for index in pending
+                if budgets[index].allows_retry(results[index], attempt, retry_seconds[index], last_seconds[index])
+            ]
+            if not pending:
+                break
+
+        options = DecodingOptions(
+            task=config.task,
+            temperature=t,
+            **decode_options
+        )
+        inputs = mel[pending] if audio_features is None else audio_features[pending]
+        started = time.perf_counter()
+        decoded = model.decode(inputs, options)
+        elapsed = time.perf_counter() - started
+
+        if audio_features is None:
+            audio_features = torch.stack([result.audio_features for result in decoded])
+
+        still_pending = []
+        for index, result in zip(pending, decoded):
+            results[index] = result
+            attempts[index] = attempt
+            last_seconds[index] = elapsed / len(pending)
+            if attempt > 0:
+                retry_seconds[index] += last_seconds[index]
+            if budgets is not None:
+                budgets[index].record(attempt, last_seconds[index])
+            if needs_fallback(result, config):
+                still_pending.append(index)
+        pending = still_pending
+        if not pending:
+            break
+
+    if budgets is not None:
+        for budget, attempt in zip(budgets, attempts):
+            budget.accept(attempt)
+    return results
+
+
+def tokens_to_segments(tokens: List[int], tokenizer: Tokenizer, result: DecodingResult,
+                       time_offset: float, duration: float, seek: int = 0,
+                       include_unfinished: bool = True) -> List[Dict[str, Any]]:
+    """
+    Split the tokens decoded for one window into timestamped segments.
+
+    Follows whisper's rules: consecutive timestamp tokens close a segment,
+    and text without closing timestamps runs to the end of the window.
+
+    Args:
+        tokens (List[int]): Decoded tokens, including timestamp tokens.
+        tokenizer (Tokenizer): Tokenizer used for decoding.
+        result (DecodingResult): Decoding result the tokens belong to.
+        time_offset (float): Start time of the window in seconds.
+        duration (float): Duration of audio in the window in seconds.
+        seek (int, optional): Mel frame offset of the window. Defaults to 0.
+        include_unfinished (bool, optional): Keep text after the last closed
+            segment. Disable when the next window resumes from the last
+            timestamp, as in ``iter_segments``. Defaults to True.
+
+    Returns:
+        List[Dict[str, Any]]: Segments in whisper's result format, without ids.
+    """
+    def new_segment(start: float, end: float, segment_tokens: List[int]) -> Dict[str, Any]:
+        text_tokens = [token for token in segment_tokens if token < tokenizer.eot]
+        return {
+            "seek": seek,
+            "start": start,
+            "end": end,
+            "text": tokenizer.decode(text_tokens),
+            "tokens": segment_tokens,
+            "temperature": result.temperature,
+            "avg_logprob": result.avg_logprob,
+            "compression_ratio": result.compression_ratio,
+            "no_speech_prob": result.no_speech_prob
+        }
+
+    timestamp_begin = tokenizer.timestamp_begin
+    is_timestamp = [token >= timestamp_begin for token in tokens]
+    consecutive = [
+        i + 1 for i in range(len(tokens) - 1)
+        if is_timestamp[i] and is_timestamp[i + 1]
+    ]
+
+    segments = []
+    if consecutive:
+        slices = consecutive
+        if is_timestamp[-2:] == [False, True]:
+            slices = slices + [len(tokens)]
+
+        last_slice = 0
+        for current_slice in slices:
+            sliced = tokens[last_slice:current_slice]
+            segments.append(new_segment(
+                time_offset + (sliced[0] - timestamp_begin) * TIME_PRECISION,
+                time_offset + (sliced[-1] - timestamp_begin) * TIME_PRECISION,
+                sliced
+            ))
+            last_slice = current_slice
+
+        # Text after the last closed segment runs to the end of the window
+        remaining = tokens[last_slice:]
+        if include_unfinished and any(token < tokenizer.eot for token in remaining):
+            start = segments[-1]["end"] if segments else time_offset
+            segments.append(new_segment(start, time_offset + duration, remaining))
+    else:
+        end = duration
+        timestamps = [token for token in tokens if token >= timestamp_begin]
+        if timestamps and timestamps[-1] != timestamp_begin:
+            end = (timestamps[-1] - timestamp_begin) * TIME_PRECISION
+        segments.append(new_segment(time_offset, time_offset + end, tokens))
+
+    return segments
+
+
+def clear_empty_segments(segments: List[Dict[str, Any]]) -> None:
+    """Blank out instantaneous or empty segments in place, like whisper does after word timing."""
+    for segment in segments:
+        if segment["start"] == segment["end"] or segment["text"].strip() == "":
+            segment["text"] = ""
+            segment["tokens"] = []
+            segment["words"] = []
+
+
+def seek_advance(tokens: List[int], tokenizer: Tokenizer, segment_size: int) -> int:
+    """
+    Return how many mel frames whisper advances after decoding a window.
+
+    Args:
+        tokens (List[int]): Decoded tokens of the window.
+        tokenizer (Tokenizer): Tokenizer used for decoding.
+        segment_size (int): Number of mel frames of audio in the window.
+
+    Returns:
+        int: The whole window, or up to the last timestamp when the window
+            ends in an unfinished segment.
+    """
+    timestamp_begin = tokenizer.timestamp_begin
+    is_timestamp = [token >= timestamp_begin for token in tokens]
+    consecutive = [
+        i + 1 for i in range(len(tokens) - 1)
+        if is_timestamp[i] and is_timestamp[i + 1]
+    ]
+    if not consecutive or is_timestamp[-2:] == [False, True]:
+        return segment_size
+    return (tokens[consecutive[-1] - 1] - timestamp_begin) * INPUT_STRIDE
+
+
+def window_tokenizer(model: torch.nn.Module, language: Optional[str], task: str) -> Tokenizer:
+    """Return the tokenizer matching a model, language and task."""
+    return get_tokenizer(
+        model.is_multilingual,
+        num_languages=model.num_languages,
+        language=language or "en",
+        task=task
+    )
+
+
+def add_words(segments: List[Dict[str, Any]], model: torch.nn.Module, tokenizer: Tokenizer,
+              mel: torch.Tensor, num_frames: int, config: TranscriptionConfig,
+              last_speech_timestamp: float = 0.0) -> None:
+    """Attach word-level timestamps to the segments of one window in place."""
+    from whisper.timing import add_word_timestamps
+
+    with stage("word_timestamps"):
+        add_word_timestamps(
+            segments=segments,
+            model=model,
+            tokenizer=tokenizer,
+            mel=mel,
+            num_frames=num_frames,
+            prepend_punctuations=config.prepend_punctuations,
+            append_punctuations=config.append_punctuations,
+            last_speech_timestamp=last_speech_timestamp
+        )
+
+
+class MelWindows:
+    """
+    Log-Mel spectrogram of a waveform, sliced into decoding windows.
+
+    In-memory waveforms get their whole spectrogram computed at once, as
+    ``whisper.transcribe`` does. For windowed audio each window is computed
+    from just the samples under it (plus STFT context), after a first pass
+    over the file finds the global maximum that whisper's normalization
+    clamps against, so the windows match the whole-file spectrogram.
+    """
+
+    def __init__(self, audio: Union[np.ndarray, WindowedAudio], n_mels: int):
+        """
+        Prepare the spectrogram.
+
+        Args:
+            audio (Union[np.ndarray, WindowedAudio]): 16 kHz mono waveform.
+            n_mels (int): Number of Mel bins of the model.
+        """
+        self.audio = audio
+        self.n_mels = n_mels
+        self.content_frames = len(audio) // HOP_LENGTH
+
+        with stage("mel"):
+            if isinstance(audio, WindowedAudio):
+                self._mel = None
+                self._filters = mel_filters("cpu", n_mels)
+                self._window = torch.hann_window(N_FFT)
+                # Whisper pads 30 seconds of silence and drops the last STFT frame
+                total_frames = (len(audio) + N_SAMPLES) // HOP_LENGTH
+                self._max = max(
+                    self._log_spec(start, min(N_FRAMES, total_frames - start)).max().item()
+                    for start in range(0, total_frames, N_FRAMES)
+                )
+            else:
+                # Pad 30 seconds of silence so that every window can be sliced out
+                self._mel = whisper.log_mel_spectrogram(audio, n_mels, padding=N_SAMPLES)
+
+    def _samples(self, start: int, end: int) -> np.ndarray:
+        """Samples of the audio followed by silence, for any range past the start."""
+        samples = np.zeros(end - start, dtype=np.float32)
+        audio = self.audio[max(0, start):max(0, min(end, len(self.audio)))]
+        samples[max(0, -start):max(0, -start) + len(audio)] = audio
+        return samples
+
+    def _log_spec(self, start: int, count: int) -> torch.Tensor:
+        """Unnormalized log10 Mel frames ``start`` to ``start + count``."""
+        pad = N_FFT // 2
+        first = start * HOP_LENGTH - pad
+        samples = self._samples(max(0, first), (start + count - 1) * HOP_LENGTH + pad)
+        if first < 0:
+            # torch.stft reflect-pads the start of the signal
+            samples = np.concatenate((self._samples(1, pad + 1)[::-1][pad + first:], samples))
+
+        stft = torch.stft(torch.from_numpy(samples), N_FFT, HOP_LENGTH, window=self._window,
+                          center=False, return_complex=True)
+        mel_spec = self._filters @ (stft.abs() ** 2)
+        return torch.clamp(mel_spec, min=1e-10).log10()
+
+    def window(self, seek: int, segment_size: int) -> torch.Tensor:
+        """
+        Return frames ``seek`` to ``seek + segment_size``, padded to a full window.
+
+        Args:
+            seek (int): First Mel frame.
+            segment_size (int): Number of frames of content.
+
+        Returns:
+            torch.Tensor: Normalized log-Mel window of ``N_FRAMES`` frames.
+        """
+        if self._mel is not None:
+            return whisper.pad_or_trim(self._mel[:, seek:seek + segment_size], N_FRAMES)
+
+        with stage("mel"):
+            log_spec = torch.maximum(self._log_spec(seek, segment_size), torch.tensor(self._max - 8.0))
+            return whisper.pad_or_trim((log_spec + 4.0) / 4.0, N_FRAMES)
+
+
+def iter_segments(model: torch.nn.Module, audio: Union[np.ndarray, WindowedAudio], config: TranscriptionConfig,
+                  language: str, budget: Optional[FallbackBudget] = None
+                  ) -> Generator[Dict[str, Any], None, Dict[str, Any]]:
+    """
+    Transcribe a waveform window by window, yielding segments as they are decoded.
+
+    Runs the same sliding 30-second window loop as ``whisper.transcribe``
+    (prompting with previous text, temperature fallback, silence skipping
+    and word timestamps), but hands each window's segments to the caller
+    before decoding the next one. ``clip_timestamps`` and
+    ``hallucination_silence_threshold`` are not applied.
+
+    Args:
+        model (torch.nn.Module): Whisper model.
+        audio (Union[np.ndarray, WindowedAudio]): 16 kHz mono waveform.
+        config (TranscriptionConfig): Transcription configuration.
+        language (str): Language to decode in.
+        budget (Optional[FallbackBudget]): Temperature fallback budget of the
+            file. Defaults to unlimited fallback.
+
+    Yields:
+        Dict[str, Any]: Segments in whisper's result format, with ids.
+
+    Returns:
+        Dict[str, Any]: Text and language of the complete transcription.
+    """
+    mel = MelWindows(audio, model.dims.n_mels)
+    content_frames = mel.content_frames
+    tokenizer = window_tokenizer(model, language, config.task)
+    fp16 = config.use_fp16
+
+    all_tokens: List[int] = []
+    initial_prompt_tokens: List[int] = []
+    if config.initial_prompt is not None:
+        initial_prompt_tokens = tokenizer.encode(" " + config.initial_prompt.strip())
+        all_tokens.extend(initial_prompt_tokens)
+    prompt_reset_since = 0
+    last_speech_timestamp = 0.0
+    segment_id = 0
+    seek = 0
+
+    while seek < content_frames:
+        time_offset = seek * HOP_LENGTH / SAMPLE_RATE
+        segment_size = min(N_FRAMES, content_frames - seek)
+        mel_segment = mel.window(seek, segment_size).to(model.device)
+
+        decoded = decode_batch(
+            model,
+            mel_segment.unsqueeze(0),
+            config,
+            [budget] if budget is not None else None,
+            language=language,
+            prompt=all_tokens[prompt_reset_since:],
+            fp16=fp16
+        )[0]
+        if is_silent(decoded, config):
+            seek += segment_size
+            continue
+
+        segments = tokens_to_segments(
+            decoded.tokens, tokenizer, decoded, time_offset,
+            segment_size * HOP_LENGTH / SAMPLE_RATE, seek, include_unfinished=False
+        )
+        seek += seek_advance(decoded.tokens, tokenizer, segment_size)
+
+        if config.word_timestamps:
+            add_words(segments, model, tokenizer, mel_segment, segment_size, config,
+                      last_speech_timestamp)
+            word_ends = [word["end"] for segment in segments for word in segment.get("words", [])]
+            last_end = word_ends[-1] if word_ends else (segments[-1]["end"] if segments else None)
+            single_timestamp_ending = [token >= tokenizer.timestamp_begin
+                                       for token in decoded.tokens[-2:]] == [False, True]
+            # Resume right after the last word unless no speech follows it
+            if word_ends and not single_timestamp_ending and word_ends[-1] > time_offset:
+                seek = round(word_ends[-1] * SAMPLE_RATE / HOP_LENGTH)
+            if last_end is not None:
+                last_speech_timestamp = last_end
+        clear_empty_segments(segments)
+
+        for segment in segments:
+            segment = {"id": segment_id, **segment}
+            segment_id += 1
+            yield segment
+            all_tokens.extend(segment["tokens"])
+
+        if not config.condition_on_previous_text or decoded.temperature > 0.5:
+            # Do not prompt with text decoded at a high temperature
+            prompt_reset_since = len(all_tokens)
+
+    return {
+        "text": tokenizer.decode(all_tokens[len(initial_prompt_tokens):]),
+        "language": language
+    }
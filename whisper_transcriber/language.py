@@ -0,0 +1,201 @@
+import re
+import json
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Any, Optional, Union, List, Tuple
+
+import numpy as np
+import torch
+import whisper
+from whisper.audio import N_SAMPLES, SAMPLE_RATE
+
+from .audio import WindowedAudio
+from .config import VADConfig
+from .vad import detect_speech
+from .profiling import stage
+
+# Seconds at the start of a file searched for speech to detect its language from
+EXCERPT_SEARCH_SECONDS = 120.0
+
+
+def speech_excerpt(audio: Union[np.ndarray, WindowedAudio], vad_config: Optional[VADConfig] = None,
+                   max_samples: int = N_SAMPLES) -> np.ndarray:
+    """
+    Select up to 30 seconds of speech from the start of a waveform.
+
+    Leading silence, music or hold tones would otherwise fill the single
+    window language detection looks at. Speech regions found by the voice
+    activity detector in the first ``EXCERPT_SEARCH_SECONDS`` are joined;
+    without any, the first 30 seconds are used.
+
+    Args:
+        audio (Union[np.ndarray, WindowedAudio]): 16 kHz mono waveform.
+        vad_config (Optional[VADConfig]): Voice activity detection settings.
+            Defaults to ``VADConfig()``.
+        max_samples (int, optional): Longest excerpt in samples. Defaults to 30 seconds.
+
+    Returns:
+        np.ndarray: The excerpt.
+    """
+    head = np.asarray(audio[:int(EXCERPT_SEARCH_SECONDS * SAMPLE_RATE)])
+    pieces = []
+    remaining = max_samples
+    for start, end in detect_speech(head, vad_config or VADConfig()):
+        pieces.append(head[start:min(end, start + remaining)])
+        remaining -= len(pieces[-1])
+        if remaining <= 0:
+            break
+    if not pieces:
+        return head[:max_samples]
+    return np.concatenate(pieces)
+
+
+def detect_languages(model: torch.nn.Module, excerpts: List[np.ndarray]) -> List[Tuple[str, float]]:
+    """
+    Detect the language of several excerpts in one batched forward pass.
+
+    Args:
+        model (torch.nn.Module): Whisper model.
+        excerpts (List[np.ndarray]): 16 kHz mono waveforms of up to 30 seconds.
+
+    Returns:
+        List[Tuple[str, float]]: (language code, probability) per excerpt.
+    """
+    if not model.is_multilingual:
+        return [("en", 1.0)] * len(excerpts)
+
+    with stage("mel"):
+        mel = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(excerpt), model.dims.n_mels)
+            for excerpt in excerpts
+        ]).to(model.device)
+    _, probs = model.detect_language(mel)
+
+    detections = []
+    for language_probs in probs:
+        language = max(language_probs, key=language_probs.get)
+        detections.append((language, float(language_probs[language])))
+    return detections
+
+
+class LanguageHints:
+    """
+    Languages detected per audio source, used to skip detection for later files.
+
+    A source is the directory holding a file or, with a ``pattern``, the
+    speaker named by the pattern's first group in the file name. Once
+    ``min_files`` files of a source were detected in the same language, that
+    language is used for its other files. A file detected in another
+    language disables the hint, so mixed-language sources keep being
+    detected per file. Detections can be appended to a JSONL file to carry
+    hints over to later runs and other processes. Worker processes set
+    ``pending`` to a list to collect their detections there instead, and
+    ``drain`` hands them to the parent to ``record`` in the file.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, min_files: int = 2,
+                 pattern: Optional[str] = None):
+        """
+        Initialize the hints, loading any detections already recorded.
+
+        Args:
+            path (Optional[Union[str, Path]]): JSONL file persisting detections.
+                Defaults to None (hints last for the lifetime of the object).
+            min_files (int, optional): Agreeing detections needed before a
+                source's language is trusted. Defaults to 2.
+            pattern (Optional[str]): Regular expression searched in file names
+                whose first group names the source. Files it does not match
+                fall back to their directory.
+        """
+        self.path = Path(path) if path is not None else None
+        self.min_files = min_files
+        self.pattern = re.compile(pattern) if pattern is not None else None
+        self._lock = threading.Lock()
+        self._detections: Dict[str, Counter] = {}
+        self.pending: Optional[List[Tuple[str, str, Optional[float]]]] = None
+        self.load()
+
+    def load(self) -> None:
+        """Read recorded detections from disk, ignoring a truncated final line."""
+        self._detections = {}
+        if self.path is None or not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._detections.setdefault(record["source"], Counter())[record["language"]] += 1
+
+    def source(self, audio_path: Union[str, Path]) -> str:
+        """Return the source an audio file belongs to."""
+        audio_path = Path(audio_path).resolve()
+        if self.pattern is not None:
+            match = self.pattern.search(audio_path.name)
+            if match is not None:
+                return f"{audio_path.parent}/{match.group(1)}"
+        return str(audio_path.parent)
+
+    def get(self, source: str) -> Optional[str]:
+        """
+        Return the language of a source, if its detections agree often enough.
+
+        Args:
+            source (str): Source as returned by ``source``.
+
+        Returns:
+            Optional[str]: Language code, or None when the file must be detected.
+        """
+        with self._lock:
+            detections = self._detections.get(source)
+            if detections is None or len(detections) != 1:
+                return None
+            (language, count), = detections.items()
+            return language if count >= self.min_files else None
+
+    def record(self, source: str, language: str, probability: Optional[float] = None) -> None:
+        """
+        Record a language detected for a file of a source.
+
+        Args:
+            source (str): Source as returned by ``source``.
+            language (str): Detected language code.
+            probability (Optional[float]): Probability of the detection.
+        """
+        with self._lock:
+            self._detections.setdefault(source, Counter())[language] += 1
+            if self.pending is not None:
+                self.pending.append((source, language, probability))
+                return
+            if self.path is None:
+                return
+            line = json.dumps({"source": source, "language": language, "probability": probability},
+                              ensure_ascii=False)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def drain(self) -> List[Tuple[str, str, Optional[float]]]:
+        """
+        Return the detections collected in ``pending`` and reset it.
+
+        Returns:
+            List[Tuple[str, str, Optional[float]]]: (source, language,
+                probability) triples, for ``record``.
+        """
+        with self._lock:
+            detections = self.pending or []
+            if self.pending is not None:
+                self.pending = []
+        return detections
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the detections per source and the language used for each, if any."""
+        with self._lock:
+            sources = {source: dict(detections) for source, detections in self._detections.items()}
+        return {
+            source: {"detections": detections, "language": self.get(source)}
+            for source, detections in sources.items()
+        }
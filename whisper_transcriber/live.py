@@ -0,0 +1,443 @@
+import os
+import sys
+import time
+import socket
+import argparse
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple, BinaryIO, Callable, Generator, TYPE_CHECKING
+
+import numpy as np
+import whisper
+from whisper.audio import HOP_LENGTH, SAMPLE_RATE
+
+from .config import LiveConfig
+from .output_handler import SegmentWriter
+from .audio import load_audio
+from .decoding import (
+    decode_batch, is_silent, tokens_to_segments, clear_empty_segments, window_tokenizer, add_words,
+    FallbackBudget
+)
+
+if TYPE_CHECKING:
+    from .transcriber import WhisperTranscriber
+
+# Bytes per sample of the incoming signed 16-bit PCM
+SAMPLE_WIDTH = 2
+
+# Largest start time difference, in seconds, for a segment to count as unchanged between decodes
+AGREEMENT_TOLERANCE = 0.5
+
+
+def open_pcm_source(source: str) -> BinaryIO:
+    """
+    Open a source of raw PCM audio.
+
+    Args:
+        source (str): ``"-"`` for standard input, ``"tcp://HOST:PORT"`` or
+            ``"unix://PATH"`` to listen on a local socket and read from the
+            first connection, or the path of a named pipe or raw PCM file.
+
+    Returns:
+        BinaryIO: Readable binary stream.
+    """
+    if source == "-":
+        return sys.stdin.buffer
+
+    if source.startswith("tcp://"):
+        host, _, port = source[len("tcp://"):].rpartition(":")
+        server = socket.create_server((host or "127.0.0.1", int(port)))
+    elif source.startswith("unix://"):
+        path = source[len("unix://"):]
+        if os.path.exists(path):
+            os.unlink(path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        server.listen(1)
+    else:
+        return open(source, "rb")
+
+    with server:
+        connection, _ = server.accept()
+    return connection.makefile("rb")
+
+
+class PcmDecoder:
+    """
+    Converts chunks of interleaved 16-bit PCM into a continuous 16 kHz mono waveform.
+
+    Partial frames are carried over to the next chunk and resampling keeps
+    its position across chunks, so chunk boundaries do not affect the output.
+    """
+
+    def __init__(self, config: LiveConfig):
+        """
+        Initialize the decoder.
+
+        Args:
+            config (LiveConfig): Format of the incoming PCM.
+        """
+        self.config = config
+        self._pending = b""
+        self._input_samples = 0
+        self._output_samples = 0
+        self._last_sample = 0.0
+
+    def decode(self, data: bytes) -> np.ndarray:
+        """
+        Decode a chunk of PCM.
+
+        Args:
+            data (bytes): Raw PCM bytes of any length.
+
+        Returns:
+            np.ndarray: float32 16 kHz mono samples.
+        """
+        frame_bytes = SAMPLE_WIDTH * self.config.channels
+        data = self._pending + data
+        usable = len(data) - len(data) % frame_bytes
+        self._pending = data[usable:]
+
+        samples = np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+        if self.config.channels > 1:
+            samples = samples.reshape(-1, self.config.channels).mean(axis=1)
+        if self.config.sample_rate == SAMPLE_RATE or len(samples) == 0:
+            return samples
+        return self._resample(samples)
+
+    def _resample(self, samples: np.ndarray) -> np.ndarray:
+        """Linearly resample a chunk to 16 kHz, continuing from the previous chunk."""
+        start = self._input_samples
+        end = start + len(samples)
+        ratio = self.config.sample_rate / SAMPLE_RATE
+
+        # Output samples whose input position falls inside the samples seen so far
+        last_output = int(np.floor((end - 1) / ratio))
+        positions = np.arange(self._output_samples, last_output + 1) * ratio
+        if start == 0:
+            resampled = np.interp(positions, np.arange(end), samples)
+        else:
+            resampled = np.interp(
+                positions,
+                np.arange(start - 1, end),
+                np.concatenate(([self._last_sample], samples))
+            )
+
+        self._input_samples = end
+        self._output_samples = last_output + 1
+        self._last_sample = samples[-1]
+        return resampled.astype(np.float32)
+
+
+class LiveTranscriber:
+    """
+    Transcription of a live audio stream with bounded latency.
+
+    Audio is appended to a rolling buffer of at most ``max_buffer`` seconds.
+    Every ``latency`` seconds of new audio the buffer is decoded again with
+    the transcriber's decoding options. A segment becomes stable once two
+    consecutive decodes agree on it and it is followed by another segment;
+    the remaining segments are tentative and may still change. Stable
+    segments are removed from the buffer and their text prompts the
+    following decodes. When the buffer is about to overflow, all but the
+    last segment are committed regardless.
+    """
+
+    def __init__(self, transcriber: "WhisperTranscriber", config: Optional[LiveConfig] = None):
+        """
+        Initialize the live transcriber.
+
+        Args:
+            transcriber (WhisperTranscriber): Transcriber providing the model
+                and decoding configuration.
+            config (Optional[LiveConfig]): Live stream settings.
+        """
+        self.transcriber = transcriber
+        self.config = config or LiveConfig()
+        self.config.validate()
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all buffered audio and committed context."""
+        self._decoder = PcmDecoder(self.config)
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._offset = 0.0
+        self._language = self.transcriber.config.language
+        self._decoded_language = self._language
+        self._prompt: Optional[List[int]] = None
+        self._previous: List[Dict[str, Any]] = []
+        self._last_speech_timestamp = 0.0
+        self._segment_id = 0
+
+    @property
+    def buffered(self) -> float:
+        """Seconds of audio waiting in the buffer."""
+        return len(self._buffer) / SAMPLE_RATE
+
+    def feed(self, audio: np.ndarray) -> None:
+        """Append 16 kHz mono samples to the buffer."""
+        self._buffer = np.concatenate((self._buffer, audio))
+
+    def feed_pcm(self, data: bytes) -> None:
+        """Append raw PCM in the configured format to the buffer."""
+        self.feed(self._decoder.decode(data))
+
+    def _decode(self) -> List[Dict[str, Any]]:
+        """Decode the buffer into segments on the stream timeline."""
+        transcriber = self.transcriber
+        model = transcriber.model
+        config = transcriber.config
+
+        language = self._language or transcriber._detect_language(self._buffer)
+        self._decoded_language = language
+        tokenizer = window_tokenizer(model, language, config.task)
+        if self._prompt is None:
+            self._prompt = []
+            if config.initial_prompt is not None:
+                self._prompt = tokenizer.encode(" " + config.initial_prompt.strip())
+
+        mel = whisper.log_mel_spectrogram(
+            whisper.pad_or_trim(self._buffer), model.dims.n_mels
+        ).to(model.device)
+        decoded = decode_batch(
+            model,
+            mel.unsqueeze(0),
+            config,
+            # Each decode is a fresh attempt at the buffer, so only per-window limits apply
+            [FallbackBudget(config)] if config.fallback.enabled else None,
+            language=language,
+            prompt=self._prompt,
+            fp16=config.use_fp16
+        )[0]
+        if is_silent(decoded, config):
+            return []
+
+        segments = tokens_to_segments(decoded.tokens, tokenizer, decoded, self._offset, self.buffered)
+        if config.word_timestamps:
+            add_words(segments, model, tokenizer, mel, len(self._buffer) // HOP_LENGTH, config,
+                      self._last_speech_timestamp)
+        clear_empty_segments(segments)
+        return [segment for segment in segments if segment["text"].strip()]
+
+    @staticmethod
+    def _agrees(segment: Dict[str, Any], previous: Dict[str, Any]) -> bool:
+        """Check whether a segment is unchanged since the previous decode."""
+        return (segment["text"].strip() == previous["text"].strip() and
+                abs(segment["start"] - previous["start"]) <= AGREEMENT_TOLERANCE)
+
+    def step(self, final: bool = False) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Decode the buffered audio and commit the segments that became stable.
+
+        Args:
+            final (bool, optional): The stream has ended; commit every segment.
+
+        Returns:
+            Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: Newly stable
+                segments, with ids, and the current tentative segments.
+        """
+        if len(self._buffer) == 0:
+            return [], []
+
+        segments = self._decode()
+        full = self.buffered >= self.config.max_buffer - self.config.latency
+
+        if final:
+            committed = len(segments)
+        else:
+            committed = 0
+            while (committed < len(segments) - 1 and committed < len(self._previous) and
+                   self._agrees(segments[committed], self._previous[committed])):
+                committed += 1
+            if full:
+                committed = max(committed, len(segments) - 1, min(1, len(segments)))
+
+        stable, tentative = segments[:committed], segments[committed:]
+        self._commit(stable, final, full)
+        self._previous = tentative
+
+        if self.transcriber.config.min_segment_length or self.transcriber.config.max_segment_length:
+            stable = self.transcriber._filter_segments(stable)
+            tentative = self.transcriber._filter_segments(tentative)
+        return stable, tentative
+
+    def _commit(self, stable: List[Dict[str, Any]], final: bool, full: bool) -> None:
+        """Number stable segments and drop their audio from the buffer."""
+        for segment in stable:
+            segment["id"] = self._segment_id
+            self._segment_id += 1
+            for word in segment.get("words", []):
+                self._last_speech_timestamp = word["end"]
+
+        if stable:
+            # Keep decoding in the language of the first committed text
+            self._language = self._language or self._decoded_language
+            if self.transcriber.config.condition_on_previous_text:
+                max_prompt = self.transcriber.model.dims.n_text_ctx // 2 - 1
+                tokens = [token for segment in stable for token in segment["tokens"]]
+                self._prompt = (self._prompt + tokens)[-max_prompt:]
+
+        if final:
+            cut = len(self._buffer)
+        elif stable:
+            cut = int(round((stable[-1]["end"] - self._offset) * SAMPLE_RATE))
+        elif full:
+            # Nothing to commit in a full buffer: keep only the newest audio
+            cut = len(self._buffer) - int(self.config.latency * SAMPLE_RATE)
+        else:
+            cut = 0
+
+        cut = min(max(cut, 0), len(self._buffer))
+        self._buffer = self._buffer[cut:]
+        self._offset += cut / SAMPLE_RATE
+
+    def transcribe_stream(self, stream: BinaryIO) -> Generator[Tuple[List[Dict[str, Any]],
+                                                                     List[Dict[str, Any]]], None, None]:
+        """
+        Transcribe raw PCM from a stream until it ends.
+
+        Args:
+            stream (BinaryIO): Readable stream of PCM in the configured format.
+
+        Yields:
+            Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: Newly stable and
+                current tentative segments after every ``latency`` seconds of audio.
+        """
+        frame_bytes = SAMPLE_WIDTH * self.config.channels
+        step_bytes = int(self.config.latency * self.config.sample_rate) * frame_bytes
+
+        while True:
+            data = stream.read(step_bytes)
+            if not data:
+                break
+            self.feed_pcm(data)
+            yield self.step()
+
+        yield self.step(final=True)
+
+    def run(self, stream: BinaryIO, writers: List[SegmentWriter],
+            on_update: Optional[Callable[[List[Dict[str, Any]], List[Dict[str, Any]]], None]] = None
+            ) -> Dict[str, Any]:
+        """
+        Transcribe a stream, writing stable segments to output writers as they appear.
+
+        Args:
+            stream (BinaryIO): Readable stream of PCM in the configured format.
+            writers (List[SegmentWriter]): Writers receiving stable segments; they
+                are closed when the stream ends.
+            on_update (Optional[Callable]): Called with the newly stable and the
+                tentative segments after every decode.
+
+        Returns:
+            Dict[str, Any]: Text and language of the whole stream.
+        """
+        texts = []
+        for stable, tentative in self.transcribe_stream(stream):
+            for segment in stable:
+                texts.append(segment["text"])
+                for writer in writers:
+                    writer.write_segment(segment)
+            for writer in writers:
+                writer.flush()
+            if on_update is not None:
+                on_update(stable, tentative)
+
+        result = {"text": "".join(texts), "language": self._language or self._decoded_language}
+        for writer in writers:
+            writer.close(result)
+        return result
+
+
+def run_live(transcriber: "WhisperTranscriber", source: str,
+             config: Optional[LiveConfig] = None) -> List[str]:
+    """
+    Transcribe a live PCM source into the transcriber's output files.
+
+    Stable segments are printed and written to one file per configured
+    output format; tentative text is printed to stderr in verbose mode.
+
+    Args:
+        transcriber (WhisperTranscriber): Transcriber to use.
+        source (str): PCM source, see ``open_pcm_source``.
+        config (Optional[LiveConfig]): Live stream settings.
+
+    Returns:
+        List[str]: Paths of the written output files.
+    """
+    live = LiveTranscriber(transcriber, config)
+    handler = transcriber.output_handler
+    name = "live" if source == "-" or "://" in source else Path(source).stem
+
+    def report(stable: List[Dict[str, Any]], tentative: List[Dict[str, Any]]) -> None:
+        for segment in stable:
+            start = handler._format_timestamp(segment["start"])
+            end = handler._format_timestamp(segment["end"])
+            print(f"[{start} --> {end}] {segment['text'].strip()}", flush=True)
+        if transcriber.config.verbose and tentative:
+            print("... " + "".join(segment["text"] for segment in tentative).strip(),
+                  file=sys.stderr, flush=True)
+
+    output_paths = [handler.output_path(name, fmt) for fmt in transcriber.config.output_formats]
+    files = [open(output_path, "w", encoding="utf-8") for output_path in output_paths]
+    try:
+        writers = [
+            handler.open_writer(f, fmt)
+            for f, fmt in zip(files, transcriber.config.output_formats)
+        ]
+        stream = open_pcm_source(source)
+        try:
+            live.run(stream, writers, report)
+        finally:
+            stream.close()
+    finally:
+        for f in files:
+            f.close()
+
+    return [str(output_path) for output_path in output_paths]
+
+
+def feed_audio(audio_path: str, stream: BinaryIO, realtime: bool = True, block: float = 0.1) -> None:
+    """
+    Write an audio file to a stream as 16 kHz mono 16-bit PCM.
+
+    Useful to exercise live mode offline by piping a recording into it at
+    the speed it would arrive from a microphone.
+
+    Args:
+        audio_path (str): Audio file to send.
+        stream (BinaryIO): Writable binary stream.
+        realtime (bool, optional): Pace the output at real-time speed. Defaults to True.
+        block (float, optional): Seconds of audio per write. Defaults to 0.1.
+    """
+    audio = load_audio(audio_path)
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2")
+    block_samples = max(1, int(block * SAMPLE_RATE))
+
+    started = time.monotonic()
+    for start in range(0, len(pcm), block_samples):
+        if realtime:
+            delay = started + start / SAMPLE_RATE - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        stream.write(pcm[start:start + block_samples].tobytes())
+        stream.flush()
+
+
+def main():
+    """Send an audio file as raw PCM to standard output, for testing live mode."""
+    parser = argparse.ArgumentParser(
+        description="Stream an audio file as 16 kHz mono 16-bit PCM, e.g. into 'whisper-transcribe --live -'"
+    )
+    parser.add_argument("audio", help="Audio file to stream")
+    parser.add_argument("--no-realtime", action="store_true",
+                        help="Write as fast as possible instead of at real-time speed")
+    parser.add_argument("--block", type=float, default=0.1, help="Seconds of audio per write")
+    args = parser.parse_args()
+
+    try:
+        feed_audio(args.audio, sys.stdout.buffer, realtime=not args.no_realtime, block=args.block)
+    except BrokenPipeError:
+        pass
+
+
+if __name__ == "__main__":
+    main()
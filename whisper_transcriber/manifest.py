@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import argparse
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, Union, List
+
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+class JobManifest:
+    """
+    Append-only JSONL log of per-file progress for batch runs.
+
+    Every finished file appends one line with its status, outputs, audio
+    duration and processing time, flushed to disk immediately, so a crashed
+    run can be resumed and a running batch can be inspected from another
+    process. When a file appears several times, its last line wins.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Open a manifest, loading any records already written.
+
+        Args:
+            path (Union[str, Path]): Path to the JSONL manifest file.
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self.load()
+
+    def load(self) -> None:
+        """Read all records from disk, ignoring a truncated final line."""
+        self._records = {}
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._records[record["file"]] = record
+
+    @staticmethod
+    def file_key(audio_path: Union[str, Path]) -> str:
+        """Return the key identifying an audio file in the manifest."""
+        return str(Path(audio_path).resolve())
+
+    def get(self, audio_path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+        """Return the latest record for a file, if any."""
+        return self._records.get(self.file_key(audio_path))
+
+    def is_completed(self, audio_path: Union[str, Path],
+                     outputs: Optional[List[Union[str, Path]]] = None) -> bool:
+        """
+        Check whether a file was transcribed successfully and is unchanged since.
+
+        Args:
+            audio_path (Union[str, Path]): Path to the audio file.
+            outputs (Optional[List[Union[str, Path]]]): Output files the current
+                run would write. When given, each must have been recorded for the
+                file and still exist, so a run with another output format or
+                directory does not skip it. Defaults to None (not checked).
+
+        Returns:
+            bool: True if the file can be skipped.
+        """
+        record = self.get(audio_path)
+        if record is None or record["status"] != STATUS_DONE:
+            return False
+        try:
+            stat = os.stat(audio_path)
+        except OSError:
+            return False
+        if record.get("size") != stat.st_size or record.get("mtime") != stat.st_mtime:
+            return False
+        if outputs is None:
+            return True
+
+        recorded = record.get("outputs") or []
+        if isinstance(recorded, str):
+            recorded = [recorded]
+        recorded = {os.path.abspath(path) for path in recorded}
+        return all(os.path.abspath(path) in recorded and os.path.exists(path) for path in outputs)
+
+    def record(self, audio_path: Union[str, Path], status: str,
+               outputs: Optional[Union[str, List[str]]] = None,
+               duration: Optional[float] = None,
+               elapsed: Optional[float] = None,
+               error: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Append the outcome of a file to the manifest.
+
+        Args:
+            audio_path (Union[str, Path]): Path to the audio file.
+            status (str): ``"done"`` or ``"failed"``.
+            outputs (Optional[Union[str, List[str]]]): Output file path(s).
+            duration (Optional[float]): Audio duration in seconds.
+            elapsed (Optional[float]): Processing time in seconds.
+            error (Optional[str]): Error message for failed files.
+
+        Returns:
+            Dict[str, Any]: The record written.
+        """
+        try:
+            stat = os.stat(audio_path)
+            size, mtime = stat.st_size, stat.st_mtime
+        except OSError:
+            size, mtime = None, None
+
+        record = {
+            "file": self.file_key(audio_path),
+            "status": status,
+            "outputs": outputs,
+            "duration": duration,
+            "elapsed": elapsed,
+            "error": error,
+            "size": size,
+            "mtime": mtime,
+            "finished_at": time.time()
+        }
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._records[record["file"]] = record
+        return record
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the progress recorded so far.
+
+        Returns:
+            Dict[str, Any]: Counts per status, audio seconds and processing
+                seconds of completed files, and the time of the last update.
+        """
+        records = list(self._records.values())
+        done = [record for record in records if record["status"] == STATUS_DONE]
+        return {
+            "files": len(records),
+            "done": len(done),
+            "failed": sum(1 for record in records if record["status"] == STATUS_FAILED),
+            "audio_seconds": sum(record.get("duration") or 0.0 for record in done),
+            "processing_seconds": sum(record.get("elapsed") or 0.0 for record in done),
+            "last_update": max((record["finished_at"] for record in records), default=None)
+        }
+
+    def failures(self) -> List[Dict[str, Any]]:
+        """Return the records of files whose latest attempt failed."""
+        return [record for record in self._records.values() if record["status"] == STATUS_FAILED]
+
+
+def main():
+    """Print the progress of a batch run from its manifest."""
+    parser = argparse.ArgumentParser(description="Show progress of a transcription batch")
+    parser.add_argument("manifest", help="Path to the job manifest (JSONL)")
+    parser.add_argument("--failures", action="store_true", help="List failed files")
+    args = parser.parse_args()
+
+    manifest = JobManifest(args.manifest)
+    print(json.dumps(manifest.summary(), indent=2))
+    if args.failures:
+        for record in manifest.failures():
+            print(f"{record['file']}: {record['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+import os
+import sys
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple, Sequence, Callable, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .profiling import StageTimings
+
+# Histogram buckets for durations in seconds
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 900.0)
+
+# Histogram buckets for real-time factors (processing time / audio duration)
+RTF_BUCKETS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0)
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Label values of one series, as sorted (name, value) pairs
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+def _label_set(labels: Dict[str, Any]) -> LabelSet:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(labels: LabelSet) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels:
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base class of a named metric with one series per label set."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, lock: threading.Lock):
+        self.name = name
+        self.help = help
+        self._lock = lock
+        self._series: Dict[LabelSet, Any] = {}
+
+    def _render_series(self, labels: LabelSet, value: Any) -> List[str]:
+        return [f"{self.name}{_format_labels(labels)} {_format_value(value)}"]
+
+    def render(self) -> List[str]:
+        """Return the metric in the Prometheus text format, one line per entry."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in sorted(self._series.items()):
+            lines.extend(self._render_series(labels, value))
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing total."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Add ``amount`` to the series with the given labels."""
+        key = _label_set(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def _merge(self, key: LabelSet, value: float) -> None:
+        self._series[key] = self._series.get(key, 0.0) + value
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, optionally read from a function when collected."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, lock: threading.Lock):
+        super().__init__(name, help, lock)
+        self._functions: Dict[LabelSet, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        """Set the series with the given labels."""
+        with self._lock:
+            self._series[_label_set(labels)] = value
+
+    def set_function(self, function: Optional[Callable[[], float]], **labels: Any) -> None:
+        """
+        Read the series from ``function`` whenever metrics are collected.
+
+        Args:
+            function (Optional[Callable[[], float]]): Function returning the
+                current value; None removes the series.
+            **labels: Label values of the series.
+        """
+        key = _label_set(labels)
+        with self._lock:
+            if function is None:
+                self._functions.pop(key, None)
+                self._series.pop(key, None)
+            else:
+                self._functions[key] = function
+
+    def render(self) -> List[str]:
+        for key, function in list(self._functions.items()):
+            try:
+                self._series[key] = function()
+            except Exception:
+                # A collector failing must not break the endpoint
+                self._series.pop(key, None)
+        return super().render()
+
+    def _merge(self, key: LabelSet, value: float) -> None:
+        self._series[key] = max(self._series.get(key, value), value)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, lock: threading.Lock, buckets: Sequence[float]):
+        super().__init__(name, help, lock)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record one observation in the series with the given labels."""
+        key = _label_set(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket (not cumulative) counts, then the count and sum of all observations
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0, 0.0]
+            series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def _render_series(self, labels: LabelSet, value: List[float]) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), value):
+            cumulative += count
+            bucket_labels = labels + (("le", _format_value(bound)),)
+            lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {value[-2]}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(value[-1])}")
+        return lines
+
+    def _merge(self, key: LabelSet, value: List[float]) -> None:
+        series = self._series.get(key)
+        if series is None:
+            self._series[key] = list(value)
+        else:
+            self._series[key] = [a + b for a, b in zip(series, value)]
+
+
+class MetricsRegistry:
+    """
+    Thread-safe set of metrics rendered in the Prometheus text format.
+
+    Recording takes one short lock, so metrics can be updated from worker
+    threads on the hot path. Values from worker processes are combined
+    with ``drain`` in the worker and ``merge`` in the parent.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _get(self, cls, name: str, help: str, *args: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, self._lock, *args)
+            return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        """Return the counter called ``name``, creating it on first use."""
+        return self._get(Counter, name, help)
+
+    def gauge(self, name: str, help: str) -> Gauge:
+        """Return the gauge called ``name``, creating it on first use."""
+        return self._get(Gauge, name, help)
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = SECONDS_BUCKETS) -> Histogram:
+        """Return the histogram called ``name``, creating it on first use."""
+        return self._get(Histogram, name, help, buckets)
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            lines = []
+            for name in sorted(self._metrics):
+                lines.extend(self._metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+    def drain(self) -> Dict[str, Dict[LabelSet, Any]]:
+        """
+        Return the recorded values and reset them.
+
+        Gauges read from functions are not included.
+
+        Returns:
+            Dict[str, Dict[LabelSet, Any]]: Picklable values per metric name, for ``merge``.
+        """
+        with self._lock:
+            values = {}
+            for name, metric in self._metrics.items():
+                values[name] = {key: value for key, value in metric._series.items()
+                                if key not in getattr(metric, "_functions", {})}
+                for key in values[name]:
+                    del metric._series[key]
+            return values
+
+    def merge(self, values: Dict[str, Dict[LabelSet, Any]]) -> None:
+        """
+        Add values drained from another registry, e.g. in a worker process.
+
+        Counters and histograms are summed, gauges keep the larger value.
+        Metrics unknown to this registry are ignored.
+        """
+        with self._lock:
+            for name, series in values.items():
+                metric = self._metrics.get(name)
+                if metric is None:
+                    continue
+                for key, value in series.items():
+                    metric._merge(key, value)
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Return the peak resident set size of this process or its largest child, in bytes."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class TranscriptionMetrics:
+    """
+    The metrics recorded by transcribers, on top of a ``MetricsRegistry``.
+
+    Per file: files done and failed, audio seconds, processing time, real-time
+    factor and time per stage. Also batch and service queue depth, model
+    load time and peak RSS (read when collected).
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        """
+        Create the metrics.
+
+        Args:
+            registry (Optional[MetricsRegistry]): Registry to record into. Defaults to a new one.
+        """
+        self.registry = registry or MetricsRegistry()
+        self.files = self.registry.counter(
+            "whisper_files_total", "Files transcribed, by outcome.")
+        self.audio_seconds = self.registry.counter(
+            "whisper_audio_seconds_total", "Seconds of audio transcribed.")
+        self.processing_seconds = self.registry.counter(
+            "whisper_processing_seconds_total", "Wall-clock seconds spent transcribing files.")
+        self.file_seconds = self.registry.histogram(
+            "whisper_file_seconds", "Wall-clock seconds per transcribed file.")
+        self.real_time_factor = self.registry.histogram(
+            "whisper_real_time_factor", "Processing seconds per second of audio, per file.", RTF_BUCKETS)
+        self.stage_seconds = self.registry.histogram(
+            "whisper_stage_seconds", "Wall-clock seconds per file spent in each processing stage.")
+        self.queue_depth = self.registry.gauge(
+            "whisper_queue_depth", "Files or requests waiting to be transcribed.")
+        self.model_load_seconds = self.registry.histogram(
+            "whisper_model_load_seconds", "Seconds taken to load a model.")
+        self.peak_rss = self.registry.gauge(
+            "whisper_peak_rss_bytes", "Peak resident set size of the process or its largest worker.")
+        self.peak_rss.set_function(peak_rss_bytes)
+
+    def record_file(self, timings: "StageTimings") -> None:
+        """Record a transcribed file from its stage timings."""
+        self.files.inc(status="done")
+        self.processing_seconds.inc(timings.wall)
+        self.file_seconds.observe(timings.wall)
+        if timings.audio_seconds:
+            self.audio_seconds.inc(timings.audio_seconds)
+            self.real_time_factor.observe(timings.wall / timings.audio_seconds)
+        for stage, entry in timings.stages.items():
+            self.stage_seconds.observe(entry["wall_s"], stage=stage)
+
+    def record_failure(self) -> None:
+        """Record a file that could not be transcribed."""
+        self.files.inc(status="failed")
+
+    def record_model_load(self, model_name: str, precision: str, seconds: float) -> None:
+        """Record the time taken to load a model."""
+        self.model_load_seconds.observe(seconds, model=model_name, precision=precision)
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        return self.registry.render()
+
+
+class MetricsServer:
+    """
+    Serve metrics in the Prometheus text format over HTTP on a background thread.
+
+    Any GET path returns the metrics, so ``/metrics`` works as usual.
+    """
+
+    def __init__(self, metrics: Optional[TranscriptionMetrics] = None,
+                 host: str = "127.0.0.1", port: int = 9400):
+        """
+        Initialize the server.
+
+        Args:
+            metrics (Optional[TranscriptionMetrics]): Metrics to serve. Defaults to ``get_metrics()``.
+            host (str, optional): Interface to listen on. Defaults to "127.0.0.1".
+            port (int, optional): Port to listen on; 0 picks a free port. Defaults to 9400.
+        """
+        self.metrics = metrics or get_metrics()
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "MetricsServer":
+        """Start serving; ``port`` holds the bound port afterwards."""
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                payload = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
+
+
+class MetricsFileWriter:
+    """
+    Write metrics to a file at a fixed interval, e.g. for node_exporter's textfile collector.
+
+    The file is replaced atomically, so readers never see a partial write.
+    """
+
+    def __init__(self, path: Union[str, Path], metrics: Optional[TranscriptionMetrics] = None,
+                 interval: float = 15.0):
+        """
+        Initialize the writer.
+
+        Args:
+            path (Union[str, Path]): File to write.
+            metrics (Optional[TranscriptionMetrics]): Metrics to write. Defaults to ``get_metrics()``.
+            interval (float, optional): Seconds between writes. Defaults to 15.
+        """
+        self.path = Path(path)
+        self.metrics = metrics or get_metrics()
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self) -> None:
+        """Write the current metrics now."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        temp_path.write_text(self.metrics.render(), encoding="utf-8")
+        os.replace(temp_path, self.path)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.write()
+
+    def start(self) -> "MetricsFileWriter":
+        """Start writing in the background."""
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop writing, after a final write with the latest values."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.write()
+
+
+_default_metrics = TranscriptionMetrics()
+
+
+def get_metrics() -> TranscriptionMetrics:
+    """Return the process-wide transcription metrics."""
+    return _default_metrics
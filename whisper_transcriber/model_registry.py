@@ -0,0 +1,288 @@
+import copy
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple, List
+
+import torch
+from torch.ao.nn.quantized.modules.linear import LinearPackedParams
+
+from .precision import load_model
+from .metrics import get_metrics
+
+ModelKey = Tuple[str, str, str]
+
+
+@dataclass
+class _RegistryEntry:
+    """Bookkeeping for a single loaded model."""
+    model: Any
+    size_bytes: int
+    ref_count: int = 0
+
+
+def estimate_model_size(model: torch.nn.Module) -> int:
+    """
+    Estimate the memory held by a model's parameters and buffers.
+
+    Args:
+        model (torch.nn.Module): Loaded model.
+
+    Returns:
+        int: Approximate size in bytes. Shared storages are counted once.
+    """
+    tensors = list(model.parameters()) + list(model.buffers())
+    for module in model.modules():
+        # Weights of quantized layers are packed outside the parameters
+        if isinstance(module, LinearPackedParams):
+            tensors.extend(t for t in module._weight_bias() if t is not None)
+
+    seen = set()
+    total = 0
+    for tensor in tensors:
+        if tensor.is_sparse:
+            continue
+        storage = tensor.untyped_storage()
+        key = (storage.data_ptr(), tensor.device)
+        if key in seen:
+            continue
+        seen.add(key)
+        total += storage.nbytes()
+    return total
+
+
+def replicate_model(model: torch.nn.Module) -> torch.nn.Module:
+    """
+    Create a copy of a model that shares its weights with the original.
+
+    Whisper installs key/value cache hooks on the decoder modules while
+    decoding, so a single module tree cannot be used by two threads at once.
+    A replica has its own module objects (and therefore its own hooks) but
+    reuses every parameter and buffer tensor, and the packed weights of
+    quantized layers, so it costs almost no memory.
+
+    Args:
+        model (torch.nn.Module): Model to replicate.
+
+    Returns:
+        torch.nn.Module: Replica sharing parameters and buffers with ``model``.
+    """
+    memo = {id(tensor): tensor for tensor in list(model.parameters()) + list(model.buffers())}
+    for module in model.modules():
+        if isinstance(module, LinearPackedParams):
+            memo[id(module)] = module
+    return copy.deepcopy(model, memo)
+
+
+class ModelRegistry:
+    """
+    Process-wide, thread-safe cache of loaded Whisper models.
+
+    Models are keyed by (model_name, device, dtype) and handed out with
+    reference counting: every ``acquire`` must be paired with a ``release``.
+    Models nobody holds stay cached and are evicted least-recently-used first
+    once the total size of loaded weights exceeds the memory budget.
+    """
+
+    def __init__(self, memory_budget: Optional[int] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            memory_budget (Optional[int]): Maximum bytes of model weights to keep
+                loaded. Models in use are never evicted, so the budget can be
+                exceeded temporarily. Defaults to None (unlimited).
+        """
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[ModelKey, _RegistryEntry]" = OrderedDict()
+        self._load_locks: Dict[ModelKey, threading.Lock] = {}
+        self._memory_budget = memory_budget
+
+    @property
+    def memory_budget(self) -> Optional[int]:
+        """Maximum bytes of model weights to keep loaded, or None for unlimited."""
+        return self._memory_budget
+
+    @memory_budget.setter
+    def memory_budget(self, value: Optional[int]) -> None:
+        with self._lock:
+            self._memory_budget = value
+            self._enforce_budget()
+
+    @staticmethod
+    def make_key(model_name: str, device: str = "cpu", dtype: str = "fp32") -> ModelKey:
+        """Build the registry key for a model."""
+        return (model_name, device, dtype)
+
+    def _load(self, model_name: str, device: str, dtype: str,
+              cache_dir: Optional[str] = None, snapshot: bool = False) -> torch.nn.Module:
+        """Load a model from disk. Called without the registry lock held."""
+        return load_model(model_name, device, dtype, cache_dir, snapshot)
+
+    def acquire(self, model_name: str, device: str = "cpu", dtype: str = "fp32",
+                cache_dir: Optional[str] = None, snapshot: bool = False) -> torch.nn.Module:
+        """
+        Borrow a model, loading it on first use.
+
+        Args:
+            model_name (str): Whisper model name or checkpoint path.
+            device (str, optional): Device to load the model on. Defaults to "cpu".
+            dtype (str, optional): Weight precision ("fp32", "bf16" or "int8").
+                Defaults to "fp32".
+            cache_dir (Optional[str]): Directory holding converted models when
+                ``dtype`` is not fp32, and snapshots. Defaults to the user cache directory.
+            snapshot (bool, optional): Load the weights from a memory-mapped
+                snapshot, writing it on first use. Defaults to False.
+
+        Returns:
+            torch.nn.Module: The shared model instance.
+        """
+        key = self.make_key(model_name, device, dtype)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.ref_count += 1
+                self._entries.move_to_end(key)
+                return entry.model
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Load outside the registry lock so other models stay available;
+        # the per-key lock makes concurrent callers wait for a single load.
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.ref_count += 1
+                    self._entries.move_to_end(key)
+                    return entry.model
+
+            started = time.perf_counter()
+            try:
+                model = self._load(model_name, device, dtype, cache_dir, snapshot)
+            except BaseException:
+                with self._lock:
+                    self._load_locks.pop(key, None)
+                raise
+            get_metrics().record_model_load(model_name, dtype, time.perf_counter() - started)
+
+            with self._lock:
+                self._entries[key] = _RegistryEntry(
+                    model=model,
+                    size_bytes=estimate_model_size(model),
+                    ref_count=1
+                )
+                self._load_locks.pop(key, None)
+                self._enforce_budget()
+            return model
+
+    def register(self, model: torch.nn.Module, model_name: str, device: str = "cpu",
+                 dtype: str = "fp32") -> None:
+        """
+        Add an already loaded model to the registry.
+
+        Used by worker processes that inherit the parent's model, so that
+        later ``acquire`` calls reuse it instead of loading from disk.
+
+        Args:
+            model (torch.nn.Module): Loaded model.
+            model_name (str): Whisper model name or checkpoint path.
+            device (str, optional): Device the model lives on. Defaults to "cpu".
+            dtype (str, optional): Weight precision. Defaults to "fp32".
+        """
+        key = self.make_key(model_name, device, dtype)
+        with self._lock:
+            entry = self._entries.get(key)
+            ref_count = entry.ref_count if entry is not None else 0
+            self._entries[key] = _RegistryEntry(
+                model=model,
+                size_bytes=estimate_model_size(model),
+                ref_count=ref_count
+            )
+            self._entries.move_to_end(key)
+            self._enforce_budget()
+
+    def release(self, model_name: str, device: str = "cpu", dtype: str = "fp32") -> None:
+        """
+        Return a model previously obtained with ``acquire``.
+
+        Args:
+            model_name (str): Whisper model name or checkpoint path.
+            device (str, optional): Device the model was loaded on. Defaults to "cpu".
+            dtype (str, optional): Weight precision. Defaults to "fp32".
+
+        Raises:
+            KeyError: If the model is not held by the registry.
+        """
+        key = self.make_key(model_name, device, dtype)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.ref_count == 0:
+                raise KeyError(f"Model not acquired: {key}")
+            entry.ref_count -= 1
+            if entry.ref_count == 0:
+                self._enforce_budget()
+
+    def _enforce_budget(self) -> None:
+        """Evict idle models, least recently used first, until within budget."""
+        if self.memory_budget is None:
+            return
+
+        for key in list(self._entries):
+            if self.total_size() <= self.memory_budget:
+                break
+            if self._entries[key].ref_count == 0:
+                self._evict(key)
+
+    def _evict(self, key: ModelKey) -> None:
+        """Drop a model from the registry."""
+        entry = self._entries.pop(key)
+        if key[1] == "cuda" and torch.cuda.is_available():
+            del entry
+            torch.cuda.empty_cache()
+
+    def total_size(self) -> int:
+        """Return the total size in bytes of all loaded models."""
+        with self._lock:
+            return sum(entry.size_bytes for entry in self._entries.values())
+
+    def evict_idle(self) -> int:
+        """
+        Evict every model that is not currently in use.
+
+        Returns:
+            int: Number of models evicted.
+        """
+        with self._lock:
+            idle = [key for key, entry in self._entries.items() if entry.ref_count == 0]
+            for key in idle:
+                self._evict(key)
+            return len(idle)
+
+    def loaded_models(self) -> List[Dict[str, Any]]:
+        """
+        Describe the models currently held, least recently used first.
+
+        Returns:
+            List[Dict[str, Any]]: One entry per model with key, size and reference count.
+        """
+        with self._lock:
+            return [
+                {
+                    "model_name": key[0],
+                    "device": key[1],
+                    "dtype": key[2],
+                    "size_bytes": entry.size_bytes,
+                    "ref_count": entry.ref_count
+                }
+                for key, entry in self._entries.items()
+            ]
+
+
+_default_registry = ModelRegistry()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Return the process-wide model registry."""
+    return _default_registry
@@ -1,7 +1,12 @@
+import io
 import os
+import sys
 import json
 from pathlib import Path
-from typing import Dict, Any, Union
+from typing import Dict, Any, Union, List, Optional, Tuple, Iterable, TextIO
+
+# Module of SegmentStore; checked through sys.modules so plain results don't import NumPy
+_SEGMENTS_MODULE = f"{__package__}.segments"
 
 class OutputHandler:
     """
@@ -50,53 +55,9 @@ class OutputHandler:
         Returns:
             str: Formatted SRT content.
         """
-        segments = result.get('segments', [])
-        srt_content = []
-        
-        for i, segment in enumerate(segments, 1):
-            start = self._format_timestamp(segment['start'])
-            end = self._format_timestamp(segment['end'])
-            text = segment['text'].strip()
-            
-            # Break long segments into shorter, more readable subtitles
-            max_length = 50  # Maximum characters per subtitle line
-            words = text.split()
-            lines = []
-            current_line = []
-            current_length = 0
-            
-            for word in words:
-                if current_length + len(word) > max_length:
-                    lines.append(" ".join(current_line))
-                    current_line = [word]
-                    current_length = len(word)
-                else:
-                    current_line.append(word)
-                    current_length += len(word) + 1
-            
-            if current_line:
-                lines.append(" ".join(current_line))
-            
-            # Create subtitle with potentially multiple lines
-            subtitle_text = "\n".join(lines)
-            
-            # Add word-level timestamps if requested
-            if include_word_timestamps and 'words' in segment:
-                word_timestamps = []
-                for word_info in segment['words']:
-                    word_start = self._format_timestamp(word_info['start'])
-                    word_end = self._format_timestamp(word_info['end'])
-                    word_timestamps.append(f"{word_start} --> {word_end}: {word_info['word']}")
-                subtitle_text += "\n\n[Word Timestamps]\n" + "\n".join(word_timestamps)
-            
-            srt_content.extend([
-                str(i),
-                f"{start} --> {end}",
-                subtitle_text,
-                ""
-            ])
-        
-        return "\n".join(srt_content)
+        buffer = io.StringIO()
+        self._write_segments(SrtWriter(buffer, include_word_timestamps), result)
+        return buffer.getvalue()
 
     def _format_vtt(self, result: Dict[str, Any], include_word_timestamps: bool = False) -> str:
         """
@@ -109,52 +70,62 @@ class OutputHandler:
         Returns:
             str: Formatted VTT content.
         """
+        buffer = io.StringIO()
+        self._write_segments(VttWriter(buffer, include_word_timestamps), result)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _write_segments(writer: "SegmentWriter", result: Dict[str, Any]) -> None:
+        """Feed every segment of a result to a writer and close it."""
+        writer.write_segments(result.get('segments', []))
+        writer.close(result)
+
+    def open_writer(self, stream: TextIO, format: str,
+                    include_word_timestamps: bool = True) -> "SegmentWriter":
+        """
+        Create a writer that emits segments to a stream as they arrive.
+        
+        Args:
+            stream (TextIO): Writable text stream, e.g. an open file or ``sys.stdout``.
+            format (str): Output format (txt, json, srt, vtt).
+            include_word_timestamps (bool, optional): Include word-level timestamps of
+                segments that have them. Defaults to True.
+        
+        Returns:
+            SegmentWriter: Writer for the format.
+        
+        Raises:
+            ValueError: If an unsupported output format is specified.
+        """
+        if format not in WRITERS:
+            raise ValueError(f"Unsupported output format: {format}")
+        return WRITERS[format](stream, include_word_timestamps)
+
+    def write_output(self, result: Dict[str, Any], format: str, stream: TextIO) -> None:
+        """
+        Write a transcription result to a stream without building it in memory.
+        
+        Args:
+            result (Dict[str, Any]): Transcription result.
+            format (str): Output format (txt, json, srt, vtt).
+            stream (TextIO): Writable text stream.
+        
+        Raises:
+            ValueError: If an unsupported output format is specified.
+        """
+        # Check if word timestamps are available
         segments = result.get('segments', [])
-        vtt_content = ["WEBVTT\n"]
+        if _is_segment_store(segments):
+            include_word_timestamps = segments.has_words
+        else:
+            include_word_timestamps = any('words' in segment for segment in segments)
         
-        for segment in segments:
-            start = self._format_timestamp(segment['start'], vtt=True)
-            end = self._format_timestamp(segment['end'], vtt=True)
-            text = segment['text'].strip()
-            
-            # Break long segments into shorter, more readable subtitles
-            max_length = 50  # Maximum characters per subtitle line
-            words = text.split()
-            lines = []
-            current_line = []
-            current_length = 0
-            
-            for word in words:
-                if current_length + len(word) > max_length:
-                    lines.append(" ".join(current_line))
-                    current_line = [word]
-                    current_length = len(word)
-                else:
-                    current_line.append(word)
-                    current_length += len(word) + 1
-            
-            if current_line:
-                lines.append(" ".join(current_line))
-            
-            # Create subtitle with potentially multiple lines
-            subtitle_text = "\n".join(lines)
-            
-            # Add word-level timestamps if requested
-            if include_word_timestamps and 'words' in segment:
-                word_timestamps = []
-                for word_info in segment['words']:
-                    word_start = self._format_timestamp(word_info['start'], vtt=True)
-                    word_end = self._format_timestamp(word_info['end'], vtt=True)
-                    word_timestamps.append(f"{word_start} --> {word_end}: {word_info['word']}")
-                subtitle_text += "\n\n[Word Timestamps]\n" + "\n".join(word_timestamps)
-            
-            vtt_content.extend([
-                f"{start} --> {end}",
-                subtitle_text,
-                ""
-            ])
-        
-        return "\n".join(vtt_content)
+        if format == "txt":
+            stream.write(result['text'])
+        elif format == "json":
+            json.dump(result, stream, indent=2, ensure_ascii=False, default=json_default)
+        else:
+            self._write_segments(self.open_writer(stream, format, include_word_timestamps), result)
 
     def format_output(self, result: Dict[str, Any], format: str) -> str:
         """
@@ -170,19 +141,26 @@ class OutputHandler:
         Raises:
             ValueError: If an unsupported output format is specified.
         """
-        # Check if word timestamps are available
-        include_word_timestamps = any('words' in segment for segment in result.get('segments', []))
-        
-        if format == "txt":
-            return result['text']
-        elif format == "json":
-            return json.dumps(result, indent=2, ensure_ascii=False)
-        elif format == "srt":
-            return self._format_srt(result, include_word_timestamps)
-        elif format == "vtt":
-            return self._format_vtt(result, include_word_timestamps)
-        else:
+        if format not in WRITERS:
             raise ValueError(f"Unsupported output format: {format}")
+        
+        buffer = io.StringIO()
+        self.write_output(result, format, buffer)
+        return buffer.getvalue()
+
+    def output_path(self, filename: str, format: str) -> Path:
+        """
+        Return the path an output file for a source file is written to.
+        
+        Args:
+            filename (str): Original filename.
+            format (str): Output format.
+        
+        Returns:
+            Path: Path inside the output directory.
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        return self.output_dir / f"{Path(filename).stem}.{format}"
 
     def save_output(self, result: Dict[str, Any], filename: str, format: str) -> str:
         """
@@ -196,12 +174,287 @@ class OutputHandler:
         Returns:
             str: Path to the saved output file.
         """
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if format not in WRITERS:
+            raise ValueError(f"Unsupported output format: {format}")
 
-        output_path = self.output_dir / f"{Path(filename).stem}.{format}"
-        formatted_output = self.format_output(result, format)
-        
+        output_path = self.output_path(filename, format)
         with open(output_path, "w", encoding="utf-8") as f:
-            f.write(formatted_output)
+            self.write_output(result, format, f)
         
         return str(output_path)
+
+    def save_outputs(self, result: Dict[str, Any], filename: str, formats: List[str]) -> List[str]:
+        """
+        Save one transcription result in several formats.
+        
+        Args:
+            result (Dict[str, Any]): Transcription result.
+            filename (str): Original filename.
+            formats (List[str]): Output formats.
+        
+        Returns:
+            List[str]: Paths to the saved output files, in format order.
+        """
+        return [self.save_output(result, filename, format) for format in formats]
+
+
+def _is_segment_store(segments: Any) -> bool:
+    """
+    Return whether segments are kept in a ``SegmentStore``.
+    
+    A store can only exist once its module was imported, so lists of dicts
+    are told apart without importing it (and NumPy).
+    """
+    module = sys.modules.get(_SEGMENTS_MODULE)
+    return module is not None and isinstance(segments, module.SegmentStore)
+
+
+def json_default(value: Any) -> Any:
+    """
+    Encode the segment stores, views and word records JSON does not know.
+    
+    Pass as ``default`` to ``json.dump``/``json.dumps`` for results whose
+    segments are kept in a ``SegmentStore``.
+    """
+    segments = sys.modules.get(_SEGMENTS_MODULE)
+    if segments is not None:
+        if isinstance(value, segments.SegmentStore):
+            return value.to_list()
+        if isinstance(value, (segments.SegmentView, segments.Word)):
+            return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _wrap_subtitle(text: str, max_length: int = 50) -> str:
+    """Break subtitle text into lines of at most ``max_length`` characters."""
+    words = text.split()
+    lines = []
+    current_line = []
+    current_length = 0
+    
+    for word in words:
+        if current_length + len(word) > max_length:
+            lines.append(" ".join(current_line))
+            current_line = [word]
+            current_length = len(word)
+        else:
+            current_line.append(word)
+            current_length += len(word) + 1
+    
+    if current_line:
+        lines.append(" ".join(current_line))
+    
+    return "\n".join(lines)
+
+
+class SegmentWriter:
+    """
+    Incremental writer of one output format.
+    
+    Segments are written to the stream as soon as they are passed to
+    ``write_segment``, so memory use does not grow with the length of the
+    transcript and output can be read while transcription is still running.
+    """
+    
+    def __init__(self, stream: TextIO, include_word_timestamps: bool = True):
+        """
+        Initialize the writer and emit the format header.
+        
+        Args:
+            stream (TextIO): Writable text stream.
+            include_word_timestamps (bool, optional): Include word-level timestamps of
+                segments that have them. Defaults to True.
+        """
+        self.stream = stream
+        self.include_word_timestamps = include_word_timestamps
+        self.count = 0
+        self._write_header()
+    
+    def _write_header(self) -> None:
+        pass
+    
+    def _write_segment(self, segment: Dict[str, Any]) -> None:
+        raise NotImplementedError
+    
+    def _write_footer(self, result: Optional[Dict[str, Any]]) -> None:
+        pass
+    
+    def write_segment(self, segment: Dict[str, Any]) -> None:
+        """
+        Write one segment.
+        
+        Args:
+            segment (Dict[str, Any]): Segment with start, end and text.
+        """
+        self._write_segment(segment)
+        self.count += 1
+    
+    def write_segments(self, segments: Iterable[Dict[str, Any]]) -> None:
+        """
+        Write several segments.
+        
+        Args:
+            segments (Iterable[Dict[str, Any]]): Segments, e.g. a list or a ``SegmentStore``.
+        """
+        for segment in segments:
+            self.write_segment(segment)
+    
+    def flush(self) -> None:
+        """Flush the underlying stream."""
+        self.stream.flush()
+    
+    def close(self, result: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Finish the document.
+        
+        Args:
+            result (Optional[Dict[str, Any]]): Final transcription result, whose
+                fields other than the segments are added by formats that carry them.
+        """
+        self._write_footer(result)
+        self.flush()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class TxtWriter(SegmentWriter):
+    """Plain text writer; the transcript is the concatenated segment texts."""
+    
+    def _write_segment(self, segment: Dict[str, Any]) -> None:
+        self.stream.write(segment['text'])
+
+
+class _SubtitleWriter(SegmentWriter):
+    """Common block layout of SRT and WebVTT."""
+    
+    vtt = False
+    
+    def _format_block(self, segment: Dict[str, Any]) -> str:
+        """Return the timing line and text of one subtitle block."""
+        start = OutputHandler._format_timestamp(segment['start'], vtt=self.vtt)
+        end = OutputHandler._format_timestamp(segment['end'], vtt=self.vtt)
+        
+        # Add word-level timestamps if requested
+        word_timestamps = None
+        if self.include_word_timestamps and 'words' in segment:
+            word_timestamps = [
+                (OutputHandler._format_timestamp(word_info['start'], vtt=self.vtt),
+                 OutputHandler._format_timestamp(word_info['end'], vtt=self.vtt),
+                 word_info['word'])
+                for word_info in segment['words']
+            ]
+        
+        return self._layout_block(start, end, segment['text'], word_timestamps)
+    
+    @staticmethod
+    def _layout_block(start: str, end: str, text: str,
+                      word_timestamps: Optional[List[Tuple[str, str, str]]]) -> str:
+        """Lay out a subtitle block from formatted timestamps."""
+        subtitle_text = _wrap_subtitle(text.strip())
+        if word_timestamps is not None:
+            subtitle_text += "\n\n[Word Timestamps]\n" + "\n".join(
+                f"{word_start} --> {word_end}: {word}" for word_start, word_end, word in word_timestamps
+            )
+        return f"{start} --> {end}\n{subtitle_text}\n"
+    
+    def _write_block(self, block: str) -> None:
+        raise NotImplementedError
+    
+    def _write_segment(self, segment: Dict[str, Any]) -> None:
+        self._write_block(self._format_block(segment))
+    
+    def write_segments(self, segments: Iterable[Dict[str, Any]]) -> None:
+        """
+        Write several segments.
+        
+        The timestamps of a ``SegmentStore`` are formatted for all segments
+        and words at once instead of one segment at a time.
+        
+        Args:
+            segments (Iterable[Dict[str, Any]]): Segments, e.g. a list or a ``SegmentStore``.
+        """
+        if not _is_segment_store(segments):
+            super().write_segments(segments)
+            return
+        
+        starts, ends = segments.format_timestamps(vtt=self.vtt)
+        if self.include_word_timestamps:
+            word_starts, word_ends, word_offsets = segments.format_word_timestamps(vtt=self.vtt)
+        for i, segment in enumerate(segments):
+            word_timestamps = None
+            if self.include_word_timestamps and segments.stored_words(i):
+                first, last = word_offsets[i], word_offsets[i + 1]
+                word_timestamps = list(zip(word_starts[first:last], word_ends[first:last],
+                                           (word['word'] for word in segment['words'])))
+            elif self.include_word_timestamps and 'words' in segment:
+                # Word timestamps kept as reported, not as records
+                self.write_segment(segment)
+                continue
+            self._write_block(self._layout_block(starts[i], ends[i], segment['text'], word_timestamps))
+            self.count += 1
+
+
+class SrtWriter(_SubtitleWriter):
+    """SRT subtitle writer."""
+    
+    def _write_block(self, block: str) -> None:
+        separator = "\n" if self.count else ""
+        self.stream.write(f"{separator}{self.count + 1}\n{block}")
+
+
+class VttWriter(_SubtitleWriter):
+    """WebVTT subtitle writer."""
+    
+    vtt = True
+    
+    def _write_header(self) -> None:
+        self.stream.write("WEBVTT\n")
+    
+    def _write_block(self, block: str) -> None:
+        self.stream.write(f"\n{block}")
+
+
+class JsonWriter(SegmentWriter):
+    """
+    JSON writer.
+    
+    Segments are written first, as they arrive; the remaining result fields
+    (text, language, ...) follow when the writer is closed with the final
+    result. The document uses the same layout as ``json.dumps(indent=2)``.
+    """
+    
+    indent = 2
+    
+    def _encode(self, value: Any, level: int) -> str:
+        """Encode a value as indented JSON nested ``level`` levels deep."""
+        encoded = json.dumps(value, indent=self.indent, ensure_ascii=False, default=json_default)
+        # Newlines inside JSON strings are escaped, so every raw newline is layout
+        return encoded.replace("\n", "\n" + " " * (self.indent * level))
+    
+    def _write_header(self) -> None:
+        self.stream.write('{\n  "segments": [')
+    
+    def _write_segment(self, segment: Dict[str, Any]) -> None:
+        separator = "," if self.count else ""
+        self.stream.write(f"{separator}\n    {self._encode(segment, 2)}")
+    
+    def _write_footer(self, result: Optional[Dict[str, Any]]) -> None:
+        self.stream.write("\n  ]" if self.count else "]")
+        for key, value in (result or {}).items():
+            if key == 'segments':
+                continue
+            self.stream.write(f",\n  {json.dumps(key, ensure_ascii=False)}: {self._encode(value, 1)}")
+        self.stream.write("\n}")
+
+
+# Writer class per output format
+WRITERS = {
+    "txt": TxtWriter,
+    "json": JsonWriter,
+    "srt": SrtWriter,
+    "vtt": VttWriter
+}
@@ -0,0 +1,96 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Optional, List, Tuple, Callable, Iterator
+
+from whisper.audio import SAMPLE_RATE
+
+from .batch import estimate_duration
+
+# Bytes per decoded 16 kHz float32 sample
+BYTES_PER_SAMPLE = 4
+
+
+def estimate_decoded_bytes(audio_path: Path) -> int:
+    """Estimate the memory taken by a file once decoded to 16 kHz float32."""
+    return int(estimate_duration(audio_path) * SAMPLE_RATE * BYTES_PER_SAMPLE)
+
+
+class AudioPrefetcher:
+    """
+    Bounded producer/consumer pipeline decoding upcoming files in the background.
+
+    A pool of decoder threads loads the next files while the caller runs
+    inference on the current one. Decoding (file reads, libsndfile and
+    ffmpeg) releases the GIL, so threads overlap it with model inference
+    without pickling waveforms between processes. At most ``2 * workers``
+    files are in flight, and no new file is started while the audio decoded
+    or being decoded would exceed ``max_bytes`` (estimated from the file
+    headers). Results are yielded in input order. When the consumer stops
+    early, files already loaded are passed to ``discard`` so they can release
+    what they hold, e.g. open windowed readers.
+    """
+
+    def __init__(self, files: List[Path], load: Callable[[Path], Any], workers: int = 2,
+                 max_bytes: Optional[int] = None, discard: Optional[Callable[[Any], None]] = None):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            files (List[Path]): Files to load, in processing order.
+            load (Callable[[Path], Any]): Function decoding one file.
+            workers (int, optional): Number of decoder threads. Defaults to 2.
+            max_bytes (Optional[int]): Cap on queued decoded audio. Defaults to None (unbounded).
+            discard (Optional[Callable[[Any], None]]): Function releasing a loaded
+                value that will not be yielded. Defaults to None.
+        """
+        self.files = files
+        self.load = load
+        self.workers = max(1, workers)
+        self.max_bytes = max_bytes
+        self.discard = discard
+
+    def __iter__(self) -> Iterator[Tuple[Path, Any]]:
+        """
+        Yield (file, loaded value or raised exception) pairs in input order.
+        """
+        lookahead = 2 * self.workers
+        pending = deque()
+        queued_bytes = 0
+        next_index = 0
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="audio-prefetch") as executor:
+            try:
+                while True:
+                    # Start loading upcoming files while there is room in the queue
+                    while next_index < len(self.files) and len(pending) < lookahead:
+                        file_path = self.files[next_index]
+                        size = estimate_decoded_bytes(file_path)
+                        if pending and self.max_bytes is not None and queued_bytes + size > self.max_bytes:
+                            break
+                        pending.append((file_path, executor.submit(self.load, file_path), size))
+                        queued_bytes += size
+                        next_index += 1
+
+                    if not pending:
+                        return
+
+                    file_path, future, size = pending.popleft()
+                    try:
+                        outcome = future.result()
+                    except Exception as e:
+                        outcome = e
+                    queued_bytes -= size
+                    yield file_path, outcome
+            finally:
+                # Drop files not started yet when the consumer stops early and
+                # release the ones already loaded or being loaded
+                for _, future, _ in pending:
+                    if future.cancel():
+                        continue
+                    try:
+                        value = future.result()
+                    except Exception:
+                        continue
+                    if self.discard is not None:
+                        self.discard(value)
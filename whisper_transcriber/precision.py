@@ -0,0 +1,169 @@
+import os
+import hashlib
+from pathlib import Path
+from typing import Optional, Tuple
+
+import torch
+import whisper
+from torch import nn
+from whisper.model import Linear
+
+# Weight precisions a model can be loaded in
+PRECISIONS = ("fp32", "bf16", "int8")
+
+
+def default_cache_dir() -> str:
+    """Return the default directory for converted models."""
+    cache_home = os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(cache_home, "whisper-transcriber", "models")
+
+
+def bf16_supported(device: str) -> bool:
+    """
+    Check whether bfloat16 matrix multiplication is accelerated on a device.
+
+    Args:
+        device (str): "cpu" or a CUDA device.
+
+    Returns:
+        bool: True on CUDA GPUs with bf16 support and CPUs with AVX512-BF16 or AMX.
+    """
+    if device.startswith("cuda"):
+        return torch.cuda.is_available() and torch.cuda.is_bf16_supported()
+    return torch.cpu._is_avx512_bf16_supported() or torch.cpu._is_amx_tile_supported()
+
+
+def _bf16_input(module: nn.Module, args: Tuple) -> Tuple:
+    """Forward pre-hook casting the encoder input, or the decoder's audio features, to bf16."""
+    if isinstance(module, whisper.model.AudioEncoder):
+        return (args[0].to(torch.bfloat16),) + args[1:]
+    return (args[0], args[1].to(torch.bfloat16)) + args[2:]
+
+
+def _fp32_output(module: nn.Module, args: Tuple, output: torch.Tensor) -> torch.Tensor:
+    """Forward hook returning encoder output in fp32, as whisper's decoding expects."""
+    return output.float()
+
+
+def install_bf16_hooks(model: nn.Module) -> nn.Module:
+    """
+    Make a model with bf16 weights compute in bf16.
+
+    Whisper casts weights to the input dtype, so the encoder and decoder
+    inputs are cast to bf16, and encoder output back to fp32.
+    """
+    model.encoder.register_forward_pre_hook(_bf16_input)
+    model.encoder.register_forward_hook(_fp32_output)
+    model.decoder.register_forward_pre_hook(_bf16_input)
+    return model
+
+
+def _to_bf16(model: nn.Module) -> nn.Module:
+    """Store weights in bf16 and run the encoder and decoder in bf16."""
+    model.to(torch.bfloat16)
+    # Whisper computes layer norms in fp32; keep their parameters in fp32 too
+    for module in model.modules():
+        if isinstance(module, nn.LayerNorm):
+            module.float()
+    return install_bf16_hooks(model)
+
+
+def _to_int8(model: nn.Module) -> nn.Module:
+    """Quantize the Linear layers to int8 with dynamically quantized activations."""
+    # quantize_dynamic matches exact module types; whisper's Linear only adds
+    # dtype casting, which the quantized layers do not need
+    for module in model.modules():
+        if type(module) is Linear:
+            module.__class__ = nn.Linear
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def convert_model(model: nn.Module, precision: str) -> nn.Module:
+    """
+    Convert an fp32 Whisper model to another precision in place.
+
+    Args:
+        model (nn.Module): Model loaded with ``whisper.load_model``.
+        precision (str): One of ``PRECISIONS``.
+
+    Returns:
+        nn.Module: The converted model.
+
+    Raises:
+        ValueError: If the precision is unknown, or int8 is requested off CPU.
+    """
+    if precision == "fp32":
+        return model
+    if precision == "bf16":
+        return _to_bf16(model)
+    if precision == "int8":
+        if next(model.parameters()).device.type != "cpu":
+            raise ValueError("int8 precision is only supported on CPU")
+        return _to_int8(model)
+    raise ValueError(f"Unsupported model precision: {precision}")
+
+
+def cache_path(model_name: str, precision: str, cache_dir: str, suffix: str = ".pt") -> Path:
+    """
+    Path of the converted model in the cache.
+
+    The name includes the checkpoint's size and modification time, when it is
+    a file, and the torch and whisper versions, since a pickled module tree is
+    only valid for the versions that wrote it.
+    """
+    source = [model_name, torch.__version__, whisper.__version__]
+    if os.path.isfile(model_name):
+        stat = os.stat(model_name)
+        source += [os.path.abspath(model_name), str(stat.st_size), str(stat.st_mtime_ns)]
+    digest = hashlib.sha256("|".join(source).encode()).hexdigest()[:16]
+    return Path(cache_dir) / f"{Path(model_name).stem}-{precision}-{digest}{suffix}"
+
+
+def load_model(model_name: str, device: str = "cpu", precision: str = "fp32",
+               cache_dir: Optional[str] = None, snapshot: bool = False) -> nn.Module:
+    """
+    Load a Whisper model in the requested precision.
+
+    Converted models are saved to ``cache_dir`` so that later loads skip
+    reading the fp32 checkpoint and converting it. With ``snapshot``, fp32
+    and bf16 models are saved as memory-mappable snapshots instead (see
+    ``snapshot.py``); int8 models always use the pickled cache, since packed
+    weights cannot be memory mapped.
+
+    Args:
+        model_name (str): Whisper model name or checkpoint path.
+        device (str, optional): Device to load the model on. Defaults to "cpu".
+        precision (str, optional): One of ``PRECISIONS``. Defaults to "fp32".
+        cache_dir (Optional[str]): Directory for converted models and
+            snapshots. Defaults to ``default_cache_dir()``.
+        snapshot (bool, optional): Load weights from a memory-mapped snapshot,
+            writing it on first use. Defaults to False.
+
+    Returns:
+        nn.Module: The loaded model.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unsupported model precision: {precision}")
+    cache_dir = cache_dir or default_cache_dir()
+
+    if snapshot and precision != "int8":
+        from .snapshot import load_or_create_snapshot
+        return load_or_create_snapshot(model_name, device, precision, cache_dir)
+    if precision == "fp32":
+        return whisper.load_model(model_name, device=device)
+
+    path = cache_path(model_name, precision, cache_dir)
+    if path.exists():
+        try:
+            return torch.load(path, map_location=device, weights_only=False)
+        except Exception:
+            # Unreadable cache entry; convert again and overwrite it
+            pass
+
+    model = convert_model(whisper.load_model(model_name, device=device), precision)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    torch.save(model, temp_path)
+    os.replace(temp_path, path)
+    return model
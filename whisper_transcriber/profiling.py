@@ -0,0 +1,325 @@
+import time
+import threading
+import functools
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List, Tuple, Sequence, Callable, Iterator
+
+# Hook called as hook(stage, wall seconds, CPU seconds) whenever a stage ends
+StageHook = Callable[[str, float, float], None]
+
+# Per-thread profiling state: the active timings, stage nesting depth and
+# start times of running stages
+_local = threading.local()
+
+
+class StageTimings:
+    """
+    Wall and CPU time spent in each processing stage of one file.
+
+    Stages are recorded with ``stage`` while the timings are active in the
+    current thread (see ``activate``). Stages started inside another stage,
+    such as the encoder inside inference, are recorded too but do not count
+    towards the file's total. CPU time is process CPU time, so it includes
+    torch's intra-op threads, and other files' work when files run in
+    parallel threads.
+    """
+
+    def __init__(self, hooks: Sequence[StageHook] = ()):
+        """
+        Initialize empty timings.
+
+        Args:
+            hooks (Sequence[StageHook]): Called with every stage as it ends.
+        """
+        self.hooks = list(hooks)
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.audio_seconds: Optional[float] = None  # Duration of the decoded audio, when known
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, wall: float, cpu: float, nested: bool = False, calls: int = 1) -> None:
+        """
+        Record time spent in a stage.
+
+        Args:
+            stage (str): Stage name.
+            wall (float): Wall-clock seconds.
+            cpu (float): Process CPU seconds.
+            nested (bool, optional): Whether the stage ran inside another stage. Defaults to False.
+            calls (int, optional): Number of times the stage ran. Defaults to 1.
+        """
+        with self._lock:
+            entry = self.stages.setdefault(stage, {"wall_s": 0.0, "cpu_s": 0.0, "calls": 0})
+            entry["wall_s"] += wall
+            entry["cpu_s"] += cpu
+            entry["calls"] += calls
+            if not nested:
+                self.wall += wall
+                self.cpu += cpu
+        for hook in self.hooks:
+            hook(stage, wall, cpu)
+
+    def merge(self, other: "StageTimings", share: float = 1.0) -> None:
+        """
+        Add a share of another timings' stages, e.g. of a batch decoded for several files.
+
+        Hooks are not called again for merged stages.
+
+        Args:
+            other (StageTimings): Timings to add.
+            share (float, optional): Fraction of the other timings to add. Defaults to 1.0.
+        """
+        with self._lock:
+            for stage, other_entry in other.stages.items():
+                entry = self.stages.setdefault(stage, {"wall_s": 0.0, "cpu_s": 0.0, "calls": 0})
+                entry["wall_s"] += other_entry["wall_s"] * share
+                entry["cpu_s"] += other_entry["cpu_s"] * share
+                entry["calls"] += other_entry["calls"]
+            self.wall += other.wall * share
+            self.cpu += other.cpu * share
+
+    def to_dict(self, result: Optional[Dict[str, Any]] = None,
+                temperatures: Sequence[float] = ()) -> Dict[str, Any]:
+        """
+        Describe the timings, with decoding statistics taken from a result.
+
+        Args:
+            result (Optional[Dict[str, Any]]): Transcription result of the file.
+            temperatures (Sequence[float]): Temperature schedule the file was decoded with.
+
+        Returns:
+            Dict[str, Any]: Total wall and CPU seconds, seconds per stage and,
+                with a result, the decoding statistics of ``decoding_stats``.
+        """
+        with self._lock:
+            timings = {
+                "wall_s": self.wall,
+                "cpu_s": self.cpu,
+                "stages": {stage: dict(entry) for stage, entry in self.stages.items()}
+            }
+        if result is not None:
+            decoder = timings["stages"].get("decoder") or timings["stages"].get("inference")
+            timings.update(decoding_stats(result, temperatures, decoder["wall_s"] if decoder else None))
+        return timings
+
+
+def decoding_stats(result: Dict[str, Any], temperatures: Sequence[float],
+                   decode_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Count decoded windows, temperature fallbacks and tokens in a result.
+
+    A window's fallbacks are the number of temperatures tried before the one
+    its segments were decoded at. Windows skipped as silence have no segments
+    and are not counted.
+
+    Args:
+        result (Dict[str, Any]): Transcription result.
+        temperatures (Sequence[float]): Temperature schedule used for decoding.
+        decode_seconds (Optional[float]): Seconds spent decoding, for the token rate.
+
+    Returns:
+        Dict[str, Any]: Number of windows, fallbacks per window, total
+            fallbacks, tokens and tokens decoded per second.
+    """
+    windows: Dict[Tuple[Any, Any], int] = {}
+    tokens = 0
+    for segment in result.get("segments", []):
+        tokens += len(segment.get("tokens", []))
+        temperature = segment.get("temperature")
+        key = (segment.get("seek"), temperature)
+        if key not in windows:
+            retries = [i for i, t in enumerate(temperatures) if temperature is not None and abs(t - temperature) < 1e-6]
+            windows[key] = retries[0] if retries else 0
+
+    fallbacks = list(windows.values())
+    return {
+        "windows": len(fallbacks),
+        "fallbacks_per_window": fallbacks,
+        "fallbacks": sum(fallbacks),
+        "tokens": tokens,
+        "tokens_per_s": tokens / decode_seconds if decode_seconds else None
+    }
+
+
+def current() -> Optional[StageTimings]:
+    """Return the timings active in the current thread, if any."""
+    return getattr(_local, "timings", None)
+
+
+@contextmanager
+def activate(timings: Optional[StageTimings], nested: bool = False) -> Iterator[None]:
+    """
+    Record stages of the current thread into ``timings`` while the block runs.
+
+    Args:
+        timings (Optional[StageTimings]): Timings to record into; None disables recording.
+        nested (bool, optional): Treat every stage as nested, for helper threads
+            working inside a stage of another thread. Defaults to False.
+    """
+    starts = getattr(_local, "starts", None)
+    previous = (current(), getattr(_local, "depth", 0), len(starts) if starts is not None else 0)
+    _local.timings, _local.depth = timings, int(nested)
+    try:
+        yield
+    finally:
+        # A forward pass that raised leaves its hook's stage open; drop it
+        _local.timings, _local.depth, count = previous
+        if hasattr(_local, "starts"):
+            del _local.starts[count:]
+
+
+def _begin() -> None:
+    """Mark the start of a stage in the current thread."""
+    _local.depth = getattr(_local, "depth", 0) + 1
+    starts = getattr(_local, "starts", None)
+    if starts is None:
+        starts = _local.starts = []
+    starts.append((time.perf_counter(), time.process_time()))
+
+
+def _end(name: str) -> None:
+    """Record the stage started by the matching ``_begin``."""
+    wall_start, cpu_start = _local.starts.pop()
+    _local.depth -= 1
+    _local.timings.add(name, time.perf_counter() - wall_start, time.process_time() - cpu_start,
+                       nested=_local.depth > 0)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a block as a stage of the active timings; does nothing when none are active.
+
+    Args:
+        name (str): Stage name.
+    """
+    if current() is None:
+        yield
+        return
+    _begin()
+    try:
+        yield
+    finally:
+        _end(name)
+
+
+def _make_model_hooks(name: str) -> Tuple[Callable, Callable]:
+    """Create forward pre- and post-hooks timing a module as stage ``name``."""
+    def start(module, args):
+        if current() is not None:
+            _begin()
+
+    def stop(module, args, output):
+        if current() is not None:
+            _end(name)
+
+    return start, stop
+
+
+def _timed_decode(model: Any, *args: Any, **kwargs: Any) -> Any:
+    """Run the model class's ``decode`` as the "decoder" stage."""
+    if current() is None:
+        return type(model).decode(model, *args, **kwargs)
+    with stage("decoder"):
+        return type(model).decode(model, *args, **kwargs)
+
+
+def install_model_hooks(model: Any) -> None:
+    """
+    Time every encoder forward pass and ``decode`` call of a Whisper model.
+
+    The decoder runs a forward pass per generated token, so decoding is timed
+    once per ``decode`` call instead; the "decoder" stage therefore includes
+    the encoder pass whisper runs inside ``decode`` when given a spectrogram,
+    which is also recorded on its own as "encoder". The hooks only record
+    while timings are active in the calling thread, so a shared model can be
+    profiled from some transcribers and not others. Replicas made with
+    ``replicate_model`` keep the hooks. Installing twice has no effect.
+
+    Args:
+        model (Any): Whisper model.
+    """
+    if getattr(model, "_stage_hooks_installed", False):
+        return
+    start, stop = _make_model_hooks("encoder")
+    model.encoder.register_forward_pre_hook(start)
+    model.encoder.register_forward_hook(stop)
+    # A partial rather than a closure, so that deep copies call their own decode
+    model.decode = functools.partial(_timed_decode, model)
+    model._stage_hooks_installed = True
+
+
+class ProfileSummary:
+    """
+    Aggregate of the per-file timings of a batch run.
+
+    Reports, per stage, the total and mean time, the 95th percentile per
+    file and the stage's share of all top-level time, so the stage that
+    dominates a large batch stands out.
+    """
+
+    def __init__(self):
+        """Initialize an empty summary."""
+        self.files: List[Dict[str, Any]] = []
+
+    def add(self, timings: Dict[str, Any]) -> None:
+        """Add the timings of one file, as returned by ``StageTimings.to_dict``."""
+        self.files.append(timings)
+
+    def extend(self, timings: Sequence[Dict[str, Any]]) -> None:
+        """Add the timings of several files."""
+        self.files.extend(timings)
+
+    def to_dict(self, slowest: int = 5) -> Dict[str, Any]:
+        """
+        Summarize the timings collected so far.
+
+        Args:
+            slowest (int, optional): Number of slowest files to list. Defaults to 5.
+
+        Returns:
+            Dict[str, Any]: File count, total wall and CPU seconds, statistics
+                per stage (slowest stage first), fallback and token totals and
+                the slowest files.
+        """
+        total_wall = sum(timings["wall_s"] for timings in self.files)
+        stages: Dict[str, Dict[str, Any]] = {}
+        for timings in self.files:
+            for name, entry in timings["stages"].items():
+                stats = stages.setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0, "calls": 0, "per_file": []})
+                stats["wall_s"] += entry["wall_s"]
+                stats["cpu_s"] += entry["cpu_s"]
+                stats["calls"] += entry["calls"]
+                stats["per_file"].append(entry["wall_s"])
+
+        for stats in stages.values():
+            per_file = sorted(stats.pop("per_file"))
+            stats["files"] = len(per_file)
+            stats["mean_wall_s"] = stats["wall_s"] / len(per_file)
+            stats["p95_wall_s"] = per_file[min(len(per_file) - 1, int(0.95 * len(per_file)))]
+            stats["share"] = stats["wall_s"] / total_wall if total_wall else None
+
+        tokens = sum(timings.get("tokens", 0) for timings in self.files)
+        decode_seconds = sum(
+            (timings["stages"].get("decoder") or timings["stages"].get("inference") or {}).get("wall_s", 0.0)
+            for timings in self.files
+        )
+        windows = sum(timings.get("windows", 0) for timings in self.files)
+        fallbacks = sum(timings.get("fallbacks", 0) for timings in self.files)
+
+        return {
+            "files": len(self.files),
+            "wall_s": total_wall,
+            "cpu_s": sum(timings["cpu_s"] for timings in self.files),
+            "stages": dict(sorted(stages.items(), key=lambda item: item[1]["wall_s"], reverse=True)),
+            "windows": windows,
+            "fallbacks": fallbacks,
+            "fallbacks_per_window": fallbacks / windows if windows else None,
+            "tokens": tokens,
+            "tokens_per_s": tokens / decode_seconds if decode_seconds else None,
+            "slowest_files": [
+                {"file": timings.get("file"), "wall_s": timings["wall_s"]}
+                for timings in sorted(self.files, key=lambda t: t["wall_s"], reverse=True)[:slowest]
+            ]
+        }
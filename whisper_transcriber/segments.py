@@ -0,0 +1,422 @@
+from collections.abc import Mapping, Sequence
+from itertools import chain
+from typing import Dict, Any, Optional, Union, List, Tuple, Iterable, Iterator
+
+import numpy as np
+
+# Per-segment numeric fields of whisper results and the column type they are stored in
+NUMERIC_FIELDS = {
+    "id": np.int64,
+    "seek": np.int64,
+    "start": np.float64,
+    "end": np.float64,
+    "temperature": np.float64,
+    "avg_logprob": np.float64,
+    "compression_ratio": np.float64,
+    "no_speech_prob": np.float64,
+}
+
+# Keys of whisper's word timestamps, in the order they are reported
+WORD_FIELDS = ("word", "start", "end", "probability")
+
+
+def format_timestamps(seconds: Union[np.ndarray, Iterable[float]], vtt: bool = False) -> List[str]:
+    """
+    Convert many times to subtitle timestamps at once.
+
+    Hours, minutes and seconds are split off for all times in one pass;
+    the result matches ``OutputHandler._format_timestamp`` for every time.
+
+    Args:
+        seconds (Union[np.ndarray, Iterable[float]]): Times in seconds.
+        vtt (bool, optional): Whether to use VTT timestamp format. Defaults to False.
+
+    Returns:
+        List[str]: Formatted timestamps.
+    """
+    seconds = np.asarray(seconds, dtype=np.float64)
+    hours = (seconds // 3600).astype(np.int64).tolist()
+    minutes = ((seconds % 3600) // 60).astype(np.int64).tolist()
+    secs = (seconds % 60).tolist()
+    stamps = [f"{h:02d}:{m:02d}:{s:06.3f}" for h, m, s in zip(hours, minutes, secs)]
+    if vtt:
+        return stamps
+    return [stamp.replace(".", ",") for stamp in stamps]
+
+
+def _offsets(lengths: Iterable[int], count: int) -> np.ndarray:
+    """Return the start offsets of ``count`` consecutive runs, followed by the total length."""
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(lengths, dtype=np.int64, count=count), out=offsets[1:])
+    return offsets
+
+
+def _gather(offsets: np.ndarray, indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Select runs of a flat buffer.
+
+    Returns the positions in the old buffer of every element of the selected
+    runs, in order, and the offsets of the runs in the new buffer.
+    """
+    starts = offsets[indices]
+    lengths = offsets[indices + 1] - starts
+    new_offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=new_offsets[1:])
+    positions = np.arange(new_offsets[-1], dtype=np.int64) + np.repeat(starts - new_offsets[:-1], lengths)
+    return positions, new_offsets
+
+
+class Word(Mapping):
+    """
+    Word timestamp of a segment.
+
+    Slotted record read like the dict whisper reports: ``word['start']``,
+    ``word.get('probability')``, ``dict(word)``.
+    """
+
+    __slots__ = WORD_FIELDS
+
+    def __init__(self, word: str, start: float, end: float, probability: Optional[float] = None):
+        self.word = word
+        self.start = start
+        self.end = end
+        self.probability = probability
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in WORD_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(WORD_FIELDS)
+
+    def __len__(self) -> int:
+        return len(WORD_FIELDS)
+
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the word as a plain dict."""
+        return {key: getattr(self, key) for key in WORD_FIELDS}
+
+
+class SegmentView(Mapping):
+    """
+    Read-only, dict-compatible view of one segment of a ``SegmentStore``.
+
+    Values are read from the store's columns on access. ``copy`` and
+    ``to_dict`` return independent plain dicts.
+    """
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: "SegmentStore", index: int):
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        return self._store._value(self._index, key)
+
+    def __contains__(self, key: object) -> bool:
+        return self._store._has(self._index, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return self._store._keys(self._index)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return repr(self.copy())
+
+    def copy(self) -> Dict[str, Any]:
+        """Return the segment as a plain dict, sharing its word records."""
+        return {key: self[key] for key in self}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the segment as plain dicts and lists, as whisper reports it."""
+        segment = self.copy()
+        # Words that aren't stored as records are returned as they were reported
+        if self._store.stored_words(self._index):
+            segment["words"] = [dict(word) for word in segment["words"]]
+        return segment
+
+
+class SegmentStore(Sequence):
+    """
+    Columnar storage of the segments of a transcription result.
+
+    Numeric fields are NumPy columns, the texts share one string buffer and
+    the token ids one array, each addressed by per-segment offsets, and word
+    timestamps are slotted ``Word`` records. A long word-timestamped
+    transcript takes a fraction of the memory of whisper's list of dicts,
+    and filters and subtitle timestamps work on whole columns.
+
+    The store reads like the list it replaces: it has a length, can be
+    indexed, sliced and iterated, and yields ``SegmentView`` mappings.
+    Fields that not every segment has, or that don't fit a column, are kept
+    per segment as they were.
+    """
+
+    def __init__(self, fields: Tuple[str, ...], columns: Dict[str, np.ndarray],
+                 text: Optional[str], text_offsets: Optional[np.ndarray],
+                 tokens: Optional[np.ndarray], token_offsets: Optional[np.ndarray],
+                 words: List[Word], word_offsets: np.ndarray, has_words: np.ndarray,
+                 extras: Dict[int, Dict[str, Any]]):
+        """
+        Initialize the store from its columns; use ``from_segments`` to build one.
+
+        Args:
+            fields (Tuple[str, ...]): Stored keys in the order segments report them.
+            columns (Dict[str, np.ndarray]): Numeric column per key.
+            text (Optional[str]): Concatenated segment texts, None when not stored.
+            text_offsets (Optional[np.ndarray]): Start of each text in ``text``, plus its length.
+            tokens (Optional[np.ndarray]): Concatenated token ids, None when not stored.
+            token_offsets (Optional[np.ndarray]): Start of each segment's tokens, plus their count.
+            words (List[Word]): Word records of all segments.
+            word_offsets (np.ndarray): Start of each segment's words, plus their count.
+            has_words (np.ndarray): Whether each segment has stored word timestamps.
+            extras (Dict[int, Dict[str, Any]]): Remaining fields per segment index.
+        """
+        self.fields = fields
+        self._columns = columns
+        self._text = text
+        self._text_offsets = text_offsets
+        self._tokens = tokens
+        self._token_offsets = token_offsets
+        self._words = words
+        self._word_offsets = word_offsets
+        self._has_words = has_words
+        self._extras = extras
+        self._text_lengths: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[Dict[str, Any]]) -> "SegmentStore":
+        """
+        Pack segments into a store.
+
+        Args:
+            segments (Iterable[Dict[str, Any]]): Segments as reported by whisper,
+                or the views of another store.
+
+        Returns:
+            SegmentStore: Store with the same segments.
+        """
+        segments = list(segments)
+        count = len(segments)
+        common = set.intersection(*(set(segment) for segment in segments)) if segments else set()
+
+        columns = {}
+        for key, dtype in NUMERIC_FIELDS.items():
+            if key not in common:
+                continue
+            values = [segment[key] for segment in segments]
+            if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+                columns[key] = np.array(values, dtype=dtype)
+
+        text = text_offsets = None
+        if "text" in common and all(isinstance(segment["text"], str) for segment in segments):
+            texts = [segment["text"] for segment in segments]
+            text = "".join(texts)
+            text_offsets = _offsets((len(t) for t in texts), count)
+
+        tokens = token_offsets = None
+        if "tokens" in common and all(isinstance(segment["tokens"], (list, tuple)) for segment in segments):
+            token_lists = [segment["tokens"] for segment in segments]
+            token_offsets = _offsets((len(t) for t in token_lists), count)
+            tokens = np.fromiter(chain.from_iterable(token_lists), dtype=np.int32, count=int(token_offsets[-1]))
+
+        words: List[Word] = []
+        word_counts = np.zeros(count, dtype=np.int64)
+        has_words = np.zeros(count, dtype=bool)
+        stored = set(columns)
+        if text is not None:
+            stored.add("text")
+        if tokens is not None:
+            stored.add("tokens")
+
+        extras: Dict[int, Dict[str, Any]] = {}
+        for i, segment in enumerate(segments):
+            segment_words = segment.get("words")
+            if segment_words is not None and all(_is_word(word) for word in segment_words):
+                words.extend(
+                    word if isinstance(word, Word) else Word(word["word"], word["start"], word["end"], word.get("probability"))
+                    for word in segment_words
+                )
+                word_counts[i] = len(segment_words)
+                has_words[i] = True
+            leftover = {
+                key: value for key, value in segment.items()
+                if key not in stored and not (key == "words" and has_words[i])
+            }
+            if leftover:
+                extras[i] = leftover
+
+        if has_words.any():
+            stored.add("words")
+        fields = tuple(key for key in (segments[0] if segments else ()) if key in stored)
+        if "words" in stored and "words" not in fields:
+            fields += ("words",)
+
+        word_offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(word_counts, out=word_offsets[1:])
+        return cls(fields, columns, text, text_offsets, tokens, token_offsets,
+                   words, word_offsets, has_words, extras)
+
+    def __len__(self) -> int:
+        return len(self._has_words)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[SegmentView, "SegmentStore"]:
+        if isinstance(index, slice):
+            return self.take(np.arange(len(self))[index])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("segment index out of range")
+        return SegmentView(self, index)
+
+    def __iter__(self) -> Iterator[SegmentView]:
+        return (SegmentView(self, i) for i in range(len(self)))
+
+    def __repr__(self) -> str:
+        return f"SegmentStore({len(self)} segments, {len(self._words)} words)"
+
+    def _value(self, index: int, key: str) -> Any:
+        """Return one field of a segment."""
+        column = self._columns.get(key)
+        if column is not None:
+            return column[index].item()
+        if key == "text" and self._text is not None:
+            return self._text[self._text_offsets[index]:self._text_offsets[index + 1]]
+        if key == "tokens" and self._tokens is not None:
+            return self._tokens[self._token_offsets[index]:self._token_offsets[index + 1]].tolist()
+        if key == "words" and self._has_words[index]:
+            return self._words[self._word_offsets[index]:self._word_offsets[index + 1]]
+        extras = self._extras.get(index)
+        if extras is not None and key in extras:
+            return extras[key]
+        raise KeyError(key)
+
+    def _has(self, index: int, key: object) -> bool:
+        """Return whether a segment has a field."""
+        if key == "words" and self._has_words[index]:
+            return True
+        if key in self.fields and key != "words":
+            return True
+        extras = self._extras.get(index)
+        return extras is not None and key in extras
+
+    def _keys(self, index: int) -> Iterator[str]:
+        """Yield the fields of a segment, stored ones first."""
+        for key in self.fields:
+            if key != "words" or self._has_words[index]:
+                yield key
+        yield from self._extras.get(index, ())
+
+    @property
+    def has_words(self) -> bool:
+        """Whether any segment has word timestamps."""
+        return bool(self._has_words.any()) or any("words" in extras for extras in self._extras.values())
+
+    @property
+    def text_lengths(self) -> np.ndarray:
+        """Length of each segment's text without surrounding whitespace."""
+        if self._text_lengths is None:
+            self._text_lengths = np.fromiter(
+                (len(segment.get("text", "").strip()) for segment in self),
+                dtype=np.int64, count=len(self)
+            )
+        return self._text_lengths
+
+    def take(self, indices: Union[np.ndarray, List[int]]) -> "SegmentStore":
+        """
+        Select segments by index or boolean mask.
+
+        Args:
+            indices (Union[np.ndarray, List[int]]): Segment indices, in the order
+                to keep, or a boolean mask over the segments.
+
+        Returns:
+            SegmentStore: New store with the selected segments.
+        """
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        indices = indices.astype(np.int64)
+
+        columns = {key: column[indices] for key, column in self._columns.items()}
+
+        text = text_offsets = None
+        if self._text is not None:
+            offsets = self._text_offsets
+            text = "".join(self._text[offsets[i]:offsets[i + 1]] for i in indices.tolist())
+            _, text_offsets = _gather(offsets, indices)
+
+        tokens = token_offsets = None
+        if self._tokens is not None:
+            positions, token_offsets = _gather(self._token_offsets, indices)
+            tokens = self._tokens[positions]
+
+        positions, word_offsets = _gather(self._word_offsets, indices)
+        words = [self._words[position] for position in positions.tolist()]
+
+        extras = {
+            new: self._extras[old]
+            for new, old in enumerate(indices.tolist()) if old in self._extras
+        }
+        store = SegmentStore(self.fields, columns, text, text_offsets, tokens, token_offsets,
+                             words, word_offsets, self._has_words[indices], extras)
+        if self._text_lengths is not None:
+            store._text_lengths = self._text_lengths[indices]
+        return store
+
+    def format_timestamps(self, vtt: bool = False) -> Tuple[List[str], List[str]]:
+        """
+        Format the start and end of every segment as subtitle timestamps.
+
+        Args:
+            vtt (bool, optional): Whether to use VTT timestamp format. Defaults to False.
+
+        Returns:
+            Tuple[List[str], List[str]]: Start and end timestamps per segment.
+        """
+        starts = self._columns.get("start")
+        ends = self._columns.get("end")
+        if starts is None:
+            starts = np.array([segment["start"] for segment in self], dtype=np.float64)
+        if ends is None:
+            ends = np.array([segment["end"] for segment in self], dtype=np.float64)
+        return format_timestamps(starts, vtt), format_timestamps(ends, vtt)
+
+    def format_word_timestamps(self, vtt: bool = False) -> Tuple[List[str], List[str], np.ndarray]:
+        """
+        Format the start and end of every stored word as subtitle timestamps.
+
+        Args:
+            vtt (bool, optional): Whether to use VTT timestamp format. Defaults to False.
+
+        Returns:
+            Tuple[List[str], List[str], np.ndarray]: Start and end timestamps of
+                all words, and the offset of each segment's first word (plus the
+                word count) into them.
+        """
+        count = len(self._words)
+        starts = np.fromiter((word.start for word in self._words), dtype=np.float64, count=count)
+        ends = np.fromiter((word.end for word in self._words), dtype=np.float64, count=count)
+        return format_timestamps(starts, vtt), format_timestamps(ends, vtt), self._word_offsets
+
+    def stored_words(self, index: int) -> bool:
+        """Return whether a segment's word timestamps are stored as ``Word`` records."""
+        return bool(self._has_words[index])
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Return the segments as the list of plain dicts whisper reports."""
+        return [segment.to_dict() for segment in self]
+
+
+def _is_word(word: Any) -> bool:
+    """Return whether a word timestamp can be stored as a ``Word`` record."""
+    if isinstance(word, Word):
+        return True
+    return isinstance(word, dict) and set(word) <= set(WORD_FIELDS) and {"word", "start", "end"} <= set(word)
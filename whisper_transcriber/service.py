@@ -0,0 +1,531 @@
+import os
+import json
+import asyncio
+import argparse
+import tempfile
+import threading
+import dataclasses
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Union, Tuple, Callable, TYPE_CHECKING
+from urllib.parse import urlsplit, parse_qs
+
+from .config import TranscriptionConfig
+from .metrics import CONTENT_TYPE
+from .output_handler import json_default
+
+if TYPE_CHECKING:
+    from .transcriber import WhisperTranscriber
+
+# Largest request body accepted by the HTTP server, in bytes
+MAX_BODY_BYTES = 512 * 1024 * 1024
+
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    504: "Gateway Timeout"
+}
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a request is rejected because the queue is at capacity."""
+
+
+@dataclass
+class _Job:
+    """A queued transcription request."""
+    audio_path: Path
+    future: asyncio.Future
+    cleanup: Optional[Callable[[], None]] = None
+    cancelled: bool = False  # Set when the caller stopped waiting, read by inference threads
+
+    def finish(self) -> None:
+        """Run the cleanup once the service no longer needs the audio file."""
+        cleanup, self.cleanup = self.cleanup, None
+        if cleanup is not None:
+            cleanup()
+
+
+def _remove_file(path: Union[str, Path]) -> None:
+    """Delete a file if it still exists."""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+class AsyncTranscriber:
+    """
+    asyncio front-end that queues requests and decodes them in micro-batches.
+
+    Requests wait in a bounded queue. A dispatcher takes the first waiting
+    request, collects whatever else arrives within ``batch_window`` seconds
+    (up to ``max_batch_size`` requests) and hands the batch to a dedicated
+    thread pool, where short clips are decoded together in one forward pass.
+    At most ``workers`` batches run at a time, each on its own weight-sharing
+    model replica, so concurrent requests never compete for the same cores
+    outside the pool. Requests beyond ``max_queue`` are rejected with
+    ``QueueFullError`` and requests waiting longer than their timeout fail
+    with ``TimeoutError``. A request that times out is skipped if its batch
+    has not reached an inference thread yet; one already being decoded runs
+    to completion and keeps its audio file until then.
+    """
+
+    def __init__(self, transcriber: "WhisperTranscriber", max_batch_size: int = 8,
+                 batch_window: float = 0.01, max_queue: int = 64,
+                 timeout: Optional[float] = None, workers: int = 1):
+        """
+        Initialize the front-end.
+
+        Args:
+            transcriber (WhisperTranscriber): Transcriber providing the model and configuration.
+            max_batch_size (int, optional): Most requests decoded together. Defaults to 8.
+            batch_window (float, optional): Seconds to wait for more requests after the
+                first one of a batch arrives. Defaults to 0.01.
+            max_queue (int, optional): Most requests waiting to be scheduled. Defaults to 64.
+            timeout (Optional[float]): Default per-request timeout in seconds. Defaults to None.
+            workers (int, optional): Batches decoded concurrently. Defaults to 1.
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be a positive integer")
+        if batch_window < 0:
+            raise ValueError("batch_window cannot be negative")
+        if max_queue < 1:
+            raise ValueError("max_queue must be a positive integer")
+        if workers < 1:
+            raise ValueError("workers must be a positive integer")
+
+        self.transcriber = transcriber
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.workers = workers
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._batches = set()
+        self._local = threading.local()
+        self._previous_threads: Optional[int] = None
+        self._stats = {"completed": 0, "failed": 0, "rejected": 0, "timed_out": 0, "batches": 0}
+
+    @property
+    def running(self) -> bool:
+        """Whether the dispatcher is accepting requests."""
+        return self._dispatcher is not None
+
+    async def start(self) -> None:
+        """Start the dispatcher and the inference thread pool."""
+        if self.running:
+            return
+
+        import torch
+
+        # Torch threads are shared by all workers, like in parallel batch processing
+        self._previous_threads = torch.get_num_threads()
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // self.workers))
+
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._slots = asyncio.Semaphore(self.workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="whisper-inference",
+            initializer=self._init_worker
+        )
+        self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+
+        metrics = self.transcriber.metrics
+        if metrics is not None:
+            queue = self._queue
+            metrics.queue_depth.set_function(queue.qsize, queue="service")
+
+    async def stop(self) -> None:
+        """Stop accepting requests, finish running batches and fail queued requests."""
+        if not self.running:
+            return
+
+        self._dispatcher.cancel()
+        try:
+            await self._dispatcher
+        except asyncio.CancelledError:
+            pass
+        self._dispatcher = None
+
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+        while not self._queue.empty():
+            job = self._queue.get_nowait()
+            if not job.future.done():
+                job.future.set_exception(RuntimeError("Transcription service stopped"))
+            job.finish()
+
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+        if self.transcriber.metrics is not None:
+            self.transcriber.metrics.queue_depth.set_function(None, queue="service")
+
+        import torch
+        torch.set_num_threads(self._previous_threads)
+
+    async def __aenter__(self) -> "AsyncTranscriber":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, batches in flight and request counters."""
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "in_flight": len(self._batches),
+            "max_queue": self.max_queue,
+            **self._stats
+        }
+
+    async def transcribe(self, audio_path: Union[str, Path], timeout: Optional[float] = None,
+                         cleanup: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+        """
+        Transcribe an audio file through the queue.
+
+        Args:
+            audio_path (Union[str, Path]): Path to the audio file.
+            timeout (Optional[float]): Seconds to wait for the result. Defaults to
+                the front-end's timeout.
+            cleanup (Optional[Callable[[], None]]): Called once the file is no
+                longer needed, which can be after a timeout. Defaults to None.
+
+        Returns:
+            Dict[str, Any]: Transcription result, as returned by ``WhisperTranscriber.transcribe``.
+
+        Raises:
+            QueueFullError: If the queue is at capacity.
+            TimeoutError: If the result is not ready within the timeout.
+        """
+        future = self.submit(audio_path, cleanup)
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self._stats["timed_out"] += 1
+            raise
+
+    def submit(self, audio_path: Union[str, Path],
+               cleanup: Optional[Callable[[], None]] = None) -> asyncio.Future:
+        """
+        Queue an audio file without waiting for the result.
+
+        Cancelling the returned future drops the request if it has not
+        reached an inference thread yet.
+
+        Args:
+            audio_path (Union[str, Path]): Path to the audio file.
+            cleanup (Optional[Callable[[], None]]): Called once the file is no
+                longer needed: after its batch finished, when the request is
+                dropped, or right away when it is rejected. Defaults to None.
+
+        Returns:
+            asyncio.Future: Future resolving to the transcription result.
+
+        Raises:
+            QueueFullError: If the queue is at capacity.
+        """
+        if not self.running:
+            raise RuntimeError("AsyncTranscriber is not running; call start() first")
+
+        job = _Job(Path(audio_path), asyncio.get_running_loop().create_future(), cleanup)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self._stats["rejected"] += 1
+            job.finish()
+            raise QueueFullError(f"Request queue is full ({self.max_queue} waiting)") from None
+        job.future.add_done_callback(lambda future: setattr(job, "cancelled", future.cancelled()))
+        return job.future
+
+    def _init_worker(self) -> None:
+        """Give each inference thread its own model replica sized for micro-batches."""
+        worker = self.transcriber._worker_copy()
+        worker.config = dataclasses.replace(self.transcriber.config, batch_size=self.max_batch_size)
+        self._local.transcriber = worker
+
+    def _run_batch(self, jobs: List[_Job]) -> List[Any]:
+        """
+        Transcribe a batch on an inference thread.
+
+        Jobs cancelled since the batch was formed are skipped before their
+        audio is loaded and get None; failed files hold their exception.
+        """
+        outcomes: List[Any] = [None] * len(jobs)
+        live = [i for i, job in enumerate(jobs) if not job.cancelled]
+        if live:
+            results = self._local.transcriber._transcribe_paths_batched([jobs[i].audio_path for i in live])
+            for i, result in zip(live, results):
+                outcomes[i] = result
+        return outcomes
+
+    async def _next_batch(self) -> List[_Job]:
+        """Wait for a request, then collect the others arriving within the batch window."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.batch_window
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        # Requests that timed out or were cancelled while queued are dropped
+        for job in batch:
+            if job.future.done():
+                job.finish()
+        return [job for job in batch if not job.future.done()]
+
+    async def _dispatch(self) -> None:
+        """Form batches and start them whenever a worker is free."""
+        while True:
+            await self._slots.acquire()
+            try:
+                batch = await self._next_batch()
+            except BaseException:
+                self._slots.release()
+                raise
+            if not batch:
+                self._slots.release()
+                continue
+
+            task = asyncio.get_running_loop().create_task(self._complete_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _complete_batch(self, batch: List[_Job]) -> None:
+        """Run a batch on the executor and resolve its futures."""
+        try:
+            outcomes = await asyncio.get_running_loop().run_in_executor(self._executor, self._run_batch, batch)
+        except Exception as e:
+            outcomes = [e] * len(batch)
+        finally:
+            self._slots.release()
+            for job in batch:
+                job.finish()
+
+        self._stats["batches"] += 1
+        for job, outcome in zip(batch, outcomes):
+            if outcome is None:
+                continue  # Skipped after timing out
+            if isinstance(outcome, Exception):
+                self._stats["failed"] += 1
+                if not job.future.done():
+                    job.future.set_exception(outcome)
+            else:
+                self._stats["completed"] += 1
+                if not job.future.done():
+                    job.future.set_result(outcome)
+
+
+class TranscriptionServer:
+    """
+    Minimal local HTTP/1.1 server in front of an ``AsyncTranscriber``.
+
+    ``POST /transcribe`` takes the audio file as the request body and returns
+    the result as JSON, or formatted as ``?format=txt|srt|vtt|json``. An
+    optional ``?timeout=SECONDS`` overrides the default timeout. A full queue
+    answers 429, a timeout 504. ``GET /health`` returns the queue statistics
+    and, when the transcriber records metrics, ``GET /metrics`` returns them in
+    the Prometheus text format.
+    """
+
+    def __init__(self, service: AsyncTranscriber, host: str = "127.0.0.1", port: int = 8000):
+        """
+        Initialize the server.
+
+        Args:
+            service (AsyncTranscriber): Front-end handling the requests.
+            host (str, optional): Interface to listen on. Defaults to "127.0.0.1".
+            port (int, optional): Port to listen on. Defaults to 8000.
+        """
+        self.service = service
+        self.host = host
+        self.port = port
+
+    async def serve_forever(self) -> None:
+        """Start the transcription front-end and serve requests until cancelled."""
+        async with self.service:
+            server = await asyncio.start_server(self._handle, self.host, self.port)
+            async with server:
+                await server.serve_forever()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str], bytes]:
+        """Read one request and return its method, target, headers and body."""
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        method, target, _ = request_line.split(" ", 2)
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", 0))
+        if length > MAX_BODY_BYTES:
+            raise OverflowError(f"Request body exceeds {MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length) if length else b""
+        return method, target, headers, body
+
+    @staticmethod
+    def _response(status: int, body: Union[str, Dict[str, Any]],
+                  extra_headers: Optional[Dict[str, str]] = None) -> bytes:
+        """Build an HTTP response."""
+        if isinstance(body, dict):
+            payload = json.dumps(body, ensure_ascii=False, default=json_default).encode("utf-8")
+            content_type = "application/json"
+        else:
+            payload = body.encode("utf-8")
+            content_type = "text/plain; charset=utf-8"
+
+        headers = {
+            "Content-Type": content_type,
+            "Content-Length": str(len(payload)),
+            "Connection": "close",
+            **(extra_headers or {})
+        }
+        head = f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        return (head + "\r\n").encode("latin-1") + payload
+
+    async def _transcribe_body(self, body: bytes, query: Dict[str, List[str]]) -> Union[str, Dict[str, Any]]:
+        """Transcribe an uploaded audio file and format the result."""
+        output_format = query.get("format", ["json"])[0]
+        if output_format not in ("txt", "json", "srt", "vtt"):
+            raise ValueError(f"Unsupported output format: {output_format}")
+        timeout = float(query["timeout"][0]) if "timeout" in query else None
+
+        fd, audio_path = tempfile.mkstemp(suffix=".audio")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+        except BaseException:
+            _remove_file(audio_path)
+            raise
+        # The upload is removed once its job is done with it, which can be after a timeout
+        result = await self.service.transcribe(audio_path, timeout=timeout,
+                                               cleanup=lambda: _remove_file(audio_path))
+
+        if output_format == "json":
+            return result
+        return self.service.transcriber.output_handler.format_output(result, output_format)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one connection."""
+        try:
+            try:
+                method, target, _, body = await self._read_request(reader)
+            except OverflowError as e:
+                writer.write(self._response(413, {"error": str(e)}))
+                return
+            except (ValueError, asyncio.IncompleteReadError):
+                writer.write(self._response(400, {"error": "Malformed request"}))
+                return
+
+            url = urlsplit(target)
+            query = parse_qs(url.query)
+            if method == "GET" and url.path == "/health":
+                response = self._response(200, self.service.stats())
+            elif method == "GET" and url.path == "/metrics" and self.service.transcriber.metrics is not None:
+                response = self._response(200, self.service.transcriber.metrics.render(),
+                                          {"Content-Type": CONTENT_TYPE})
+            elif method == "POST" and url.path == "/transcribe":
+                try:
+                    response = self._response(200, await self._transcribe_body(body, query))
+                except QueueFullError as e:
+                    response = self._response(429, {"error": str(e)}, {"Retry-After": "1"})
+                except asyncio.TimeoutError:
+                    response = self._response(504, {"error": "Transcription timed out"})
+                except ValueError as e:
+                    response = self._response(400, {"error": str(e)})
+                except Exception as e:
+                    response = self._response(500, {"error": str(e)})
+            else:
+                response = self._response(404, {"error": f"No route for {method} {url.path}"})
+            writer.write(response)
+        finally:
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+            writer.close()
+
+
+def main():
+    """Run a local HTTP transcription server."""
+    parser = argparse.ArgumentParser(description="Local Whisper transcription server")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--model", default="base", help="Whisper model to use")
+    parser.add_argument("--language", help="Language of the audio (optional)")
+    parser.add_argument("--task", default="transcribe", choices=["transcribe", "translate"],
+                        help="Task to perform (transcribe or translate)")
+    parser.add_argument("--device", default="cpu", choices=["cpu", "cuda"],
+                        help="Device to use for computation")
+    parser.add_argument("--word-timestamps", action="store_true",
+                        help="Enable word-level timestamps")
+    parser.add_argument("--cache-dir",
+                        help="Directory for cached transcription results (enables caching)")
+    parser.add_argument("--batch-size", type=int, default=8,
+                        help="Most requests decoded together in one forward pass")
+    parser.add_argument("--batch-window", type=float, default=0.01,
+                        help="Seconds to wait for more requests before decoding a batch")
+    parser.add_argument("--max-queue", type=int, default=64,
+                        help="Most waiting requests; further requests are rejected with 429")
+    parser.add_argument("--timeout", type=float,
+                        help="Default per-request timeout in seconds (504 when exceeded)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Batches decoded concurrently")
+    parser.add_argument("--metrics", action="store_true",
+                        help="Record metrics and serve them at GET /metrics")
+    args = parser.parse_args()
+
+    # Imported after argument parsing so --help does not load torch and whisper
+    from .transcriber import WhisperTranscriber
+
+    config = TranscriptionConfig(
+        model_name=args.model,
+        language=args.language,
+        task=args.task,
+        device=args.device,
+        word_timestamps=args.word_timestamps,
+        cache_dir=args.cache_dir,
+        metrics=args.metrics
+    )
+    service = AsyncTranscriber(
+        WhisperTranscriber(config),
+        max_batch_size=args.batch_size,
+        batch_window=args.batch_window,
+        max_queue=args.max_queue,
+        timeout=args.timeout,
+        workers=args.workers
+    )
+
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(TranscriptionServer(service, args.host, args.port).serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
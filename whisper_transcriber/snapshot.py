@@ -0,0 +1,171 @@
+import os
+import time
+import argparse
+from dataclasses import asdict
+from pathlib import Path
+from typing import Optional, Union
+
+import torch
+import whisper
+from torch import nn
+from whisper.model import AudioEncoder, ModelDimensions, TextDecoder, Whisper
+
+from .precision import PRECISIONS, cache_path, convert_model, default_cache_dir, install_bf16_hooks
+
+# Version of the snapshot layout, bumped when it changes
+SNAPSHOT_VERSION = 1
+
+# File name suffix of snapshots in the model cache
+SNAPSHOT_SUFFIX = ".snapshot"
+
+
+def _empty_model(dims: ModelDimensions) -> Whisper:
+    """
+    Build a Whisper model whose parameters are on the meta device.
+
+    Mirrors ``Whisper.__init__`` without allocating or initializing weights.
+    The alignment heads buffer, which ``Whisper.__init__`` builds with a
+    sparse operation the meta device lacks, is restored from the snapshot.
+    """
+    model = Whisper.__new__(Whisper)
+    nn.Module.__init__(model)
+    model.dims = dims
+    with torch.device("meta"):
+        model.encoder = AudioEncoder(
+            dims.n_mels, dims.n_audio_ctx, dims.n_audio_state, dims.n_audio_head, dims.n_audio_layer
+        )
+        model.decoder = TextDecoder(
+            dims.n_vocab, dims.n_text_ctx, dims.n_text_state, dims.n_text_head, dims.n_text_layer
+        )
+    return model
+
+
+def save_snapshot(model: nn.Module, path: Union[str, Path], precision: str = "fp32") -> None:
+    """
+    Write a model as a snapshot that can be memory mapped.
+
+    Every parameter and buffer (including whisper's non-persistent ones) is
+    stored as a plain tensor in the final dtype, so loading needs no
+    conversion or copy. The file is written atomically.
+
+    Args:
+        model (nn.Module): Whisper model with fp32 or bf16 weights.
+        path (Union[str, Path]): Snapshot file to write.
+        precision (str, optional): Precision of the weights, "fp32" or "bf16".
+            Defaults to "fp32".
+    """
+    if precision not in ("fp32", "bf16"):
+        raise ValueError(f"Snapshots only support fp32 and bf16 weights, not {precision}")
+
+    state_dict = {name: tensor.detach().cpu().contiguous() for name, tensor in model.state_dict().items()}
+    buffers = {
+        name: tensor.detach().cpu()
+        for name, tensor in model.named_buffers()
+        if name not in state_dict
+    }
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "dims": asdict(model.dims),
+        "precision": precision,
+        "state_dict": state_dict,
+        "buffers": buffers
+    }
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    torch.save(snapshot, temp_path)
+    os.replace(temp_path, path)
+
+
+def load_snapshot(path: Union[str, Path], device: str = "cpu") -> nn.Module:
+    """
+    Load a model from a snapshot without copying its weights.
+
+    The file is memory mapped and the model is built on the meta device, so
+    parameters point straight into the page cache: loading takes
+    milliseconds, pages are read on first use, and processes loading the
+    same snapshot share one copy of the weights.
+
+    Args:
+        path (Union[str, Path]): Snapshot written by ``save_snapshot``.
+        device (str, optional): Device to load the model on. CUDA weights are
+            copied to the GPU. Defaults to "cpu".
+
+    Returns:
+        nn.Module: The loaded model.
+
+    Raises:
+        ValueError: If the file is not a snapshot of a supported version.
+    """
+    snapshot = torch.load(str(path), mmap=True, weights_only=True, map_location="cpu")
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported model snapshot: {path}")
+
+    model = _empty_model(ModelDimensions(**snapshot["dims"]))
+    model.load_state_dict(snapshot["state_dict"], assign=True)
+    for name, tensor in snapshot["buffers"].items():
+        module_name, _, buffer_name = name.rpartition(".")
+        model.get_submodule(module_name).register_buffer(buffer_name, tensor, persistent=False)
+
+    if snapshot["precision"] == "bf16":
+        install_bf16_hooks(model)
+    return model.to(device)
+
+
+def load_or_create_snapshot(model_name: str, device: str = "cpu", precision: str = "fp32",
+                            cache_dir: Optional[str] = None) -> nn.Module:
+    """
+    Load a model from its snapshot in the model cache, writing the snapshot first if needed.
+
+    Args:
+        model_name (str): Whisper model name or checkpoint path.
+        device (str, optional): Device to load the model on. Defaults to "cpu".
+        precision (str, optional): "fp32" or "bf16". Defaults to "fp32".
+        cache_dir (Optional[str]): Model cache directory. Defaults to ``default_cache_dir()``.
+
+    Returns:
+        nn.Module: The loaded model.
+    """
+    path = snapshot_path(model_name, precision, cache_dir)
+    if path.exists():
+        try:
+            return load_snapshot(path, device)
+        except Exception:
+            # Unreadable or outdated snapshot; write it again
+            pass
+
+    model = convert_model(whisper.load_model(model_name, device="cpu"), precision)
+    save_snapshot(model, path, precision)
+    del model
+    return load_snapshot(path, device)
+
+
+def snapshot_path(model_name: str, precision: str = "fp32", cache_dir: Optional[str] = None) -> Path:
+    """Return the path of a model's snapshot in the model cache."""
+    return cache_path(model_name, precision, cache_dir or default_cache_dir(), SNAPSHOT_SUFFIX)
+
+
+def main():
+    """Write the snapshot of a model ahead of time, e.g. while building a worker image."""
+    parser = argparse.ArgumentParser(
+        description="Write a memory-mapped Whisper model snapshot for fast worker start-up"
+    )
+    parser.add_argument("model", help="Whisper model name or checkpoint path")
+    parser.add_argument("--precision", default="fp32", choices=[p for p in PRECISIONS if p != "int8"],
+                        help="Weight precision stored in the snapshot")
+    parser.add_argument("--model-cache-dir",
+                        help="Directory holding snapshots (defaults to ~/.cache/whisper-transcriber)")
+    args = parser.parse_args()
+
+    path = snapshot_path(args.model, args.precision, args.model_cache_dir)
+    model = convert_model(whisper.load_model(args.model, device="cpu"), args.precision)
+    save_snapshot(model, path, args.precision)
+
+    started = time.perf_counter()
+    load_snapshot(path)
+    print(f"Snapshot written to {path} (loads in {time.perf_counter() - started:.3f} s)")
+
+
+if __name__ == "__main__":
+    main()
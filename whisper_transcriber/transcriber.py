@@ -1,25 +1,56 @@
 import os
-import argparse
+import copy
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
 from pathlib import Path
-from typing import Dict, Any, Optional, Union, List
+from typing import Dict, Any, Optional, Union, List, Tuple, Callable, Generator, Iterator
 
 import torch
 import whisper
-import soundfile as sf
 import numpy as np
+from whisper.audio import HOP_LENGTH, N_SAMPLES, SAMPLE_RATE
+from whisper.decoding import DecodingResult
 
 from .config import TranscriptionConfig
 from .output_handler import OutputHandler
+from .audio import WindowedAudio, open_audio, load_audio
+from .model_registry import ModelRegistry, get_model_registry, replicate_model
+from .precision import bf16_supported
+from .batch import ProcessPoolEngine, estimate_duration
+from .pipeline import AudioPrefetcher
+from .cache import ResultCache
+from .manifest import JobManifest, STATUS_DONE, STATUS_FAILED
+from .vad import SpeechTimeline, detect_speech
+from .chunking import find_chunk_boundaries, stitch_chunks
+from .segments import SegmentStore
+from .cli import main
+from .metrics import get_metrics
+from .language import LanguageHints, EXCERPT_SEARCH_SECONDS, speech_excerpt, detect_languages
+from .profiling import StageHook, StageTimings, ProfileSummary, activate, current, stage, install_model_hooks
+from .decoding import (
+    decode_batch, is_silent, tokens_to_segments, clear_empty_segments, window_tokenizer,
+    add_words, iter_segments, temperature_schedule, FallbackBudget
+)
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".flac", ".ogg"}
+
+# Callback receiving (audio file, output path or exception, elapsed seconds)
+FileCallback = Callable[[Path, Any, Optional[float]], None]
 
 class WhisperTranscriber:
     """Advanced Whisper transcription class with extended capabilities."""
     
-    def __init__(self, config: Optional[TranscriptionConfig] = None):
+    def __init__(self, config: Optional[TranscriptionConfig] = None,
+                 registry: Optional[ModelRegistry] = None):
         """
         Initialize the transcriber with advanced configuration options.
         
         Args:
             config (Optional[TranscriptionConfig]): Configuration for transcription.
+            registry (Optional[ModelRegistry]): Registry to borrow the model from.
+                Defaults to the process-wide registry.
         """
         self.config = config or TranscriptionConfig()
         self.config.validate()
@@ -29,22 +60,139 @@ class WhisperTranscriber:
             print("CUDA not available. Falling back to CPU.")
             self.config.device = "cpu"
         
-        self.model = whisper.load_model(
-            self.config.model_name, 
-            device=self.config.device
-        )
+        if self.config.precision == "bf16" and not bf16_supported(self.config.device):
+            print("bf16 not supported on this device. Falling back to fp32.")
+            self.config.precision = "fp32"
+        
+        # Borrow the model from the shared registry so transcribers with the
+        # same model, device and precision reuse one set of weights; bf16 and
+        # int8 conversions happen once, on first load
+        self.registry = registry or get_model_registry()
+        if registry is None and self.config.model_memory_budget_mb is not None:
+            self.registry.memory_budget = int(self.config.model_memory_budget_mb * 1024 * 1024)
+        self._model_key = self.registry.make_key(self.config.model_name, self.config.device,
+                                                 self.config.precision)
+        self.model = self.registry.acquire(*self._model_key, cache_dir=self.config.model_cache_dir,
+                                           snapshot=self.config.model_snapshot)
         self.output_handler = OutputHandler(self.config.output_dir)
+        
+        self.cache = None
+        if self.config.cache_dir:
+            max_bytes = None
+            if self.config.cache_max_mb is not None:
+                max_bytes = int(self.config.cache_max_mb * 1024 * 1024)
+            self.cache = ResultCache(self.config.cache_dir, max_bytes)
+        
+        # Per-stage timings; the summary covers the files of the last batch run
+        self.stage_hooks: List[StageHook] = []
+        self.profile_summary = None
+        if self.config.profile:
+            self.profile_summary = ProfileSummary()
+            install_model_hooks(self.model)
+        
+        # Process-wide metrics, recorded for every finished or failed file
+        self.metrics = get_metrics() if self.config.metrics else None
+        
+        # Languages detected per directory or speaker, reused for later files
+        self.language_hints = None
+        if self.config.language_hints:
+            self.language_hints = LanguageHints(self.config.language_hints_path,
+                                                self.config.language_hint_min_files,
+                                                self.config.language_hint_pattern)
+
+    def add_stage_hook(self, hook: StageHook) -> None:
+        """
+        Register a callback receiving the time spent in every processing stage.
+        
+        The hook is called as ``hook(stage, wall_seconds, cpu_seconds)`` from
+        the thread that ran the stage, e.g. "load_audio", "inference",
+        "encoder", "decoder" or "output", whether or not ``config.profile``
+        is set.
+        
+        Args:
+            hook (StageHook): Callback to register.
+        """
+        self.stage_hooks.append(hook)
+        install_model_hooks(self.model)
+
+    def _new_timings(self) -> Optional[StageTimings]:
+        """Create the stage timings of a file, or None when nothing consumes them."""
+        if not self.config.profile and not self.stage_hooks and self.metrics is None:
+            return None
+        return StageTimings(self.stage_hooks)
+
+    def _attach_timings(self, result: Dict[str, Any], timings: Optional[StageTimings],
+                        decoded: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Add the ``timings`` block to a result when profiling is enabled.
+        
+        Args:
+            result (Dict[str, Any]): Transcription result.
+            timings (Optional[StageTimings]): Timings of the file.
+            decoded (Optional[Dict[str, Any]]): Result holding the decoded
+                segments, when ``result`` does not. Defaults to ``result``.
+        
+        Returns:
+            Dict[str, Any]: The result.
+        """
+        if timings is not None and self.config.profile:
+            result['timings'] = timings.to_dict(decoded or result, temperature_schedule(self.config))
+        return result
+
+    def _collect_timings(self, audio_path: Union[str, Path], result: Dict[str, Any],
+                         timings: Optional[StageTimings]) -> None:
+        """Add a finished file, including its output stage, to the metrics and profile summary."""
+        if timings is None:
+            return
+        if self.metrics is not None:
+            self.metrics.record_file(timings)
+        if self.profile_summary is None:
+            return
+        file_timings = dict(result.get('timings', {}))
+        file_timings.update(timings.to_dict())
+        file_timings['file'] = str(audio_path)
+        self.profile_summary.add(file_timings)
+
+    def close(self) -> None:
+        """Release the model back to the registry."""
+        if self.model is not None:
+            self.model = None
+            self.registry.release(*self._model_key)
+
+    def __enter__(self) -> "WhisperTranscriber":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
 
-    def _filter_segments(self, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _filter_segments(self, segments: Union[List[Dict[str, Any]], SegmentStore]
+                         ) -> Union[List[Dict[str, Any]], SegmentStore]:
         """
         Apply advanced filtering to transcription segments.
         
+        Segments in a ``SegmentStore`` are filtered with one mask over their
+        text lengths; only segments that have to be split are visited one by one.
+        
         Args:
-            segments (List[Dict[str, Any]]): Original transcription segments.
+            segments (Union[List[Dict[str, Any]], SegmentStore]): Original transcription segments.
         
         Returns:
-            List[Dict[str, Any]]: Filtered transcription segments.
+            Union[List[Dict[str, Any]], SegmentStore]: Filtered transcription
+                segments, in the same representation.
         """
+        if isinstance(segments, SegmentStore):
+            lengths = segments.text_lengths
+            keep = np.ones(len(segments), dtype=bool)
+            if self.config.min_segment_length is not None:
+                keep &= lengths >= self.config.min_segment_length
+            if self.config.max_segment_length is not None:
+                split = keep & (lengths > self.config.max_segment_length)
+                if split.any():
+                    return SegmentStore.from_segments(
+                        self._filter_segments([segment.copy() for segment in segments.take(keep)])
+                    )
+            return segments.take(keep)
+        
         filtered_segments = []
         
         for segment in segments:
@@ -71,30 +219,34 @@ class WhisperTranscriber:
         
         return filtered_segments
 
-    def transcribe(self, audio_path: Union[str, Path]) -> Dict[str, Any]:
+    def _validate_audio(self, audio_path: Path) -> None:
         """
-        Transcribe audio file using Whisper with extended options.
+        Check that an audio file exists.
+        
+        The file is not probed separately; decoding errors are reported when
+        the audio is loaded, so every file is read only once.
         
         Args:
-            audio_path (Union[str, Path]): Path to the audio file.
+            audio_path (Path): Path to the audio file.
         
-        Returns:
-            Dict[str, Any]: Transcription result with optional word-level timestamps.
+        Raises:
+            FileNotFoundError: If the file does not exist.
         """
-        audio_path = Path(audio_path)
-        
         if not audio_path.exists():
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+    def _transcribe_options(self, language: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build the keyword arguments passed to ``model.transcribe``.
         
-        # Validate audio file
-        try:
-            sf.info(str(audio_path))
-        except Exception as e:
-            raise ValueError(f"Invalid audio file: {e}")
+        Args:
+            language (Optional[str]): Language of the file. Defaults to the configured language.
         
-        # Prepare transcription options
+        Returns:
+            Dict[str, Any]: Transcription options with None values removed.
+        """
         transcribe_options = {
-            "language": self.config.language,
+            "language": language or self.config.language,
             "task": self.config.task,
             "verbose": self.config.verbose,
             "temperature": self.config.temperature,
@@ -107,140 +259,1067 @@ class WhisperTranscriber:
             "prepend_punctuations": self.config.prepend_punctuations,
             "append_punctuations": self.config.append_punctuations,
             "clip_timestamps": self.config.clip_timestamps,
-            "hallucination_silence_threshold": self.config.hallucination_silence_threshold
+            "hallucination_silence_threshold": self.config.hallucination_silence_threshold,
+            "fp16": self.config.use_fp16
         }
         
         # Remove None values
-        transcribe_options = {k: v for k, v in transcribe_options.items() if v is not None}
+        return {k: v for k, v in transcribe_options.items() if v is not None}
+
+    def _apply_filters(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Pack the segments of a result into a ``SegmentStore`` and apply segment filtering, if configured."""
+        if self.config.segment_store and not isinstance(result.get('segments'), SegmentStore):
+            with stage("filter"):
+                result['segments'] = SegmentStore.from_segments(result.get('segments', []))
+        if self.config.min_segment_length or self.config.max_segment_length:
+            with stage("filter"):
+                result['segments'] = self._filter_segments(result.get('segments', []))
+        return result
+
+    def transcribe(self, audio_path: Union[str, Path]) -> Dict[str, Any]:
+        """
+        Transcribe audio file using Whisper with extended options.
         
-        # Perform transcription
-        result = self.model.transcribe(
-            str(audio_path),
-            **transcribe_options
-        )
+        Args:
+            audio_path (Union[str, Path]): Path to the audio file.
         
-        # Apply segment filtering if configured
-        if self.config.min_segment_length or self.config.max_segment_length:
-            result['segments'] = self._filter_segments(result.get('segments', []))
+        Returns:
+            Dict[str, Any]: Transcription result with optional word-level timestamps,
+                and per-stage ``timings`` when ``config.profile`` is set.
+        """
+        try:
+            prepared = self._prepare(Path(audio_path))
+            result = self._transcribe_prepared(*prepared)
+        except Exception:
+            if self.metrics is not None:
+                self.metrics.record_failure()
+            raise
+        if self.metrics is not None and prepared[3] is not None:
+            self.metrics.record_file(prepared[3])
+        return result
+
+    def _prepare(self, audio_path: Path) -> Tuple[Optional[str], Optional[Dict[str, Any]],
+                                                  Union[np.ndarray, WindowedAudio, None],
+                                                  Optional[StageTimings], Optional[str]]:
+        """
+        Validate a file, look it up in the result cache and decode it on a miss.
+        
+        Files longer than ``config.windowed_read_threshold`` are opened for
+        windowed reading instead of being decoded into memory.
+        
+        Args:
+            audio_path (Path): Path to the audio file.
+        
+        Returns:
+            Tuple[Optional[str], Optional[Dict[str, Any]], Union[np.ndarray, WindowedAudio, None],
+                  Optional[StageTimings], Optional[str]]:
+                Cache key, cached result (None on a miss), the decoded
+                waveform (None on a hit), the file's stage timings (None
+                when not profiling) and its language hint source (None
+                without language hints).
+        """
+        timings = self._new_timings()
+        with activate(timings):
+            with stage("validate"):
+                self._validate_audio(audio_path)
+            with stage("cache_lookup"):
+                cache_key, result = self._cache_lookup(audio_path)
+            if result is not None:
+                return cache_key, result, None, timings, None
+            with stage("load_audio"):
+                audio = open_audio(audio_path, self.config.windowed_read_threshold)
+        if timings is not None:
+            timings.audio_seconds = len(audio) / SAMPLE_RATE
+        return cache_key, None, audio, timings, self._language_source(audio_path)
+
+    def _transcribe_prepared(self, cache_key: Optional[str], result: Optional[Dict[str, Any]],
+                             audio: Union[np.ndarray, WindowedAudio, None],
+                             timings: Optional[StageTimings] = None,
+                             source: Optional[str] = None) -> Dict[str, Any]:
+        """Transcribe the output of ``_prepare`` and return the filtered result."""
+        with activate(timings):
+            if result is None:
+                # Decode once and hand the waveform to the model
+                try:
+                    result = self._transcribe_waveform(audio, self._file_languages([audio], [source])[0])
+                finally:
+                    if isinstance(audio, WindowedAudio):
+                        audio.close()
+                with stage("cache_store"):
+                    self._cache_store(cache_key, result)
+            result = self._apply_filters(result)
+        return self._attach_timings(result, timings)
+
+    @staticmethod
+    def _discard_prepared(prepared: Tuple[Any, ...]) -> None:
+        """Close the windowed reader of a prepared file that will not be transcribed."""
+        audio = prepared[2]
+        if isinstance(audio, WindowedAudio):
+            audio.close()
+
+    def _load_files(self, audio_paths: List[Path]) -> Iterator[Tuple[Path, Any]]:
+        """
+        Prepare files for transcription in order, decoding ahead when prefetching is enabled.
+        
+        Args:
+            audio_paths (List[Path]): Paths to the audio files.
+        
+        Returns:
+            Iterator[Tuple[Path, Any]]: (file, ``_prepare`` output or raised exception) pairs.
+        """
+        if self.config.prefetch_workers > 0 and len(audio_paths) > 1:
+            max_bytes = None
+            if self.config.prefetch_max_mb is not None:
+                max_bytes = int(self.config.prefetch_max_mb * 1024 * 1024)
+            return iter(AudioPrefetcher(audio_paths, self._prepare, self.config.prefetch_workers, max_bytes,
+                                        discard=self._discard_prepared))
+        
+        def load_in_order() -> Iterator[Tuple[Path, Any]]:
+            for audio_path in audio_paths:
+                try:
+                    yield audio_path, self._prepare(audio_path)
+                except Exception as e:
+                    yield audio_path, e
+        
+        return load_in_order()
+
+    def transcribe_iter(self, audio_path: Union[str, Path]) -> Generator[Dict[str, Any], None, Dict[str, Any]]:
+        """
+        Transcribe an audio file, yielding segments as each 30-second window is decoded.
+        
+        Segments carry timestamps on the file's timeline (and word timings when
+        ``config.word_timestamps`` is set) and pass through the configured
+        segment filters. Voice activity detection is applied as in
+        ``transcribe``; chunked mode is not, since chunks finish out of order.
+        A cached result is replayed from the cache; streamed results are not
+        stored in it.
         
+        Args:
+            audio_path (Union[str, Path]): Path to the audio file.
+        
+        Yields:
+            Dict[str, Any]: Transcription segments in timeline order.
+        
+        Returns:
+            Dict[str, Any]: The remaining result fields (text, language, with
+                VAD the ``vad`` summary, and with ``config.profile`` the
+                ``timings``), available as the generator's return value.
+        """
+        return (yield from self._iter_profiled(Path(audio_path), self._new_timings()))
+
+    def _iter_profiled(self, audio_path: Path,
+                       timings: Optional[StageTimings]) -> Generator[Dict[str, Any], None, Dict[str, Any]]:
+        """
+        Implement ``transcribe_iter``, recording stages into ``timings``.
+        
+        Timings are only active while this generator runs, not while the
+        caller handles the yielded segments.
+        """
+        with activate(timings):
+            with stage("validate"):
+                self._validate_audio(audio_path)
+            with stage("cache_lookup"):
+                _, result = self._cache_lookup(audio_path)
+            if result is not None:
+                result = self._apply_filters(result)
+        if result is not None:
+            yield from result.get('segments', [])
+            rest = {key: value for key, value in result.items() if key != 'segments'}
+            return self._attach_timings(rest, timings, result)
+        
+        with activate(timings), stage("load_audio"):
+            source = audio = open_audio(audio_path, self.config.windowed_read_threshold)
+        if timings is not None:
+            timings.audio_seconds = len(audio) / SAMPLE_RATE
+        decoded = []  # Window and token counts of the yielded segments, for profiling
+        try:
+            timeline = None
+            if self.config.vad.enabled:
+                with activate(timings):
+                    timeline = self._speech_timeline(audio)
+                    audio = timeline.compact(audio)
+            
+            result = {"text": "", "language": self.config.language}
+            budget = self._fallback_budget()
+            if len(audio) > 0:
+                with activate(timings), stage("inference"):
+                    hint_source = self._language_source(audio_path)
+                    language = (self._file_languages([audio], [hint_source])[0] or
+                                self.config.language or self._detect_language(audio))
+                segments = iter_segments(self.model, audio, self.config, language, budget)
+                while True:
+                    try:
+                        with activate(timings), stage("inference"):
+                            segment = next(segments)
+                    except StopIteration as stop:
+                        result = stop.value
+                        break
+                    if timings is not None:
+                        decoded.append({key: segment.get(key) for key in ("seek", "temperature", "tokens")})
+                    if timeline is not None:
+                        timeline.restore_segment(segment)
+                    if self.config.min_segment_length or self.config.max_segment_length:
+                        with activate(timings), stage("filter"):
+                            filtered = self._filter_segments([segment])
+                        yield from filtered
+                    else:
+                        yield segment
+        finally:
+            if isinstance(source, WindowedAudio):
+                source.close()
+        
+        if timeline is not None:
+            result['vad'] = timeline.summary()
+        if budget is not None:
+            result['fallback'] = budget.to_dict()
+        return self._attach_timings(result, timings, {"segments": decoded})
+
+    def _cache_lookup(self, audio_path: Path) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Look up the raw result for an audio file in the result cache.
+        
+        Args:
+            audio_path (Path): Path to the audio file.
+        
+        Returns:
+            Tuple[Optional[str], Optional[Dict[str, Any]]]: Cache key (None when
+                caching is disabled) and the cached result (None on a miss).
+        """
+        if self.cache is None:
+            return None, None
+        # A file decoded in its source's hinted language is cached under that language
+        source = self._language_source(audio_path)
+        language = self.language_hints.get(source) if source is not None else None
+        cache_key = self.cache.key(audio_path, self.config, language)
+        return cache_key, self.cache.get(cache_key)
+
+    def _cache_store(self, cache_key: Optional[str], result: Dict[str, Any]) -> None:
+        """Store a raw result in the result cache, if enabled."""
+        if self.cache is not None and cache_key is not None:
+            self.cache.put(cache_key, result)
+
+    def _transcribe_waveform(self, audio: Union[np.ndarray, WindowedAudio],
+                             language: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Transcribe a decoded waveform, skipping non-speech audio when VAD is enabled.
+        
+        Args:
+            audio (Union[np.ndarray, WindowedAudio]): 16 kHz mono waveform.
+            language (Optional[str]): Language of the file. Defaults to the
+                configured language, or the one detected from the audio.
+        
+        Returns:
+            Dict[str, Any]: Unfiltered transcription result on the original timeline.
+        """
+        if not self.config.vad.enabled:
+            with stage("inference"):
+                return self._transcribe_speech(audio, language)
+        
+        timeline = self._speech_timeline(audio)
+        speech = timeline.compact(audio)
+        if len(speech) == 0:
+            return timeline.restore(self._empty_result(language))
+        with stage("inference"):
+            result = self._transcribe_speech(speech, language)
+        return timeline.restore(result)
+
+    def _speech_timeline(self, audio: Union[np.ndarray, WindowedAudio]) -> SpeechTimeline:
+        """Run voice activity detection over a waveform."""
+        with stage("vad"):
+            return SpeechTimeline(detect_speech(audio, self.config.vad), len(audio))
+
+    def _empty_result(self, language: Optional[str] = None) -> Dict[str, Any]:
+        """Return the result for audio without any speech."""
+        return {"text": "", "segments": [], "language": language or self.config.language}
+
+    def _transcribe_speech(self, audio: Union[np.ndarray, WindowedAudio],
+                           language: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Transcribe a waveform, chunking it when chunked mode is enabled.
+        
+        With ``config.fallback`` enabled the file gets a fallback budget and
+        the result reports its use under ``fallback``.
+        
+        Args:
+            audio (Union[np.ndarray, WindowedAudio]): 16 kHz mono waveform.
+            language (Optional[str]): Language of the file. Defaults to the
+                configured language, or the one detected from the audio.
+        
+        Returns:
+            Dict[str, Any]: Unfiltered transcription result.
+        """
+        budget = self._fallback_budget()
+        if self.config.chunked:
+            result = self._transcribe_chunked(audio, budget, language)
+        elif isinstance(audio, WindowedAudio) or budget is not None:
+            result = self._transcribe_windowed(audio, language, budget)
+        else:
+            return self.model.transcribe(audio, **self._transcribe_options(language))
+        if budget is not None:
+            result['fallback'] = budget.to_dict()
         return result
 
-    def process_file(self, audio_path: Union[str, Path]) -> str:
+    def _fallback_budget(self) -> Optional[FallbackBudget]:
+        """Create the temperature fallback budget of a file, or None when fallback is unlimited."""
+        return FallbackBudget(self.config) if self.config.fallback.enabled else None
+
+    def _transcribe_windowed(self, audio: Union[np.ndarray, WindowedAudio], language: Optional[str] = None,
+                             budget: Optional[FallbackBudget] = None) -> Dict[str, Any]:
+        """
+        Transcribe audio with the package's window loop, one 30-second window at a time.
+        
+        Uses the window loop of ``iter_segments`` instead of ``model.transcribe``,
+        which needs the whole waveform in memory and cannot limit temperature
+        fallback, so ``clip_timestamps`` and ``hallucination_silence_threshold``
+        do not apply.
+        
+        Args:
+            audio (Union[np.ndarray, WindowedAudio]): 16 kHz mono waveform.
+            language (Optional[str]): Language to decode in. Defaults to the
+                configured language, or the one detected from the audio.
+            budget (Optional[FallbackBudget]): Temperature fallback budget.
+                Defaults to unlimited fallback.
+        
+        Returns:
+            Dict[str, Any]: Unfiltered transcription result.
+        """
+        language = language or self.config.language or self._detect_language(audio)
+        segments = iter_segments(self.model, audio, self.config, language, budget)
+        result = {"segments": []}
+        while True:
+            try:
+                result["segments"].append(next(segments))
+            except StopIteration as stop:
+                result.update(stop.value)
+                return result
+
+    def _detect_language(self, audio: Union[np.ndarray, WindowedAudio]) -> str:
+        """
+        Detect the spoken language from up to 30 seconds of speech near the start of the audio.
+        
+        Args:
+            audio (Union[np.ndarray, WindowedAudio]): 16 kHz mono waveform.
+        
+        Returns:
+            str: Language code.
+        """
+        if not self.model.is_multilingual:
+            return "en"
+        
+        with stage("language_detection"):
+            return detect_languages(self.model, [speech_excerpt(audio, self.config.vad)])[0][0]
+
+    def _language_source(self, audio_path: Union[str, Path]) -> Optional[str]:
+        """Return the language hint source of a file, or None when its language is not hinted."""
+        if self.language_hints is None or self.config.language is not None:
+            return None
+        return self.language_hints.source(audio_path)
+
+    def _file_languages(self, audios: List[Union[np.ndarray, WindowedAudio]],
+                        sources: List[Optional[str]]) -> List[Optional[str]]:
+        """
+        Resolve the language of files from their sources' hints, detecting the rest in one batch.
+        
+        Files without a source keep None, so the configured language or
+        whisper's own detection applies. Detected languages are recorded as
+        hints for their sources.
+        
+        Args:
+            audios (List[Union[np.ndarray, WindowedAudio]]): Waveforms of the files.
+            sources (List[Optional[str]]): Language hint source of each file.
+        
+        Returns:
+            List[Optional[str]]: Language code per file, or None.
+        """
+        languages = [self.language_hints.get(source) if source is not None else None for source in sources]
+        pending = [i for i, source in enumerate(sources) if source is not None and languages[i] is None]
+        if not pending:
+            return languages
+        
+        with stage("language_detection"):
+            excerpts = [speech_excerpt(audios[i], self.config.vad) for i in pending]
+            for i, (language, probability) in zip(pending, detect_languages(self.model, excerpts)):
+                languages[i] = language
+                self.language_hints.record(sources[i], language, probability)
+        return languages
+
+    def detect_language(self, audio_paths: List[Union[str, Path]],
+                        batch_size: int = 16) -> Dict[str, Dict[str, Any]]:
+        """
+        Detect the spoken language of several files with batched model passes.
+        
+        Only the start of each file is decoded, and detection runs on up to
+        30 seconds of speech found there by the voice activity detector. With
+        ``config.language_hints``, files from a source whose language is
+        already known are not detected, and new detections are recorded.
+        
+        Args:
+            audio_paths (List[Union[str, Path]]): Paths to the audio files.
+            batch_size (int, optional): Files detected per forward pass. Defaults to 16.
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: Per file, the ``language``, its
+                ``probability`` (None for hinted files) and whether it was
+                ``hinted``; failed files hold an ``error`` instead.
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        pending = []
+        for audio_path in audio_paths:
+            source = self.language_hints.source(audio_path) if self.language_hints is not None else None
+            language = self.language_hints.get(source) if source is not None else None
+            if language is not None:
+                results[str(audio_path)] = {"language": language, "probability": None, "hinted": True}
+            else:
+                pending.append((audio_path, source))
+        
+        for start in range(0, len(pending), batch_size):
+            batch = []
+            for audio_path, source in pending[start:start + batch_size]:
+                try:
+                    self._validate_audio(Path(audio_path))
+                    audio = load_audio(audio_path, max_duration=EXCERPT_SEARCH_SECONDS)
+                    batch.append((audio_path, source, speech_excerpt(audio, self.config.vad)))
+                except Exception as e:
+                    results[str(audio_path)] = {"error": str(e)}
+            if not batch:
+                continue
+            
+            detections = detect_languages(self.model, [excerpt for _, _, excerpt in batch])
+            for (audio_path, source, _), (language, probability) in zip(batch, detections):
+                results[str(audio_path)] = {"language": language, "probability": probability, "hinted": False}
+                if source is not None:
+                    self.language_hints.record(source, language, probability)
+        
+        return {str(audio_path): results[str(audio_path)] for audio_path in audio_paths}
+
+    def _transcribe_chunked(self, audio: Union[np.ndarray, WindowedAudio],
+                            budget: Optional[FallbackBudget] = None,
+                            language: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Transcribe long audio as independent chunks processed in parallel.
+        
+        The audio is split at quiet points into chunks of about
+        ``config.chunk_length`` seconds, each extended by ``config.chunk_overlap``
+        seconds into its neighbours. Chunks are transcribed concurrently and
+        stitched back together on the global timeline. Chunks of windowed
+        audio are themselves read one window at a time.
+        
+        Args:
+            audio (Union[np.ndarray, WindowedAudio]): 16 kHz mono waveform.
+            budget (Optional[FallbackBudget]): Temperature fallback budget
+                shared by all chunks. Defaults to unlimited fallback.
+            language (Optional[str]): Language of the file. Defaults to the
+                configured language, or the one detected from the audio.
+        
+        Returns:
+            Dict[str, Any]: Transcription result for the whole audio.
+        """
+        boundaries = find_chunk_boundaries(audio, self.config.chunk_length)
+        if len(boundaries) == 1:
+            if isinstance(audio, WindowedAudio) or budget is not None:
+                return self._transcribe_windowed(audio, language, budget)
+            return self.model.transcribe(audio, **self._transcribe_options(language))
+        
+        # Detect the language once so that every chunk decodes consistently
+        options = self._transcribe_options(language)
+        if options.get("language") is None:
+            options["language"] = self._detect_language(audio)
+        
+        overlap = int(self.config.chunk_overlap * SAMPLE_RATE)
+        chunks = [
+            (max(0, start - overlap), min(len(audio), end + overlap))
+            for start, end in boundaries
+        ]
+        
+        if isinstance(audio, WindowedAudio):
+            def transcribe_chunk(worker: "WhisperTranscriber", chunk: Tuple[int, int]) -> Dict[str, Any]:
+                return worker._transcribe_windowed(audio.view(*chunk), options["language"], budget)
+        elif budget is not None:
+            def transcribe_chunk(worker: "WhisperTranscriber", chunk: Tuple[int, int]) -> Dict[str, Any]:
+                return worker._transcribe_windowed(audio[chunk[0]:chunk[1]], options["language"], budget)
+        else:
+            def transcribe_chunk(worker: "WhisperTranscriber", chunk: Tuple[int, int]) -> Dict[str, Any]:
+                return worker.model.transcribe(audio[chunk[0]:chunk[1]], **options)
+        
+        workers = self.config.chunk_workers or os.cpu_count() or 1
+        outcomes = self._run_parallel(chunks, min(workers, len(chunks)), transcribe_chunk)
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                raise outcome
+        
+        return stitch_chunks(outcomes, chunks, boundaries)
+
+    def transcribe_batch(self, audio_paths: List[Union[str, Path]]) -> List[Dict[str, Any]]:
+        """
+        Transcribe several short audio files with batched model passes.
+        
+        Clips of up to 30 seconds are padded and stacked into batches of
+        ``config.batch_size`` so that the encoder and decoder process many
+        clips per forward pass. Longer files are transcribed individually.
+        
+        Args:
+            audio_paths (List[Union[str, Path]]): Paths to the audio files.
+        
+        Returns:
+            List[Dict[str, Any]]: Transcription results, in the same order and
+                format as returned by ``transcribe``.
+        """
+        audio_paths = [Path(audio_path) for audio_path in audio_paths]
+        for audio_path in audio_paths:
+            self._validate_audio(audio_path)
+        
+        results = []
+        for outcome in self._transcribe_paths_batched(audio_paths):
+            if isinstance(outcome, Exception):
+                raise outcome
+            results.append(outcome)
+        return results
+
+    def _transcribe_paths_batched(self, audio_paths: List[Path]) -> List[Any]:
+        """
+        Transcribe files in groups of ``config.batch_size`` using batched decoding.
+        
+        Cached results are reused and only the remaining files are decoded.
+        
+        Args:
+            audio_paths (List[Path]): Paths to the audio files.
+        
+        Returns:
+            List[Any]: Filtered results in input order; files that failed hold
+                the raised exception instead.
+        """
+        outcomes: List[Any] = [None] * len(audio_paths)
+        for group in self._iter_batched(audio_paths):
+            for index, outcome, timings in group:
+                outcomes[index] = outcome
+                if self.metrics is None:
+                    continue
+                if isinstance(outcome, Exception):
+                    self.metrics.record_failure()
+                elif timings is not None:
+                    self.metrics.record_file(timings)
+        return outcomes
+
+    def _iter_batched(self, audio_paths: List[Path]) -> Iterator[List[Tuple[int, Any, Optional[StageTimings]]]]:
+        """
+        Transcribe files with batched decoding, yielding outcomes as they are ready.
+        
+        Files are prepared (and prefetched) in order; cached and failed files
+        are yielded on their own, the others in decoded groups of
+        ``config.batch_size``.
+        
+        Args:
+            audio_paths (List[Path]): Paths to the audio files.
+        
+        Returns:
+            Iterator[List[Tuple[int, Any, Optional[StageTimings]]]]: Groups of
+                (input index, filtered result or raised exception, stage timings).
+        """
+        batch = []
+        for index, (_, prepared) in enumerate(self._load_files(audio_paths)):
+            if isinstance(prepared, Exception):
+                yield [(index, prepared, None)]
+                continue
+            
+            cache_key, result, audio, timings, source = prepared
+            if result is not None:
+                yield [(index, self._transcribe_prepared(*prepared), timings)]
+                continue
+            
+            batch.append((index, cache_key, audio, timings, source))
+            if len(batch) == self.config.batch_size:
+                yield self._decode_prepared_batch(batch)
+                batch = []
+        
+        if batch:
+            yield self._decode_prepared_batch(batch)
+
+    def _decode_prepared_batch(self, batch: List[Tuple[int, Optional[str], Union[np.ndarray, WindowedAudio],
+                                                        Optional[StageTimings], Optional[str]]]
+                               ) -> List[Tuple[int, Any, Optional[StageTimings]]]:
+        """
+        Decode a group of waveforms together, caching and filtering their results.
+        
+        Languages missing from the hints are detected for the whole group in
+        one pass. Time spent on the whole batch is split evenly among its
+        files' timings.
+        """
+        batch_timings = self._new_timings()
+        try:
+            with activate(batch_timings):
+                audios = [audio for _, _, audio, _, _ in batch]
+                languages = self._file_languages(audios, [source for *_, source in batch])
+                results = self._transcribe_audio_batch(audios, languages)
+        except Exception as e:
+            return [(index, e, timings) for index, _, _, timings, _ in batch]
+        finally:
+            for _, _, audio, _, _ in batch:
+                if isinstance(audio, WindowedAudio):
+                    audio.close()
+        
+        outcomes = []
+        for (index, cache_key, _, timings, _), result in zip(batch, results):
+            if timings is not None:
+                timings.merge(batch_timings, 1 / len(batch))
+            with activate(timings):
+                with stage("cache_store"):
+                    self._cache_store(cache_key, result)
+                result = self._apply_filters(result)
+            outcomes.append((index, self._attach_timings(result, timings), timings))
+        return outcomes
+
+    def _transcribe_audio_batch(self, audios: List[Union[np.ndarray, WindowedAudio]],
+                                languages: Optional[List[Optional[str]]] = None) -> List[Dict[str, Any]]:
+        """
+        Transcribe decoded 16 kHz waveforms, batching those that fit one window.
+        
+        Args:
+            audios (List[Union[np.ndarray, WindowedAudio]]): Waveforms to transcribe.
+            languages (Optional[List[Optional[str]]]): Language of each waveform;
+                None entries use the configured language, or the detected one.
+        
+        Returns:
+            List[Dict[str, Any]]: Unfiltered transcription results in input order.
+        """
+        languages = languages or [None] * len(audios)
+        timelines: List[Optional[SpeechTimeline]] = [None] * len(audios)
+        if self.config.vad.enabled:
+            timelines = [self._speech_timeline(audio) for audio in audios]
+            audios = [timeline.compact(audio) for timeline, audio in zip(timelines, audios)]
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(audios)
+        short = [i for i, audio in enumerate(audios) if 0 < len(audio) <= N_SAMPLES]
+        
+        for i, audio in enumerate(audios):
+            if len(audio) == 0:
+                results[i] = self._empty_result(languages[i])
+            elif len(audio) > N_SAMPLES:
+                with stage("inference"):
+                    results[i] = self._transcribe_speech(audio, languages[i])
+        
+        # Clips are decoded together per language; None lets whisper detect each clip's language
+        for language in dict.fromkeys(languages[i] for i in short):
+            group = [i for i in short if languages[i] == language]
+            budgets = None
+            if self.config.fallback.enabled:
+                budgets = [FallbackBudget(self.config) for _ in group]
+            with stage("inference"):
+                with stage("mel"):
+                    mel = torch.stack([
+                        whisper.log_mel_spectrogram(whisper.pad_or_trim(audios[i]), self.model.dims.n_mels)
+                        for i in group
+                    ]).to(self.model.device)
+                
+                decoded = decode_batch(
+                    self.model,
+                    mel,
+                    self.config,
+                    budgets,
+                    language=language or self.config.language,
+                    prompt=self.config.initial_prompt,
+                    fp16=self.config.use_fp16
+                )
+                
+                for index, (i, result) in enumerate(zip(group, decoded)):
+                    results[i] = self._window_result(result, mel[index], len(audios[i]))
+                    if budgets is not None:
+                        results[i]['fallback'] = budgets[index].to_dict()
+        
+        for timeline, result in zip(timelines, results):
+            if timeline is not None:
+                timeline.restore(result)
+        
+        return results
+
+    def _window_result(self, decoded: DecodingResult, mel: torch.Tensor,
+                       num_samples: int) -> Dict[str, Any]:
+        """
+        Convert the decoding result of a single-window clip into a result dict.
+        
+        Args:
+            decoded (DecodingResult): Decoding result for the clip.
+            mel (torch.Tensor): Padded log-mel spectrogram of the clip.
+            num_samples (int): Number of audio samples in the clip.
+        
+        Returns:
+            Dict[str, Any]: Result in the format returned by ``model.transcribe``.
+        """
+        tokenizer = window_tokenizer(self.model, decoded.language, self.config.task)
+        duration = num_samples / SAMPLE_RATE
+        
+        segments = []
+        if not is_silent(decoded, self.config):
+            segments = tokens_to_segments(decoded.tokens, tokenizer, decoded, 0.0, duration)
+            if self.config.word_timestamps:
+                add_words(segments, self.model, tokenizer, mel,
+                          num_samples // HOP_LENGTH, self.config)
+            clear_empty_segments(segments)
+        
+        segments = [{"id": i, **segment} for i, segment in enumerate(segments)]
+        return {
+            "text": tokenizer.decode([token for segment in segments for token in segment["tokens"]]),
+            "segments": segments,
+            "language": decoded.language
+        }
+
+    def process_file(self, audio_path: Union[str, Path]) -> Union[str, List[str]]:
         """
         Process a single audio file and save the result.
         
+        The file is transcribed once and the result is written in every
+        configured output format.
+        
+        Args:
+            audio_path (Union[str, Path]): Path to the audio file.
+        
+        Returns:
+            Union[str, List[str]]: Path to the saved output file, or a list of
+                paths when ``config.output_format`` is a list.
+        """
+        if self.config.streaming:
+            return self._stream_to_outputs(audio_path)
+        prepared = self._prepare(Path(audio_path))
+        result = self._transcribe_prepared(*prepared)
+        return self._save_timed(result, audio_path, prepared[3])
+
+    def _stream_to_outputs(self, audio_path: Union[str, Path]) -> Union[str, List[str]]:
+        """
+        Write segments to every configured output file as they are decoded.
+        
         Args:
             audio_path (Union[str, Path]): Path to the audio file.
         
         Returns:
-            str: Path to the saved output file.
+            Union[str, List[str]]: Output path, or list of paths when
+                ``config.output_format`` is a list.
         """
-        result = self.transcribe(audio_path)
-        output_path = self.output_handler.save_output(
+        formats = self.config.output_formats
+        output_paths = [self.output_handler.output_path(str(audio_path), fmt) for fmt in formats]
+        timings = self._new_timings()
+        
+        with ExitStack() as stack:
+            writers = [
+                self.output_handler.open_writer(
+                    stack.enter_context(open(output_path, "w", encoding="utf-8")), fmt
+                )
+                for output_path, fmt in zip(output_paths, formats)
+            ]
+            
+            segments = self._iter_profiled(Path(audio_path), timings)
+            while True:
+                try:
+                    segment = next(segments)
+                except StopIteration as stop:
+                    result = stop.value
+                    break
+                with activate(timings), stage("output"):
+                    for writer in writers:
+                        writer.write_segment(segment)
+                        writer.flush()
+            
+            with activate(timings), stage("output"):
+                for writer in writers:
+                    writer.close(result)
+        self._collect_timings(audio_path, result, timings)
+        
+        output_paths = [str(output_path) for output_path in output_paths]
+        if isinstance(self.config.output_format, str):
+            return output_paths[0]
+        return output_paths
+
+    def _save_timed(self, result: Dict[str, Any], audio_path: Union[str, Path],
+                    timings: Optional[StageTimings]) -> Union[str, List[str]]:
+        """Save a result as the "output" stage of its timings and add the file to the profile summary."""
+        with activate(timings), stage("output"):
+            output_paths = self._save_result(result, audio_path)
+        self._collect_timings(audio_path, result, timings)
+        return output_paths
+
+    def _save_result(self, result: Dict[str, Any], audio_path: Union[str, Path]) -> Union[str, List[str]]:
+        """
+        Write a result in every configured output format.
+        
+        Args:
+            result (Dict[str, Any]): Transcription result.
+            audio_path (Union[str, Path]): Path to the source audio file.
+        
+        Returns:
+            Union[str, List[str]]: Output path, or list of paths when
+                ``config.output_format`` is a list.
+        """
+        output_paths = self.output_handler.save_outputs(
             result,
             str(audio_path),
-            self.config.output_format
+            self.config.output_formats
         )
-        return output_path
+        if isinstance(self.config.output_format, str):
+            return output_paths[0]
+        return output_paths
+
+    def _find_audio_files(self, directory: Path) -> List[Path]:
+        """
+        Collect audio files below a directory.
+        
+        Args:
+            directory (Path): Directory to search recursively.
+        
+        Returns:
+            List[Path]: Audio files in traversal order.
+        """
+        return [
+            file_path for file_path in directory.rglob("*")
+            if file_path.suffix.lower() in AUDIO_EXTENSIONS
+        ]
+
+    def _worker_copy(self) -> "WhisperTranscriber":
+        """
+        Create a transcriber for a worker thread that shares this one's weights.
+        
+        Returns:
+            WhisperTranscriber: Shallow copy using a weight-sharing model replica.
+        """
+        worker = copy.copy(self)
+        worker.model = replicate_model(self.model)
+        return worker
 
-    def process_directory(self, directory: Union[str, Path]) -> Dict[str, str]:
+    def _run_parallel(self, items: List[Any], workers: int,
+                      task: Callable[["WhisperTranscriber", Any], Any],
+                      on_complete: Optional[Callable[[int, Any], None]] = None) -> List[Any]:
+        """
+        Run a task over items on a pool of threads sharing one model.
+        
+        Each thread works on its own weight-sharing model replica. Torch
+        intra-op threads are capped so that all workers together match the
+        CPU count.
+        
+        Args:
+            items (List[Any]): Work items.
+            workers (int): Number of worker threads.
+            task (Callable): Function called as ``task(worker_transcriber, item)``.
+            on_complete (Optional[Callable]): Called from the calling thread as
+                ``on_complete(index, outcome)`` as soon as each item finishes.
+        
+        Returns:
+            List[Any]: Task results in item order; failed items hold the raised exception.
+        """
+        threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+        previous_threads = torch.get_num_threads()
+        local = threading.local()
+        # Work done for a file being profiled, e.g. its chunks, is timed into that file
+        timings = current()
+        
+        def init_worker():
+            torch.set_num_threads(threads_per_worker)
+            local.transcriber = self._worker_copy()
+        
+        def run(item: Any) -> Any:
+            with activate(timings, nested=True):
+                return task(local.transcriber, item)
+        
+        outcomes: List[Any] = [None] * len(items)
+        torch.set_num_threads(threads_per_worker)
+        try:
+            with ThreadPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+                futures = {executor.submit(run, item): index for index, item in enumerate(items)}
+                for future in as_completed(futures):
+                    index = futures[future]
+                    try:
+                        outcomes[index] = future.result()
+                    except Exception as e:
+                        outcomes[index] = e
+                    if on_complete is not None:
+                        on_complete(index, outcomes[index])
+        finally:
+            torch.set_num_threads(previous_threads)
+        
+        return outcomes
+
+    def _process_file_timed(self, file_path: Path) -> Tuple[str, float]:
+        """Process a file and return its output path with the elapsed seconds."""
+        started = time.perf_counter()
+        output_path = self.process_file(file_path)
+        return output_path, time.perf_counter() - started
+
+    def _process_files_parallel(self, files: List[Path], workers: int,
+                                on_complete: FileCallback) -> None:
+        """
+        Process files concurrently on a pool of threads sharing one model.
+        
+        Each thread decodes audio and runs inference independently, so audio
+        decoding of one file overlaps with inference on others.
+        
+        Args:
+            files (List[Path]): Audio files to process.
+            workers (int): Number of worker threads.
+            on_complete (FileCallback): Called with (file, output or exception,
+                elapsed seconds) as each file finishes.
+        """
+        def report(index: int, outcome: Any) -> None:
+            if isinstance(outcome, Exception):
+                on_complete(files[index], outcome, None)
+            else:
+                on_complete(files[index], outcome[0], outcome[1])
+        
+        self._run_parallel(
+            files, workers, lambda worker, file_path: worker._process_file_timed(file_path), report
+        )
+
+    def _process_files_batched(self, files: List[Path], on_complete: FileCallback) -> None:
+        """
+        Process files in groups of ``config.batch_size`` using batched decoding.
+        
+        Upcoming files are decoded in the background while a batch runs.
+        
+        Args:
+            files (List[Path]): Audio files to process.
+            on_complete (FileCallback): Called with (file, output or exception,
+                elapsed seconds) as each file finishes. Elapsed time is the
+                batch time divided evenly among its files.
+        """
+        started = time.perf_counter()
+        for group in self._iter_batched(files):
+            saved = []
+            for index, outcome, timings in group:
+                if not isinstance(outcome, Exception):
+                    try:
+                        outcome = self._save_timed(outcome, files[index], timings)
+                    except Exception as e:
+                        outcome = e
+                saved.append((files[index], outcome))
+            
+            elapsed = (time.perf_counter() - started) / len(group)
+            for file_path, outcome in saved:
+                on_complete(file_path, outcome, None if isinstance(outcome, Exception) else elapsed)
+            started = time.perf_counter()
+
+    def _process_files_prefetched(self, files: List[Path], on_complete: FileCallback) -> None:
+        """
+        Process files one after another while the next ones are decoded in the background.
+        
+        Args:
+            files (List[Path]): Audio files to process.
+            on_complete (FileCallback): Called with (file, output or exception,
+                elapsed seconds) as each file finishes. Elapsed time excludes
+                decoding that overlapped with earlier files.
+        """
+        for file_path, prepared in self._load_files(files):
+            if isinstance(prepared, Exception):
+                on_complete(file_path, prepared, None)
+                continue
+            
+            started = time.perf_counter()
+            try:
+                result = self._transcribe_prepared(*prepared)
+                output_path = self._save_timed(result, file_path, prepared[3])
+            except Exception as e:
+                on_complete(file_path, e, None)
+                continue
+            on_complete(file_path, output_path, time.perf_counter() - started)
+
+    def _open_manifest(self) -> Optional[JobManifest]:
+        """
+        Open the job manifest for a batch run, if one is configured.
+        
+        Returns:
+            Optional[JobManifest]: Manifest at ``config.manifest_path``, or at
+                ``<output_dir>/manifest.jsonl`` when resuming without an explicit
+                path; None when neither is set.
+        """
+        manifest_path = self.config.manifest_path
+        if manifest_path is None and self.config.resume:
+            manifest_path = Path(self.config.output_dir) / "manifest.jsonl"
+        if manifest_path is None:
+            return None
+        return JobManifest(manifest_path)
+
+    def process_directory(self, directory: Union[str, Path],
+                          workers: Optional[int] = None,
+                          engine: Optional[str] = None) -> Dict[str, Union[str, List[str]]]:
         """
         Process all audio files in a directory.
         
+        When a job manifest is configured, every finished file is recorded in
+        it as soon as it completes, and with ``config.resume`` files already
+        recorded as done (and unchanged since, with every configured output
+        written) are skipped. With
+        ``config.profile``, ``profile_summary`` aggregates the stage timings
+        of the files processed by this call.
+        
         Args:
             directory (Union[str, Path]): Path to the directory.
+            workers (Optional[int]): Number of files to transcribe in parallel.
+                Defaults to ``config.num_workers``.
+            engine (Optional[str]): Parallel engine, "thread" or "process".
+                Defaults to ``config.batch_engine``.
         
         Returns:
-            Dict[str, str]: Mapping of input files to output files.
+            Dict[str, Union[str, List[str]]]: Mapping of input files to output
+                files (a list per file when several formats are configured).
         """
         directory = Path(directory)
         if not directory.is_dir():
             raise NotADirectoryError(f"Directory not found: {directory}")
         
+        workers = workers or self.config.num_workers
+        engine = engine or self.config.batch_engine
+        files = self._find_audio_files(directory)
+        manifest = self._open_manifest()
+        if self.profile_summary is not None:
+            self.profile_summary = ProfileSummary()
+        
         results = {}
-        audio_extensions = {".wav", ".mp3", ".m4a", ".flac", ".ogg"}
+        pending = []
+        for file_path in files:
+            if manifest is None or not self.config.resume:
+                pending.append(file_path)
+                continue
+            # Files are only skipped when every output this run writes is already there
+            outputs = [str(self.output_handler.output_path(str(file_path), fmt))
+                       for fmt in self.config.output_formats]
+            if manifest.is_completed(file_path, outputs):
+                results[str(file_path)] = outputs[0] if isinstance(self.config.output_format, str) else outputs
+            else:
+                pending.append(file_path)
+        if self.metrics is not None:
+            self.metrics.queue_depth.set(len(pending), queue="batch")
+        
+        def on_complete(file_path: Path, outcome: Any, elapsed: Optional[float]) -> None:
+            if isinstance(outcome, Exception):
+                results[str(file_path)] = f"Error: {str(outcome)}"
+            else:
+                results[str(file_path)] = outcome
+            
+            if self.metrics is not None:
+                if isinstance(outcome, Exception):
+                    self.metrics.record_failure()
+                self.metrics.queue_depth.set(len(files) - len(results), queue="batch")
+            
+            if manifest is not None:
+                if isinstance(outcome, Exception):
+                    manifest.record(file_path, STATUS_FAILED, elapsed=elapsed, error=str(outcome))
+                else:
+                    manifest.record(file_path, STATUS_DONE, outputs=outcome,
+                                    duration=estimate_duration(file_path), elapsed=elapsed)
         
-        for file_path in directory.rglob("*"):
-            if file_path.suffix.lower() in audio_extensions:
+        if workers > 1 and len(pending) > 1:
+            if engine == "process":
+                ProcessPoolEngine(self, workers).process_files(pending, on_complete)
+            else:
+                self._process_files_parallel(pending, min(workers, len(pending)), on_complete)
+        elif self.config.batch_size > 1:
+            self._process_files_batched(pending, on_complete)
+        elif not self.config.streaming:
+            self._process_files_prefetched(pending, on_complete)
+        else:
+            for file_path in pending:
                 try:
-                    output_path = self.process_file(file_path)
-                    results[str(file_path)] = output_path
+                    output_path, elapsed = self._process_file_timed(file_path)
+                    on_complete(file_path, output_path, elapsed)
                 except Exception as e:
-                    results[str(file_path)] = f"Error: {str(e)}"
+                    on_complete(file_path, e, None)
         
-        return results
-
-def main():
-    """Command-line interface for the transcriber with extended options."""
-    parser = argparse.ArgumentParser(description="Advanced Whisper Audio Transcription Tool")
-    
-    # Basic arguments
-    parser.add_argument("input_path", help="Path to audio file or directory")
-    parser.add_argument("--model", default="base", help="Whisper model to use")
-    parser.add_argument("--language", help="Language of the audio (optional)")
-    parser.add_argument("--task", default="transcribe", choices=["transcribe", "translate"],
-                      help="Task to perform (transcribe or translate)")
-    parser.add_argument("--device", default="cpu", choices=["cpu", "cuda"],
-                      help="Device to use for computation")
-    parser.add_argument("--output-dir", default="transcriptions",
-                      help="Directory to save output files")
-    parser.add_argument("--format", default="srt", choices=["txt", "json", "srt", "vtt"],
-                      help="Output format")
-    
-    # Advanced Whisper options
-    parser.add_argument("--verbose", action="store_true", help="Enable verbose output")
-    parser.add_argument("--temperature", type=float, nargs="+", default=[0.0, 0.2, 0.4, 0.6, 0.8, 1.0],
-                      help="Sampling temperatures for decoding")
-    parser.add_argument("--compression-ratio-threshold", type=float, default=2.4,
-                      help="Compression ratio threshold for filtering")
-    parser.add_argument("--logprob-threshold", type=float, default=-1.0,
-                      help="Log probability threshold for filtering")
-    parser.add_argument("--no-speech-threshold", type=float, default=0.6,
-                      help="No speech threshold for filtering")
-    parser.add_argument("--word-timestamps", action="store_true",
-                      help="Enable word-level timestamps")
-    parser.add_argument("--initial-prompt", help="Initial text prompt for transcription")
-    parser.add_argument("--max-segment-length", type=int,
-                      help="Maximum length of transcription segments")
-    parser.add_argument("--min-segment-length", type=int,
-                      help="Minimum length of transcription segments")
-    
-    args = parser.parse_args()
-    
-    config = TranscriptionConfig(
-        model_name=args.model,
-        language=args.language,
-        task=args.task,
-        device=args.device,
-        output_dir=args.output_dir,
-        output_format=args.format,
-        verbose=args.verbose,
-        temperature=tuple(args.temperature),
-        compression_ratio_threshold=args.compression_ratio_threshold,
-        logprob_threshold=args.logprob_threshold,
-        no_speech_threshold=args.no_speech_threshold,
-        word_timestamps=args.word_timestamps,
-        initial_prompt=args.initial_prompt,
-        max_segment_length=args.max_segment_length,
-        min_segment_length=args.min_segment_length
-    )
-    
-    transcriber = WhisperTranscriber(config)
-    input_path = Path(args.input_path)
-    
-    try:
-        if input_path.is_file():
-            output_path = transcriber.process_file(input_path)
-            print(f"Transcription saved to: {output_path}")
-        elif input_path.is_dir():
-            results = transcriber.process_directory(input_path)
-            print("\nTranscription Results:")
-            for input_file, output_file in results.items():
-                print(f"\n{input_file} -> {output_file}")
-        else:
-            print(f"Error: Path not found: {input_path}")
-    except Exception as e:
-        print(f"Error: {str(e)}")
+        # Report results in traversal order
+        return {str(file_path): results[str(file_path)] for file_path in files}
 
 if __name__ == "__main__":
     main()
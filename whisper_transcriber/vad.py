@@ -0,0 +1,195 @@
+from typing import Dict, Any, List, Tuple, Union
+
+import numpy as np
+from whisper.audio import SAMPLE_RATE
+
+from .audio import WindowedAudio, SpanAudio
+from .config import VADConfig
+
+# Frequency band carrying most speech energy, in Hz
+SPEECH_BAND = (300.0, 3400.0)
+
+# Number of frames analysed at a time
+FRAME_BLOCK = 4096
+
+
+def _frame_features(audio: Union[np.ndarray, WindowedAudio], frame_length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute per-frame energy and speech-band energy ratio.
+
+    Args:
+        audio (Union[np.ndarray, WindowedAudio]): 16 kHz mono waveform.
+        frame_length (int): Frame length in samples.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Frame energy in dBFS and the fraction of
+            each frame's spectral energy inside the speech band.
+    """
+    n_frames = len(audio) // frame_length
+    freqs = np.fft.rfftfreq(frame_length, 1 / SAMPLE_RATE)
+    in_band = (freqs >= SPEECH_BAND[0]) & (freqs <= SPEECH_BAND[1])
+
+    energy_db = np.empty(n_frames)
+    band_ratio = np.empty(n_frames)
+
+    # Work through the frames in blocks to bound temporary memory on long files
+    for start in range(0, n_frames, FRAME_BLOCK):
+        count = min(FRAME_BLOCK, n_frames - start)
+        block = audio[start * frame_length:(start + count) * frame_length].reshape(count, frame_length)
+        energy = np.mean(np.square(block, dtype=np.float64), axis=1)
+        energy_db[start:start + len(block)] = 10 * np.log10(energy + 1e-10)
+
+        spectrum = np.square(np.abs(np.fft.rfft(block, axis=1)))
+        band_ratio[start:start + len(block)] = \
+            spectrum[:, in_band].sum(axis=1) / (spectrum.sum(axis=1) + 1e-10)
+
+    return energy_db, band_ratio
+
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return start and end indices of the runs of True values in a boolean array."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def detect_speech(audio: np.ndarray, config: VADConfig) -> List[Tuple[int, int]]:
+    """
+    Find the regions of a waveform that likely contain speech.
+
+    Frames are active when their energy is ``config.threshold_db`` above the
+    estimated noise floor (or above ``config.max_threshold_db`` outright) and
+    enough of their energy lies in the speech band. Short gaps are bridged,
+    short bursts dropped and the remaining regions padded.
+
+    Args:
+        audio (np.ndarray): 16 kHz mono waveform.
+        config (VADConfig): Voice activity detection settings.
+
+    Returns:
+        List[Tuple[int, int]]: (start, end) sample indices of speech regions.
+    """
+    frame_length = int(config.frame_duration * SAMPLE_RATE)
+    if len(audio) < frame_length:
+        return [(0, len(audio))] if len(audio) else []
+
+    energy_db, band_ratio = _frame_features(audio, frame_length)
+    noise_floor = np.percentile(energy_db, 10)
+    threshold = min(noise_floor + config.threshold_db, config.max_threshold_db)
+    active = (energy_db > threshold) & (band_ratio >= config.speech_band_ratio)
+
+    # Bridge pauses shorter than min_silence_duration
+    starts, ends = _runs(~active)
+    min_silence = int(round(config.min_silence_duration / config.frame_duration))
+    short = (ends - starts < min_silence) & (starts > 0) & (ends < len(active))
+    fill = np.zeros(len(active) + 1, dtype=np.int64)
+    np.add.at(fill, starts[short], 1)
+    np.add.at(fill, ends[short], -1)
+    active |= np.cumsum(fill[:-1]) > 0
+
+    # Drop bursts shorter than min_speech_duration
+    starts, ends = _runs(active)
+    min_speech = int(round(config.min_speech_duration / config.frame_duration))
+    keep = (ends - starts) >= min_speech
+    starts, ends = starts[keep], ends[keep]
+
+    pad = int(config.speech_pad * SAMPLE_RATE)
+    spans = []
+    for start, end in zip(starts * frame_length - pad, ends * frame_length + pad):
+        start, end = max(0, int(start)), min(len(audio), int(end))
+        if spans and start <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], end)
+        else:
+            spans.append((start, end))
+    return spans
+
+
+class SpeechTimeline:
+    """
+    Mapping between a compacted speech-only waveform and the original audio.
+
+    Built from the speech regions found by ``detect_speech``; converts
+    timestamps on the compacted audio back to the original timeline.
+    """
+
+    def __init__(self, spans: List[Tuple[int, int]], total_samples: int):
+        """
+        Initialize the timeline.
+
+        Args:
+            spans (List[Tuple[int, int]]): (start, end) samples of the kept regions.
+            total_samples (int): Length of the original audio in samples.
+        """
+        self.spans = spans
+        self.total_samples = total_samples
+        lengths = np.array([end - start for start, end in spans], dtype=np.int64)
+        self._original_starts = np.array([start for start, _ in spans], dtype=np.float64) / SAMPLE_RATE
+        self._compact_starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) / SAMPLE_RATE \
+            if spans else np.zeros(0)
+        self.speech_samples = int(lengths.sum())
+
+    def compact(self, audio: Union[np.ndarray, WindowedAudio]) -> Union[np.ndarray, WindowedAudio]:
+        """
+        Return the audio with everything outside the speech regions removed.
+
+        Windowed audio is compacted lazily, without reading it.
+        """
+        if isinstance(audio, WindowedAudio):
+            return SpanAudio(audio, self.spans)
+        if not self.spans:
+            return audio[:0]
+        return np.concatenate([audio[start:end] for start, end in self.spans])
+
+    def to_original(self, seconds: float, is_end: bool = False) -> float:
+        """
+        Map a time on the compacted audio to the original timeline.
+
+        Args:
+            seconds (float): Time on the compacted audio.
+            is_end (bool, optional): Resolve times on a region boundary to the end
+                of the earlier region instead of the start of the later one.
+
+        Returns:
+            float: Time on the original audio.
+        """
+        side = "left" if is_end else "right"
+        index = max(0, int(np.searchsorted(self._compact_starts, seconds, side=side)) - 1)
+        return float(self._original_starts[index] + seconds - self._compact_starts[index])
+
+    def restore(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Move all segment and word timestamps of a result to the original timeline.
+
+        Args:
+            result (Dict[str, Any]): Result produced from the compacted audio.
+
+        Returns:
+            Dict[str, Any]: The same result, updated in place, with a ``vad``
+                summary of how much audio was skipped.
+        """
+        for segment in result.get('segments', []):
+            self.restore_segment(segment)
+
+        result['vad'] = self.summary()
+        return result
+
+    def restore_segment(self, segment: Dict[str, Any]) -> Dict[str, Any]:
+        """Move the segment and word timestamps of one segment to the original timeline in place."""
+        if self.spans:
+            segment['start'] = self.to_original(segment['start'])
+            segment['end'] = self.to_original(segment['end'], is_end=True)
+            for word in segment.get('words', []):
+                word['start'] = self.to_original(word['start'])
+                word['end'] = self.to_original(word['end'], is_end=True)
+        return segment
+
+    def summary(self) -> Dict[str, Any]:
+        """Describe how much of the original audio was kept and skipped."""
+        total = self.total_samples / SAMPLE_RATE
+        speech = self.speech_samples / SAMPLE_RATE
+        return {
+            'total_duration': total,
+            'speech_duration': speech,
+            'skipped_duration': total - speech,
+            'skipped_ratio': (total - speech) / total if total else 0.0,
+            'speech_regions': len(self.spans)
+        }